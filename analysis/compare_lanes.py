@@ -6,16 +6,32 @@ import matplotlib.pyplot as plt
 import networkx as nx
 import numpy as np
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.graph_container import GRAPH_FILE, load_graph
+
 
 def load_npy(path):
     print(f"Loading NPY: {path}")
-    data = np.load(path)
+    # Read-only map: pages are loaded on demand and shared between processes
+    data = np.load(path, mmap_mode="r")
     # Expected: [x, y, yaw, ...]
     if data.ndim == 2 and data.shape[1] >= 3:
         return data  # return full array
     return None
 
 
+def load_graph_nodes(path):
+    """[x, y, yaw] of every node in a graph.npz container, in point_id order (like load_pickle_graph)."""
+    print(f"Loading Graph Container: {path}")
+    nodes, _, _ = load_graph(path)
+    if nodes.size == 0:
+        print("Error: Graph container has no nodes")
+        return None
+    order = np.argsort(nodes[:, 0], kind="stable")
+    return nodes[order][:, 1:4]
+
+
 def load_pickle_graph(path):
     print(f"Loading Pickle Graph: {path}")
     try:
@@ -173,7 +189,8 @@ if __name__ == "__main__":
     # Define paths
     BASE_DIR = r"f:/RunningProjects/LaneMappingTool"
     GITAM_NPY = os.path.join(BASE_DIR, "lanes", "Gitam_lanes", "Gitam.npy")
-    TOOL_PICKLE = os.path.join(BASE_DIR, "web", "backend", "workspace", "output.pickle")
+    # graph.npz is written on every save; output.pickle only when asked for
+    TOOL_GRAPH = os.path.join(BASE_DIR, "web", "backend", "workspace", GRAPH_FILE)
     BUGGY_PICKLE = r"G:/RunningProjects/Buggy/vechicalFileByInfCmp/sb_main_gate.pickel"
 
     datasets = {}
@@ -186,10 +203,10 @@ if __name__ == "__main__":
             datasets["Original (Gitam.npy)"] = npy_data[:, :3]  # Keep first 3 cols
 
     # Load Tool Output
-    if os.path.exists(TOOL_PICKLE):
-        tool_data = load_pickle_graph(TOOL_PICKLE)
+    if os.path.exists(TOOL_GRAPH):
+        tool_data = load_graph_nodes(TOOL_GRAPH)
         if tool_data is not None:
-            datasets["Tool Output (output.pickle)"] = tool_data
+            datasets["Tool Output (graph.npz)"] = tool_data
 
     # # Load Buggy Reference (if simple file rename didn't work, might need to inspect actual content structure)
     # # For now trying as graph
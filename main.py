@@ -6,6 +6,7 @@ import numpy as np
 from utils.data_loader import DataLoader
 from utils.data_manager import DataManager
 from utils.event_handler import EventHandler
+from utils.graph_container import GRAPH_FILE
 from utils.plot_manager import PlotManager
 
 
@@ -23,9 +24,12 @@ def main():
     graph_dir = os.path.join(base_path, 'files')
     raw_data_path = os.path.join(base_path, 'lanes', 'Gitam_lanes')
 
-    # Paths for saved working state
-    nodes_path = os.path.join(graph_dir, 'graph_nodes.npy')
-    edges_path = os.path.join(graph_dir, 'graph_edges.npy')
+    # Paths for saved working state (graph.npz container, or the older .npy pair)
+    nodes_path = os.path.join(graph_dir, GRAPH_FILE)
+    edges_path = None
+    if not os.path.exists(nodes_path):
+        nodes_path = os.path.join(graph_dir, 'graph_nodes.npy')
+        edges_path = os.path.join(graph_dir, 'graph_edges.npy')
 
     # These files must exist in your 'raw_data_path' folder
     files_path_ = ["lane-20.npy", "lane-30.npy"]
@@ -0,0 +1,69 @@
+"""Micro-benchmark for the lane-to-graph builder (lane_nodes + chain_lanes).
+
+Compares it with the per-row loop the loaders used before and checks that
+both produce the same graph. Not collected by pytest; run it directly:
+
+    python tests/bench_lane_builder.py [total_points] [lanes]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+# Add root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.data_loader import chain_lanes, lane_nodes
+
+
+def loop_builder(lanes_points, start_id):
+    nodes_list, edges_list = [], []
+    pid = start_id
+    for lane_idx, points in enumerate(lanes_points):
+        n = points.shape[0]
+        nodes = np.zeros((n, 7))
+        edges = np.zeros((n - 1, 2), dtype=int)
+        nodes[:, 1:3] = points[:, 0:2]
+        nodes[:, 3] = points[:, 2]
+        nodes[:, 4] = lane_idx
+        lane_pids = []
+        for i in range(n):
+            nodes[i, 0] = pid + i
+            lane_pids.append(pid + i)
+        for i in range(n - 1):
+            edges[i, 0] = lane_pids[i]
+            edges[i, 1] = lane_pids[i + 1]
+        nodes_list.append(nodes)
+        edges_list.append(edges)
+        pid += n
+    return np.vstack(nodes_list), np.vstack(edges_list)
+
+
+def vectorized_builder(lanes_points, start_id):
+    return chain_lanes([lane_nodes(points, i) for i, points in enumerate(lanes_points)], start_id)
+
+
+def best_of(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    n_lanes = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    sizes = np.diff(np.r_[0, np.sort(rng.choice(np.arange(1, total), n_lanes - 1, replace=False)), total])
+    lanes_points = [rng.random((size, 3)) for size in sizes]
+
+    loop_time, (loop_nodes, loop_edges) = best_of(loop_builder, lanes_points, 1000)
+    vec_time, (vec_nodes, vec_edges) = best_of(vectorized_builder, lanes_points, 1000)
+    assert np.array_equal(loop_nodes, vec_nodes) and np.array_equal(loop_edges, vec_edges)
+
+    print(f"{total} points in {n_lanes} lanes")
+    print(f"  per-row loop : {loop_time * 1000:8.1f} ms")
+    print(f"  vectorized   : {vec_time * 1000:8.1f} ms  ({loop_time / vec_time:.0f}x)")
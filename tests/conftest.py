@@ -0,0 +1,43 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add root to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.data_manager import DataManager
+
+
+@pytest.fixture
+def make_manager():
+    """Factory for a DataManager over the given (N, 7) nodes and (E, 2) edges.
+
+    file_names defaults to one "lane-<zone>.npy" per zone up to the largest
+    zone in nodes; other keyword arguments go to DataManager.
+    """
+    def make(nodes, edges, file_names=None, **kwargs):
+        nodes = np.asarray(nodes, dtype=float)
+        if file_names is None:
+            file_names = [f"lane-{i}.npy" for i in range(int(nodes[:, 4].max()) + 1 if len(nodes) else 0)]
+        return DataManager(nodes, np.asarray(edges), file_names, **kwargs)
+    return make
+
+
+@pytest.fixture
+def chain_graph():
+    """Factory for `lanes` straight lanes of `length` nodes each, chained in id order.
+
+    Ids run from 0, x is id * spacing and the zone is the lane index.
+    """
+    def make(lanes=1, length=5, spacing=1.0):
+        n = lanes * length
+        nodes = np.zeros((n, 7))
+        nodes[:, 0] = np.arange(n)
+        nodes[:, 1] = np.arange(n) * spacing
+        nodes[:, 4] = np.arange(n) // length
+        ids = np.arange(n).reshape(lanes, length)
+        edges = np.column_stack([ids[:, :-1].ravel(), ids[:, 1:].ravel()])
+        return nodes, edges
+    return make
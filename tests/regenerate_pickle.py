@@ -27,9 +27,9 @@ def regenerate_pickle():
     print(f"Loaded {nodes.shape[0]} nodes. Initializing DataManager...")
     dm = DataManager(nodes, edges, file_names)
 
-    # Save using the web format (which includes output.pickle)
+    # Save using the web format; output.pickle is only written when asked for
     print(f"Saving to {OUTPUT_DIR}...")
-    dm.save_by_web(OUTPUT_DIR)
+    dm.save_by_web(OUTPUT_DIR, exports=("pickle",))
     print("Regeneration complete. output.pickle should now contain correct yaw/steering data.")
 
 
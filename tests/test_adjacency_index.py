@@ -0,0 +1,56 @@
+import pytest
+
+from utils.adjacency_index import AdjacencyIndex
+from web.backend.utils.curve_utils import find_path
+
+
+@pytest.fixture
+def dm(make_manager, chain_graph):
+    return make_manager(*chain_graph(length=8, spacing=2.0))
+
+
+def assert_adjacency_in_sync(dm):
+    fresh = AdjacencyIndex()
+    fresh.rebuild(dm.edges)
+    adjacency = dm.adjacency
+    for pid in dm.nodes[:, 0].astype(int):
+        assert sorted(adjacency.successors(pid)) == sorted(fresh.successors(pid))
+        assert sorted(adjacency.predecessors(pid)) == sorted(fresh.predecessors(pid))
+        assert sorted(adjacency.neighbors(pid)) == sorted(fresh.neighbors(pid))
+
+
+def test_adjacency_tracks_edits_and_undo(dm):
+    assert dm.adjacency.successors(2) == [3]
+    assert dm.adjacency.predecessors(2) == [1]
+
+    dm.add_edge(7, 0)
+    assert dm.adjacency.has_edge(7, 0)
+    dm.add_edge(7, 0)
+    assert len(dm.edges) == 8
+
+    dm.reverse_path([2, 3, 4])
+    assert dm.adjacency.has_edge(4, 3) and not dm.adjacency.has_edge(3, 4)
+    assert_adjacency_in_sync(dm)
+
+    dm.delete_points([5])
+    assert 5 not in dm.adjacency
+    assert_adjacency_in_sync(dm)
+
+    dm.delete_edges_for_node(1)
+    assert_adjacency_in_sync(dm)
+
+    dm.undo()
+    dm.undo()
+    assert dm.adjacency.has_edge(4, 5)
+    assert_adjacency_in_sync(dm)
+    dm.redo()
+    assert_adjacency_in_sync(dm)
+
+
+def test_find_path_with_shared_adjacency(dm):
+    dm.reverse_path([3, 4])
+    for directed in (True, False):
+        expected = find_path(dm.edges, 0, 6, directed=directed)
+        assert find_path(dm.edges, 0, 6, directed=directed, adjacency=dm.adjacency) == expected
+    assert find_path(dm.edges, 0, 6, directed=True, adjacency=dm.adjacency) is None
+    assert find_path(dm.edges, 0, 6, directed=False, adjacency=dm.adjacency) == list(range(7))
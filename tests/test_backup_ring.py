@@ -0,0 +1,62 @@
+import os
+
+import numpy as np
+
+from utils.backup_ring import BackupRing
+
+
+def test_deltas_restore_every_point(chain_graph, tmp_path):
+    ring = BackupRing(str(tmp_path), keep=50, snapshot_every=4)
+    nodes, edges = chain_graph(length=2000, spacing=0.5)
+    states = []
+    for step in range(7):
+        if step == 1:
+            nodes = np.vstack([nodes, [[5000, 1, 2, 0, 1, 0, 0]]])
+            edges = np.vstack([edges, [[1999, 5000]]])
+        elif step == 2:
+            nodes = np.delete(nodes, [10, 11, 700], axis=0)
+            edges = np.delete(edges, [10, 11], axis=0)
+        elif step >= 3:
+            nodes = nodes.copy()
+            nodes[step * 10, 4] = step
+        names = [f"lane-{step}.npy"]
+        ring.write(nodes, edges, names)
+        states.append((nodes.copy(), edges.copy(), names))
+
+    kinds = [kind for _, kind, _ in ring.points()]
+    assert kinds == ["base", "delta", "delta", "delta", "base", "delta", "delta"]
+    base_size = os.path.getsize(tmp_path / "point_000000_base.npz")
+    assert os.path.getsize(tmp_path / "point_000002_delta.npz") < base_size / 10
+
+    for seq, (nodes, edges, names) in enumerate(states):
+        got_nodes, got_edges, got_names = ring.restore(seq)
+        assert np.array_equal(got_nodes, nodes)
+        assert np.array_equal(got_edges, edges)
+        assert got_names == names
+
+
+def test_ring_prunes_whole_chains(chain_graph, tmp_path):
+    ring = BackupRing(str(tmp_path), keep=3, snapshot_every=2)
+    nodes, edges = chain_graph(length=10, spacing=0.5)
+    for step in range(7):
+        nodes = nodes.copy()
+        nodes[0, 1] = step
+        ring.write(nodes, edges, [])
+    # Points 4..6 must stay; 4 is a base, so 0..3 go
+    assert [seq for seq, _, _ in ring.points()] == [4, 5, 6]
+    assert ring.restore(5)[0][0, 1] == 5
+
+
+def test_restore_backup_is_undoable(make_manager, chain_graph, tmp_path):
+    dm = make_manager(*chain_graph(length=5, spacing=0.5))
+    dm.backups = BackupRing(str(tmp_path))
+    dm.backup_interval = 0
+    dm.add_node(9.0, 9.0, 0)
+    assert len(dm.backups.points()) == 1
+    dm.delete_points([0, 1])
+
+    assert dm.restore_backup(0)
+    assert len(dm.nodes) == 6
+    dm.undo()
+    assert len(dm.nodes) == 4
+    assert not dm.restore_backup(42)
@@ -0,0 +1,55 @@
+import numpy as np
+
+from utils.data_loader import (DataLoader, decimate_chunks, decimate_lane, ingest_lane, lane_nodes, read_chunks,
+                               resample_chunks, resample_lane)
+
+
+def drive(n=5000, seed=0):
+    # Stop-and-go trajectory with heading wrapping around +/-pi
+    rng = np.random.default_rng(seed)
+    steps = rng.exponential(0.2, (n, 2)) * (rng.random((n, 1)) < 0.6)
+    yaw = (np.cumsum(rng.normal(0, 0.5, n)) + np.pi) % (2 * np.pi) - np.pi
+    return np.column_stack([np.cumsum(steps, axis=0), yaw])
+
+
+def test_streamed_stages_match_whole_lane():
+    nodes = lane_nodes(drive(), 0)
+    for chunk in (1, 7, 999):
+        blocks = [nodes[i:i + chunk].copy() for i in range(0, len(nodes), chunk)]
+        decimated = np.vstack(list(decimate_chunks(iter(blocks), 0.7)))
+        assert np.array_equal(decimated, decimate_lane(nodes, 0.7))
+        resampled = np.vstack(list(resample_chunks(iter(blocks), 0.5)))
+        assert np.allclose(resampled[:, 1:], resample_lane(nodes, 0.5)[:, 1:])
+
+
+def test_chunked_load_matches_in_memory_load(tmp_path):
+    for i in range(3):
+        np.save(tmp_path / f"lane_{i}.npy", drive(seed=i))
+    whole = DataLoader(str(tmp_path), min_spacing=0.5).load_data(start_id=10)
+    chunked_loader = DataLoader(str(tmp_path), min_spacing=0.5, chunk_rows=256)
+    chunked = chunked_loader.load_data(start_id=10)
+    assert np.array_equal(whole[0], chunked[0])
+    assert np.array_equal(whole[1], chunked[1])
+    assert whole[2] == chunked[2]
+    assert chunked_loader.reduction == (15000, len(chunked[0]))
+
+
+def test_recorder_csv_is_streamed_by_column_name(tmp_path):
+    points = drive(n=1000)
+    path = tmp_path / "vehicle_data.csv"
+    with open(path, "w") as f:
+        f.write("timestamp,x,y,z,yaw,steering_angle,speed\n")
+        for i, (x, y, yaw) in enumerate(points.tolist()):
+            f.write(f"{i * 0.1},{x!r},{y!r},0.0,{yaw!r},0.0,1.0\n")
+
+    blocks = list(read_chunks(str(path), 300))
+    assert [len(b) for b in blocks] == [300, 300, 300, 100]
+    assert np.array_equal(np.vstack(blocks), points)
+
+    raw, nodes = ingest_lane(str(path), 4, chunk_rows=300)
+    assert raw == 1000
+    assert np.array_equal(nodes[:, 1:4], points)
+    assert np.all(nodes[:, 4] == 4)
+
+    nodes, edges, names = DataLoader(str(tmp_path)).load_data()
+    assert names == ["vehicle_data.csv"] and len(nodes) == 1000 and len(edges) == 999
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from utils.data_manager import DataManager
+
+
+def snapshot(dm):
+    return dm.nodes.copy(), dm.edges.copy()
+
+
+@pytest.mark.parametrize("memory_limit", [256 * 1024 * 1024, 0])
+def test_compact_ids_translates_history(memory_limit):
+    nodes = np.zeros((4, 7))
+    nodes[:, 0] = [10, 40, 20, 90]
+    nodes[:, 1] = [0, 1, 2, 3]
+    dm = DataManager(nodes, np.array([[10, 40], [40, 20]]), ["lane-0.npy"],
+                     history_memory_limit=memory_limit)
+    dm.add_edge(20, 90)
+    dm.delete_points([40])
+    dm.add_node(5.0, 5.0, 0)  # gets id 91
+    states = [snapshot(dm)]
+
+    assert dm.compact_ids() == 4
+    assert dm.nodes[:, 0].tolist() == [0, 1, 2, 3]  # 10, 20, 90, 91
+    assert dm.edges.tolist() == [[1, 2]]
+    assert dm.adjacency.successors(1) == [2]
+    assert dm.compact_ids() == 0
+
+    # Old states come back in the new id space; 40 existed only in history, so it gets id 4
+    dm.undo()
+    assert dm.nodes[:, 0].tolist() == [0, 1, 2]
+    dm.undo()
+    assert dm.nodes[:, 0].tolist() == [0, 4, 1, 2]
+    assert dm.edges.tolist() == [[0, 4], [4, 1], [1, 2]]
+    dm.undo()
+    assert dm.edges.tolist() == [[0, 4], [4, 1]]
+    dm.redo()
+    dm.redo()
+    dm.redo()
+    assert dm.nodes[:, 0].tolist() == [0, 1, 2, 3]
+    assert np.array_equal(dm.nodes[:, 1:], states[0][0][:, 1:])
+
+    dm.add_node(7.0, 7.0, 0)
+    assert dm.nodes[-1, 0] == 4
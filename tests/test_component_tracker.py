@@ -0,0 +1,66 @@
+import networkx as nx
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager, chain_graph):
+    return make_manager(*chain_graph(lanes=2, length=5))
+
+
+def reference_groups(dm):
+    G = nx.Graph()
+    G.add_nodes_from(dm.nodes[:, 0].astype(int).tolist())
+    G.add_edges_from(dm.edges.astype(int).tolist())
+    return sorted(sorted(c) for c in nx.connected_components(G))
+
+
+def tracked_groups(dm):
+    groups = [dm.nodes[rows, 0].astype(int).tolist() for rows in dm.components.groups(dm.nodes)]
+    # Groups come ordered by their smallest id, rows in node order
+    assert [min(g) for g in groups] == sorted(min(g) for g in groups)
+    return sorted(sorted(g) for g in groups)
+
+
+def test_components_follow_edits(dm):
+    assert len(dm.components) == 2
+
+    new_id = dm.add_node(20.0, 0.0, 0)
+    assert len(dm.components) == 3
+    dm.add_edge(4, new_id)
+    dm.add_edge(new_id, 5)
+    # Incremental unions, no rebuild
+    assert dm._components.valid
+    assert len(dm.components) == 1
+    assert tracked_groups(dm) == reference_groups(dm)
+
+    dm.delete_edges_for_node(7)
+    assert tracked_groups(dm) == reference_groups(dm)
+    dm.delete_points([2])
+    assert tracked_groups(dm) == reference_groups(dm)
+    dm.copy_points([0, 1])
+    assert tracked_groups(dm) == reference_groups(dm)
+    dm.undo()
+    dm.undo()
+    assert tracked_groups(dm) == reference_groups(dm)
+
+
+def test_split_disconnected_lanes_names_groups(dm):
+    dm.delete_edges_for_node(7)
+    groups = dm.split_disconnected_lanes()
+    assert [name for name, _ in groups] == ["lane-0.npy", "lane-1.npy", "lane-1_1.npy"]
+    assert groups[1][1][:, 0].tolist() == [5, 6]
+    assert groups[2][1][:, 0].tolist() == [7, 8, 9]
+
+
+def test_appends_grow_parent_buffer_geometrically(dm):
+    assert len(dm.components) == 2
+    tracker = dm.components
+    capacities = set()
+    for i in range(200):
+        new_id = dm.add_node(100.0 + i, 0.0, 0)
+        dm.add_edge(new_id - 1 if i else 9, new_id)
+        capacities.add(tracker._buffer.capacity)
+    assert tracker.valid
+    # Amortized appends: only a handful of reallocations, not one per node
+    assert len(capacities) <= 6
+    assert tracked_groups(dm) == reference_groups(dm)
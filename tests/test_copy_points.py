@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager):
+    nodes = np.zeros((4, 7))
+    nodes[:, 0] = [10, 11, 12, 13]
+    nodes[:, 1] = [0.0, 1.0, 2.0, 3.0]
+    nodes[:, 4] = 1
+    edges = np.array([[10, 11], [11, 12], [12, 13], [11, 12]])
+    return make_manager(nodes, edges)
+
+
+def test_copy_points_remaps_internal_edges(dm):
+    new_ids = dm.copy_points([12, 11, 13, 99])
+    assert new_ids == [14, 15, 16]
+    assert dm.nodes[-3:, 0].tolist() == [14, 15, 16]
+    assert np.allclose(dm.nodes[-3:, 1:3], [[3, 2], [4, 2], [5, 2]])
+    # The 10->11 edge leaves the selection; the duplicated 11->12 is copied twice
+    assert dm.edges[-3:].tolist() == [[14, 15], [15, 16], [14, 15]]
+    assert dm.adjacency.successors(14) == [15, 15]
+
+    dm.undo()
+    assert len(dm.nodes) == 4 and len(dm.edges) == 4
+
+
+def test_copy_points_with_transform(dm):
+    rotate = [[0, -1, 0], [1, 0, 5]]  # 90 degrees, then 5 up
+    new_ids = dm.copy_points([10, 11], offset=(0, 0), transform=rotate)
+    assert new_ids == [14, 15]
+    assert np.allclose(dm.nodes[-2:, 1:3], [[0, 5], [0, 6]])
+    assert np.allclose(dm.nodes[-2:, 3], np.pi / 2)
+    assert dm.edges[-1].tolist() == [14, 15]
+
+
+def test_copy_points_rejects_bad_offset_and_transform(dm):
+    for kwargs in ({'offset': None}, {'offset': (1.0,)}, {'offset': (1.0, float('nan'))},
+                   {'transform': [[1, 0], [0, 1], [0, 0]]}, {'transform': np.eye(3)}, {'transform': [1, 0]}):
+        assert dm.copy_points([10, 11], **kwargs) is None
+    assert len(dm.nodes) == 4 and not dm.history.can_undo
+
+
+def test_copy_points_api_offset(dm, monkeypatch, tmp_path):
+    import web.backend.app as backend
+
+    monkeypatch.setattr(backend, "TEMP_LANES_DIR", str(tmp_path))
+    monkeypatch.setattr(backend, "data_manager", dm)
+    monkeypatch.setattr(backend, "tile_store", None)
+    client = backend.app.test_client()
+
+    # An explicit null falls back to the default offset instead of writing NaNs
+    response = client.post('/api/operation', json={'operation': 'copy_points',
+                                                   'params': {'point_ids': [10], 'offset': None}})
+    assert response.status_code == 200
+    assert np.allclose(backend.data_manager.nodes[-1, 1:3], [2, 2])
+
+    response = client.post('/api/operation', json={'operation': 'copy_points',
+                                                   'params': {'point_ids': [10], 'transform': [[1, 0]]}})
+    assert response.status_code == 400
+    assert len(backend.data_manager.nodes) == 5
+    backend.persistence.flush()
@@ -0,0 +1,57 @@
+import numpy as np
+
+from utils.data_loader import DataLoader
+from utils.extent import ExtentTracker, diameter
+
+
+def brute_force(points):
+    diff = points[:, None] - points[None, :]
+    return np.sqrt((diff ** 2).sum(axis=-1)).max()
+
+
+def test_diameter_matches_pairwise_max():
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 3, 10, 200):
+        points = rng.random((n, 2)) * 100
+        assert np.isclose(diameter(points), brute_force(points))
+    line = np.column_stack([np.arange(5.0), 2 * np.arange(5.0)])
+    assert np.isclose(diameter(line), brute_force(line))
+    assert diameter(np.ones((4, 2))) == 0.0
+
+
+def test_tracker_follows_adds_and_removes():
+    tracker = ExtentTracker()
+    tracker.add("a", [[0, 0], [3, 0]])
+    tracker.add("b", [[0, 4], [1, 1]])
+    assert np.isclose(tracker.diameter, 5.0)
+    tracker.remove("b")
+    assert np.isclose(tracker.diameter, 3.0)
+    tracker.remove("a")
+    assert tracker.diameter == 0.0 and len(tracker) == 0
+
+
+def test_loader_keeps_d_across_loads(tmp_path):
+    np.save(tmp_path / "lane_a.npy", np.array([[0.0, 0.0], [3.0, 0.0]]))
+    np.save(tmp_path / "lane_b.npy", np.array([[0.0, 4.0], [0.0, 2.0]]))
+    loader = DataLoader(str(tmp_path))
+    loader.load_data(specific_files=["lane_a.npy"])
+    assert np.isclose(loader.D, 3.0)
+    loader.load_data(specific_files=["lane_b.npy"], start_id=2)
+    assert np.isclose(loader.D, 5.0)
+    assert np.isclose(loader.remove_lanes(["lane_b.npy"]), 3.0)
+
+
+def test_saved_graph_extent_survives_lane_changes(tmp_path):
+    np.save(tmp_path / "lane_a.npy", np.array([[0.0, 0.0], [3.0, 0.0]]))
+    nodes = np.zeros((2, 7))
+    nodes[:, 0] = [0, 1]
+    nodes[:, 1:3] = [[0.0, 0.0], [0.0, 10.0]]
+    np.save(tmp_path / "graph_nodes0.npy", nodes)
+    np.save(tmp_path / "graph_edges0.npy", np.array([[0, 1]]))
+
+    loader = DataLoader(str(tmp_path))
+    assert np.isclose(loader.load_graph_data(str(tmp_path / "graph_nodes0.npy"),
+                                             str(tmp_path / "graph_edges0.npy"))[3], 10.0)
+    loader.load_data(specific_files=["lane_a.npy"], start_id=2)
+    assert np.isclose(loader.D, np.hypot(3.0, 10.0))
+    assert np.isclose(loader.remove_lanes(["lane_a.npy"]), 10.0)
@@ -0,0 +1,87 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from networkx.readwrite import json_graph
+
+from utils.data_loader import DataLoader
+from utils.graph_container import export_networkx, load_graph, open_graph, save_graph
+
+
+def make_graph():
+    rng = np.random.default_rng(1)
+    nodes = np.zeros((30, 7))
+    nodes[:, 0] = np.arange(100, 130)
+    nodes[:, 1:4] = rng.random((30, 3)) * 50
+    nodes[:, 4] = np.arange(30) // 10
+    nodes[:, 5] = 3.5
+    nodes[:, 6] = np.arange(30) % 4
+    edges = np.column_stack([np.arange(100, 129), np.arange(101, 130)])
+    return nodes, edges
+
+
+def test_round_trip_with_typed_columns(tmp_path):
+    nodes, edges = make_graph()
+    path = str(tmp_path / "graph.npz")
+    save_graph(path, nodes, edges, ["lane-0.npy", None, "lane-2.npy"])
+
+    header, members = open_graph(path)
+    assert header["version"] == 1 and header["n_nodes"] == 30
+    assert isinstance(members["xy"], np.memmap)
+    assert members["point_id"].dtype == np.int64
+    assert members["indicator"].dtype == np.int8
+
+    loaded_nodes, loaded_edges, names = load_graph(path)
+    assert np.array_equal(loaded_nodes, nodes)
+    assert np.array_equal(loaded_edges, edges)
+    assert names == ["lane-0.npy", None, "lane-2.npy"]
+
+
+def test_non_integral_columns_are_kept_exact(tmp_path):
+    nodes, edges = make_graph()
+    nodes[3, 4] = 1.5
+    path = str(tmp_path / "graph.npz")
+    save_graph(path, nodes, edges)
+    assert np.array_equal(load_graph(path)[0], nodes)
+
+    save_graph(path, np.array([]), np.array([]))
+    loaded_nodes, loaded_edges, names = load_graph(path)
+    assert loaded_nodes.size == 0 and loaded_edges.size == 0 and names is None
+
+
+def test_newer_version_is_rejected(tmp_path):
+    path = str(tmp_path / "graph.npz")
+    header = json.dumps({"format": "lane-graph", "version": 99}).encode()
+    with open(path, "wb") as f:
+        np.savez(f, header=np.frombuffer(header, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        open_graph(path)
+
+
+def test_exports_are_generated_lazily(tmp_path):
+    nodes, edges = make_graph()
+    path = str(tmp_path / "graph.npz")
+    save_graph(path, nodes, edges)
+    written = export_networkx(path, pickle_out=False)
+    assert [os.path.basename(p) for p in written] == ["output.json"]
+    assert export_networkx(path, pickle_out=False) == []
+
+    with open(tmp_path / "output.json") as f:
+        G = json_graph.node_link_graph(json.load(f), edges="links")
+    assert G.number_of_nodes() == 30 and G.number_of_edges() == 29
+
+    # A newer container makes the export stale again
+    stamp = os.path.getmtime(path)
+    os.utime(tmp_path / "output.json", (stamp - 5, stamp - 5))
+    assert export_networkx(path, pickle_out=False)
+
+
+def test_loader_reads_container(tmp_path):
+    nodes, edges = make_graph()
+    path = str(tmp_path / "graph.npz")
+    save_graph(path, nodes, edges, ["a.npy", "b.npy", "c.npy"])
+    loaded_nodes, loaded_edges, names, D = DataLoader(str(tmp_path)).load_graph_data(path)
+    assert np.array_equal(loaded_nodes, nodes)
+    assert names == ["a.npy", "b.npy", "c.npy"]
+    assert D > 0
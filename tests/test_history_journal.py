@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager, chain_graph):
+    # Two lanes of ten, joined into one chain
+    nodes, _ = chain_graph(lanes=2, length=10, spacing=2.0)
+    nodes[:, 2] = np.sin(np.arange(20))
+    nodes[:, 6] = np.arange(20) % 4
+    return make_manager(nodes, np.column_stack([np.arange(19), np.arange(1, 20)]))
+
+
+def state(dm):
+    return dm.nodes.copy(), dm.edges.copy(), list(dm.file_names)
+
+
+def assert_state(dm, expected):
+    nodes, edges, names = expected
+    assert np.array_equal(dm.nodes, nodes)
+    assert np.array_equal(dm.edges, edges)
+    assert dm.file_names == names
+
+
+def run_edits(dm):
+    dm.add_node(50.0, 1.0, 0)
+    dm.add_edge(19, 20)
+    dm.reverse_path([3, 4, 5, 6])
+    dm.delete_points([8, 12])
+    dm.copy_points([0, 1, 2])
+    dm.update_node_properties([1, 2, 3], zone=5, indicator=2)
+    dm.reverse_indicators([1, 2, 3, 7])
+    dm.delete_edges_for_node(15)
+    dm.remove_file("lane-1.npy")
+
+
+def test_undo_redo_matches_snapshots(dm):
+    states = [state(dm)]
+    for edit in [lambda: dm.add_node(50.0, 1.0, 0),
+                 lambda: dm.add_edge(19, 20),
+                 lambda: dm.reverse_path([3, 4, 5, 6]),
+                 lambda: dm.delete_points([8, 12]),
+                 lambda: dm.copy_points([0, 1, 2]),
+                 lambda: dm.update_node_properties([1, 2, 3], zone=5, indicator=2),
+                 lambda: dm.reverse_indicators([1, 2, 3, 7]),
+                 lambda: dm.delete_edges_for_node(15),
+                 lambda: dm.remove_file("lane-1.npy")]:
+        edit()
+        states.append(state(dm))
+    assert len(dm.history) == len(states)
+
+    for expected in reversed(states[:-1]):
+        _, _, ok = dm.undo()
+        assert ok
+        assert_state(dm, expected)
+    assert not dm.undo()[2]
+
+    for expected in states[1:]:
+        _, _, ok = dm.redo()
+        assert ok
+        assert_state(dm, expected)
+    assert not dm.redo()[2]
+
+
+def test_history_memory_scales_with_edit_size(make_manager, chain_graph):
+    dm = make_manager(*chain_graph(length=50000, spacing=0.0), file_names=["big.npy"])
+    baseline = dm.history.nbytes
+    for _ in range(20):
+        dm.add_node(1.0, 2.0, 0)
+    # 20 single-node edits must not cost anything close to one full copy each
+    assert dm.history.nbytes - baseline < 20 * 1024
+
+
+def test_external_replacement_is_undoable_and_checkpoints_rebuild(dm):
+    dm.history.checkpoint_interval = 3
+    before = state(dm)
+    dm.nodes = np.array([[0, 0.0, 0.0, 0, 0, 0, 0]])
+    dm.undo()
+    assert_state(dm, before)
+
+    run_edits(dm)
+    expected = dm.history.state_at(dm.history.position)
+    assert_state(dm, expected)
+    # A state change outside the journal falls back to checkpoint replay
+    dm._set_nodes(dm.nodes[:3].copy())
+    dm.undo()
+    assert_state(dm, dm.history.state_at(dm.history.position))
+
+
+def test_history_spills_to_disk_under_memory_limit(dm):
+    dm.history.memory_limit = 4096
+    dm.history.checkpoint_interval = 5
+    states = [state(dm)]
+    for i in range(30):
+        dm.copy_points(list(range(10)))
+        states.append(state(dm))
+
+    assert dm.history.spilled_count > 0
+    assert dm.history.nbytes <= 4096 + max(d.nbytes for d in dm.history._entries[-2:])
+    spill_dir = dm.history._spill_dir
+    assert os.listdir(spill_dir)
+
+    for expected in reversed(states[:-1]):
+        dm.undo()
+        assert_state(dm, expected)
+    for expected in states[1:]:
+        dm.redo()
+        assert_state(dm, expected)
+
+    dm.history.close()
+    assert not os.path.exists(spill_dir)
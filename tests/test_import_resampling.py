@@ -0,0 +1,53 @@
+import numpy as np
+
+from utils.data_loader import DataLoader, arc_length, decimate_lane, lane_nodes, resample_lane
+
+
+def recording():
+    # Straight drive along x with a long stop (near-duplicate poses) halfway
+    x = np.concatenate([np.linspace(0, 10, 101), 10 + np.random.default_rng(0).normal(0, 1e-4, 2000),
+                        np.linspace(10, 20, 101)[1:]])
+    yaw = np.full(len(x), 0.1)
+    return np.column_stack([x, np.zeros(len(x)), yaw])
+
+
+def test_decimate_collapses_stationary_stretch():
+    nodes = lane_nodes(recording(), 3)
+    out = decimate_lane(nodes, 0.5)
+    assert len(out) < 60
+    assert np.all(np.diff(out[:, 1]) > 0.05)
+    # Endpoints, yaw and zone survive
+    assert out[0, 1] == 0 and out[-1, 1] == nodes[-1, 1]
+    assert np.allclose(out[:, 3], 0.1) and np.all(out[:, 4] == 3)
+
+
+def test_resample_uniform_spacing_and_yaw_wrap():
+    t = np.linspace(0, np.pi, 200)
+    # Heading crosses +/-pi; interpolation must not swing through 0
+    yaw = np.where(t < np.pi / 2, np.pi - 0.01, -np.pi + 0.01)
+    points = np.column_stack([10 * np.cos(t), 10 * np.sin(t), yaw])
+    out = resample_lane(lane_nodes(points, 0), 1.0)
+
+    steps = np.diff(arc_length(out[:, 1:3]))
+    assert np.allclose(steps[:-1], 1.0, atol=0.01)
+    assert steps[-1] <= 1.0
+    assert np.all(np.abs(out[:, 3]) > 3.0)
+    assert np.array_equal(out[:, 0], np.arange(len(out)))
+
+
+def test_loader_stage_only_touches_raw_lanes(tmp_path, capsys):
+    np.save(tmp_path / "a.npy", recording())
+    edited = lane_nodes(recording(), 5)
+    np.save(tmp_path / "b.npy", edited)
+
+    loader = DataLoader(str(tmp_path), min_spacing=0.5)
+    nodes, edges, names = loader.load_data()
+    raw, kept = loader.reduction
+    assert raw == 2 * len(edited) and kept == len(nodes)
+    # The edited 7-column lane is loaded as is
+    assert np.sum(nodes[:, 4] == 1) == len(edited)
+    assert len(edges) == len(nodes) - 2
+    assert "Import resampling kept" in capsys.readouterr().out
+
+    plain = DataLoader(str(tmp_path)).load_data()[0]
+    assert len(plain) == 2 * len(edited)
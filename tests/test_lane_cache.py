@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+
+from utils.lane_cache import LaneCache
+
+
+def build_calls():
+    calls = []
+
+    def build(points):
+        calls.append(points.shape)
+        return np.hstack([points, np.zeros((len(points), 5))])
+    return calls, build
+
+
+def test_unchanged_and_rewritten_files_hit(tmp_path):
+    path = str(tmp_path / "lane-0.npy")
+    np.save(path, np.ones((10, 2)))
+    cache = LaneCache()
+    calls, build = build_calls()
+
+    first = cache.load(path, build)
+    assert cache.load(path, build) is first
+    assert len(calls) == 1 and not first.flags.writeable
+
+    # Same bytes written again (new mtime): one hash, no rebuild
+    np.save(path, np.ones((10, 2)))
+    os.utime(path, ns=(1, 1))
+    assert cache.load(path, build) is first
+    assert len(calls) == 1
+
+    # Different content or variant: rebuilt
+    np.save(path, np.zeros((10, 2)))
+    assert cache.load(path, build)[0, 0] == 0
+    cache.load(path, build, variant=(3,))
+    assert len(calls) == 3
+
+
+def test_lru_eviction_under_byte_budget(tmp_path):
+    cache = LaneCache(max_bytes=2 * 10 * 7 * 8)  # room for two 10-row lanes
+    calls, build = build_calls()
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / f"lane-{i}.npy"))
+        np.save(paths[-1], np.full((10, 2), i, dtype=float))
+    cache.load(paths[0], build)
+    cache.load(paths[1], build)
+    cache.load(paths[0], build)  # 0 is now the most recently used
+    cache.load(paths[2], build)  # evicts 1
+    assert len(cache) == 2 and cache.nbytes == 2 * 10 * 7 * 8
+    cache.load(paths[0], build)
+    assert len(calls) == 3
+    cache.load(paths[1], build)
+    assert len(calls) == 4
+
+
+def test_rewrite_within_mtime_granularity_is_not_served_stale(tmp_path):
+    path = str(tmp_path / "lane-0.npy")
+    np.save(path, np.ones((10, 2)))
+    cache = LaneCache()
+    calls, build = build_calls()
+    assert cache.load(path, build)[0, 0] == 1
+
+    # Autosave in the same tick: same size, and a coarse clock keeps the mtime
+    st = os.stat(path)
+    np.save(path, np.full((10, 2), 2.0))
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert cache.load(path, build)[0, 0] == 2
+    assert len(calls) == 2
@@ -0,0 +1,43 @@
+import numpy as np
+
+from utils.data_loader import DataLoader
+from utils.data_manager import DataManager
+
+
+def test_saved_pair_is_mapped_copy_on_write(tmp_path):
+    nodes = np.zeros((100, 7))
+    nodes[:, 0] = np.arange(100)
+    nodes[:, 1] = np.arange(100)
+    edges = np.column_stack([np.arange(99), np.arange(1, 100)])
+    np.save(tmp_path / "graph_nodes0.npy", nodes)
+    np.save(tmp_path / "graph_edges0.npy", edges)
+
+    loader = DataLoader(str(tmp_path))
+    g_nodes, g_edges, names, _ = loader.load_graph_data(str(tmp_path / "graph_nodes0.npy"),
+                                                        str(tmp_path / "graph_edges0.npy"))
+    assert isinstance(g_nodes, np.memmap) and g_nodes.mode == "c"
+
+    dm = DataManager(g_nodes, g_edges, names)
+    assert dm.nodes is g_nodes
+    # The initial undo checkpoint shares the file's pages instead of copying them
+    checkpoint = dm.history._checkpoints[0].state
+    assert isinstance(checkpoint.nodes, np.memmap) and checkpoint.nodes.mode == "r"
+    assert dm.history.nbytes == 0
+
+    # Edits stay private to this process
+    dm.update_node_properties([5], zone=3)
+    dm.add_node(1.0, 2.0, 0)
+    assert dm.nodes[5, 4] == 3 and len(dm.nodes) == 101
+    assert np.array_equal(np.load(tmp_path / "graph_nodes0.npy"), nodes)
+
+    dm.undo()
+    dm.undo()
+    assert np.array_equal(dm.nodes, nodes)
+
+
+def test_raw_lanes_load_the_same_with_and_without_mmap(tmp_path):
+    np.save(tmp_path / "lane-0.npy", np.random.default_rng(0).random((20, 3)))
+    mapped = DataLoader(str(tmp_path)).load_data()
+    read = DataLoader(str(tmp_path), mmap=False).load_data()
+    assert not isinstance(mapped[0], np.memmap)
+    assert np.array_equal(mapped[0], read[0]) and np.array_equal(mapped[1], read[1])
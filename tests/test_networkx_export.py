@@ -0,0 +1,72 @@
+import math
+import os
+
+import networkx as nx
+import numpy as np
+
+from utils.data_manager import DataManager
+
+
+def reference_graph(nodes, edges):
+    # Row-by-row construction the bulk builder has to reproduce
+    G = nx.DiGraph()
+    coords = {}
+    for row in nodes:
+        t = int(row[0])
+        coords[t] = (float(row[1]), float(row[2]))
+        G.add_node(t, x=float(row[1]), y=float(row[2]), yaw=float(row[3]), zone=float(row[4]),
+                   width=float(row[5]), indicator=float(row[6]))
+    for u, v in edges:
+        u, v = int(u), int(v)
+        weight = 1.0
+        if u in coords and v in coords:
+            weight = float(math.sqrt((coords[v][0] - coords[u][0]) ** 2 + (coords[v][1] - coords[u][1]) ** 2))
+        G.add_edge(u, v, weight=weight)
+    return G
+
+
+def test_bulk_graph_matches_row_by_row():
+    rng = np.random.default_rng(0)
+    nodes = np.zeros((50, 7))
+    nodes[:, 0] = np.arange(50)
+    nodes[:, 1:7] = rng.random((50, 6))
+    nodes[49, 0] = 3  # duplicate id: the later row wins
+    edges = np.column_stack([np.arange(48), np.arange(1, 49)]).astype(float)
+    edges = np.vstack([edges, [[3, 99], [10, 3]]])
+    dm = DataManager(nodes, edges, ["lane-0.npy"])
+
+    G = dm._create_networkx_graph()
+    expected = reference_graph(nodes, edges)
+    assert dict(G.nodes(data=True)) == dict(expected.nodes(data=True))
+    assert list(G.edges(data=True)) == list(expected.edges(data=True))
+
+
+def test_save_writes_container_and_optional_exports(tmp_path):
+    nodes = np.array([[0, 0.0, 0.0, 0, 0, 0, 0], [1, 3.0, 4.0, 0, 0, 0, 0]])
+    dm = DataManager(nodes, np.array([[0, 1]]), ["lane-0.npy"])
+    dm.save_by_web(str(tmp_path))
+    assert os.listdir(tmp_path) == ["graph.npz"]
+    dm.save_by_web(str(tmp_path), exports=("pickle", "json"))
+    assert sorted(os.listdir(tmp_path)) == ["graph.npz", "output.json", "output.pickle"]
+
+
+def test_streamed_json_matches_node_link_data(tmp_path):
+    import json
+    from networkx.readwrite import json_graph
+    from utils.graph_container import build_networkx_graph, write_node_link_json
+
+    rng = np.random.default_rng(1)
+    nodes = np.zeros((40, 7))
+    nodes[:, 0] = rng.integers(0, 30, 40)  # duplicate ids
+    nodes[:, 1:7] = rng.random((40, 6))
+    edges = rng.integers(0, 45, (60, 2))  # duplicate and dangling edges, unsorted sources
+    path = tmp_path / "output.json"
+    write_node_link_json(str(path), nodes, edges, chunk_size=7)
+
+    expected = json_graph.node_link_data(build_networkx_graph(nodes, edges), edges="links")
+    assert path.read_text() == json.dumps(expected)
+    G = json_graph.node_link_graph(json.loads(path.read_text()), edges="links")
+    assert list(G.edges(data=True)) == list(reference_graph(nodes, edges).edges(data=True))
+
+    write_node_link_json(str(path), np.array([]), np.array([]))
+    assert json.loads(path.read_text())["nodes"] == []
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager):
+    nodes = np.array([
+        [10, 0.0, 0.0, 0, 0, 0, 0],
+        [20, 10.0, 0.0, 0, 0, 0, 0],
+        [30, 20.0, 0.0, 0, 0, 0, 2],
+    ])
+    edges = np.array([[10, 20], [20, 30]])
+    return make_manager(nodes, edges)
+
+
+def assert_index_in_sync(dm):
+    for row, pid in enumerate(dm.nodes[:, 0].astype(int)):
+        assert dm.node_index.row(pid) == row
+    assert len(dm.node_index) == len(dm.nodes)
+
+
+def test_index_tracks_add_delete_copy(dm):
+    assert dm.node_index.row(20) == 1
+    assert dm.node_index.row(99) is None
+
+    new_id = dm.add_node(30.0, 0.0, 0)
+    dm.add_edge(30, new_id)
+    assert_index_in_sync(dm)
+    assert np.isclose(dm.nodes[dm.node_index.row(30), 3], 0.0)
+
+    dm.delete_points([20])
+    assert dm.node_index.row(20) is None
+    assert_index_in_sync(dm)
+
+    dm.copy_points([10, 30])
+    assert_index_in_sync(dm)
+
+
+def test_index_tracks_undo_redo_and_assignment(dm):
+    dm.delete_points([10])
+    dm.undo()
+    assert dm.node_index.row(10) == 0
+    assert_index_in_sync(dm)
+
+    dm.redo()
+    assert dm.node_index.row(10) is None
+    assert_index_in_sync(dm)
+
+    dm.nodes = np.array([[5, 1.0, 1.0, 0, 0, 0, 0]])
+    assert dm.node_index.row(5) == 0
+    assert dm.node_index.row(20) is None
+
+
+def test_property_updates_use_index(dm):
+    dm.update_node_properties([30, 404], zone=7, indicator=3)
+    assert dm.nodes[2, 4] == 7 and dm.nodes[2, 6] == 3
+    dm.reverse_indicators([30])
+    assert dm.nodes[2, 6] == 2
+    assert np.all(dm.nodes[:2, 4] == 0)
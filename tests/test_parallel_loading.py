@@ -0,0 +1,77 @@
+import os
+
+import numpy as np
+
+from utils.data_loader import DataLoader, chain_lanes, infer_zone, lane_nodes, migrate_node_columns, run_parallel
+
+
+def serial_reference(directory, files, start_id):
+    # The per-file loop load_data used before it was parallelized
+    nodes_list, edges_list, names = [], [], []
+    pid = start_id
+    for lane_idx, file in enumerate(files):
+        points = np.load(os.path.join(directory, file))
+        if points.size == 0 or points.shape[1] < 2:
+            continue
+        n = points.shape[0]
+        nodes = np.zeros((n, 7))
+        if points.shape[1] >= 7:
+            nodes[:, :] = points[:, 0:7]
+        else:
+            nodes[:, 1:3] = points[:, 0:2]
+            if points.shape[1] >= 3:
+                nodes[:, 3] = points[:, 2]
+        nodes[:, 4] = lane_idx
+        nodes[:, 0] = pid + np.arange(n)
+        edges = np.column_stack([nodes[:-1, 0], nodes[1:, 0]]).astype(int)
+        nodes_list.append(nodes)
+        edges_list.append(edges)
+        names.append(file)
+        pid += n
+    return np.vstack(nodes_list), np.vstack(edges_list), names
+
+
+def test_parallel_load_matches_serial_order(tmp_path):
+    rng = np.random.default_rng(0)
+    files = []
+    for i in range(30):
+        cols = [2, 3, 7][i % 3]
+        n = 1 if i == 4 else int(rng.integers(2, 50))
+        np.save(tmp_path / f"lane-{i:02d}.npy", rng.random((n, cols)))
+        files.append(f"lane-{i:02d}.npy")
+    np.save(tmp_path / "lane-empty.npy", np.zeros((0, 2)))
+    np.save(tmp_path / "lane-narrow.npy", np.zeros((5, 1)))
+    files[10:10] = ["lane-empty.npy", "lane-narrow.npy"]
+
+    nodes, edges, names = DataLoader(str(tmp_path)).load_data(specific_files=files, start_id=100)
+    ref_nodes, ref_edges, ref_names = serial_reference(str(tmp_path), files, 100)
+    assert names == ref_names
+    assert np.array_equal(nodes, ref_nodes)
+    assert np.array_equal(edges, ref_edges)
+
+
+def test_run_parallel_keeps_input_order():
+    assert run_parallel(lambda i, x: (i, x * 2), range(50), max_workers=4) == [(i, i * 2) for i in range(50)]
+
+
+def test_chain_lanes_links_within_lanes_only():
+    lanes = [np.zeros((2, 7)), np.zeros((1, 7)), np.zeros((3, 7))]
+    nodes, edges = chain_lanes(lanes, start_id=5)
+    assert nodes[:, 0].tolist() == [5, 6, 7, 8, 9, 10]
+    assert edges.tolist() == [[5, 6], [8, 9], [9, 10]]
+
+
+def test_lane_nodes_zone_and_column_handling():
+    assert infer_zone("lane-99.npy", 4) == 99
+    assert infer_zone("center.npy", 4) == 4
+
+    edited = np.arange(14.0).reshape(2, 7)
+    assert lane_nodes(edited, 3)[:, 4].tolist() == [3, 3]
+    assert lane_nodes(edited, 3, keep_saved_zone=True)[:, 4].tolist() == [4, 11]
+
+    raw = np.array([[1.0, 2.0, 0.5]])
+    assert lane_nodes(raw, 2).tolist() == [[0, 1, 2, 0.5, 2, 0, 0]]
+    assert lane_nodes(raw, 2, raw_yaw=False)[0, 3] == 0
+    assert lane_nodes(np.zeros((3, 1)), 0) is None
+
+    assert migrate_node_columns(np.ones((2, 5))).shape == (2, 7)
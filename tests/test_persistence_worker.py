@@ -0,0 +1,72 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from utils.graph_container import load_graph
+from utils.persistence_worker import PersistenceWorker, WriteJob
+
+
+@pytest.fixture
+def dm(make_manager, chain_graph):
+    return make_manager(*chain_graph(lanes=2, length=5))
+
+
+def test_bursts_coalesce_into_one_write():
+    worker = PersistenceWorker(delay=0.2)
+    gate = threading.Event()
+    runs = []
+
+    def blocker():
+        gate.wait(5)
+
+    worker.submit(WriteJob("block", blocker))
+    for i in range(20):
+        worker.submit(WriteJob("save", runs.append, i))
+    gate.set()
+    assert worker.flush(timeout=5) == []
+    assert runs == [19]
+    assert worker.idle
+
+
+def test_failed_job_reported_on_flush():
+    worker = PersistenceWorker(delay=0)
+
+    def fail():
+        raise OSError("disk full")
+
+    worker.submit(WriteJob("bad", fail))
+    errors = worker.flush(timeout=5)
+    assert len(errors) == 1 and "disk full" in errors[0]
+    assert worker.flush(timeout=5) == []
+
+
+def test_background_temp_lanes_match_sync_save(dm, tmp_path):
+    worker = PersistenceWorker(delay=0.05)
+    out = str(tmp_path)
+    dm.delete_edges_for_node(7)
+    dm.save_temp_lanes(out, writer=worker)
+    dm.undo()
+    dm.update_node_properties([2], indicator=3)
+    dm.save_temp_lanes(out, writer=worker)
+    dm.save_by_web(os.path.join(out, "workspace"), writer=worker)
+    # Edits after queuing don't leak into the snapshot
+    dm.update_node_properties([2], indicator=1)
+    assert worker.flush(fsync=True, timeout=5) == []
+
+    assert sorted(f for f in os.listdir(out) if f.endswith(".npy")) == ["lane-0.npy", "lane-1.npy"]
+    assert np.load(os.path.join(out, "lane-0.npy"))[2, 6] == 3
+    assert load_graph(os.path.join(out, "workspace", "graph.npz"))[0][2, 6] == 3
+
+
+def test_failed_graph_save_reported_on_flush(dm, tmp_path):
+    worker = PersistenceWorker(delay=0)
+    # The workspace "folder" is a file, so writing graph.npz must fail
+    blocked = tmp_path / "workspace"
+    blocked.write_text("")
+    dm.save_by_web(str(blocked), writer=worker)
+    errors = worker.flush(timeout=5)
+    assert len(errors) == 1 and "web" in errors[0]
+    # The synchronous path still only prints
+    dm.save_by_web(str(blocked))
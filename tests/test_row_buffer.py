@@ -0,0 +1,45 @@
+import numpy as np
+
+from utils.data_manager import DataManager
+from utils.row_buffer import RowBuffer
+
+
+def test_row_buffer_doubles_and_adopts():
+    buf = RowBuffer(width=2)
+    assert buf.view.shape == (0,)
+    assert buf.extend(np.array([[0, 1]])) == 0
+    assert buf.capacity == 16
+    for i in range(1, 40):
+        buf.extend(np.array([[i, i + 1]]))
+    assert len(buf) == 40 and buf.capacity == 64
+    assert buf.view[-1].tolist() == [39, 40]
+
+    # Float rows promote an int buffer instead of being truncated
+    buf.extend(np.array([[0.5, 1.5]]))
+    assert buf.view.dtype == np.float64 and buf.view[-1, 0] == 0.5
+
+    arr = np.zeros((3, 2))
+    buf.adopt(arr)
+    assert buf.view.base is arr or buf.view is arr
+    buf.extend(np.ones((1, 2)))
+    assert np.all(arr == 0)
+
+
+def test_data_manager_appends_grow_buffer_in_place():
+    nodes = np.array([[0, 0.0, 0.0, 0, 0, 0, 0], [1, 10.0, 0.0, 0, 0, 0, 0]])
+    dm = DataManager(nodes, np.array([[0, 1]]), ["lane-0.npy"])
+    for i in range(100):
+        dm.add_node(float(i), 1.0, 0)
+    buffer = dm._node_buffer
+    assert len(dm.nodes) == 102 and buffer.capacity == 128
+    # nodes is a zero-copy view of the buffer's live rows
+    assert np.shares_memory(dm.nodes, buffer._data)
+    dm.nodes[5, 1] = 123.0
+    assert buffer.view[5, 1] == 123.0
+
+    data_before = buffer._data
+    dm.add_node(0.0, 0.0, 0)
+    assert buffer._data is data_before
+    dm.undo()
+    assert len(dm.nodes) == 102
+    assert dm.node_index.row(101) == 101
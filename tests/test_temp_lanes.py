@@ -0,0 +1,54 @@
+import os
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager, chain_graph):
+    return make_manager(*chain_graph(lanes=2, length=5))
+
+
+def mtimes(folder):
+    return {f: os.stat(os.path.join(folder, f)).st_mtime_ns for f in os.listdir(folder)}
+
+
+def test_only_changed_lanes_are_rewritten(dm, tmp_path):
+    out = str(tmp_path)
+    dm.save_temp_lanes(out)
+    assert sorted(os.listdir(out)) == ["lane-0.npy", "lane-1.npy"]
+
+    for f in os.listdir(out):
+        os.utime(os.path.join(out, f), ns=(0, 0))
+    dm.update_node_properties([7], indicator=2)
+    dm.save_temp_lanes(out)
+    times = mtimes(out)
+    assert times["lane-0.npy"] == 0
+    assert times["lane-1.npy"] != 0
+    assert np.load(os.path.join(out, "lane-1.npy"))[2, 6] == 2
+
+
+def test_split_parts_written_and_cleaned_after_undo(dm, tmp_path):
+    out = str(tmp_path)
+    dm.delete_edges_for_node(7)
+    dm.save_temp_lanes(out)
+    assert "lane-1_1.npy" in os.listdir(out)
+
+    dm.undo()
+    dm.save_temp_lanes(out)
+    assert sorted(os.listdir(out)) == ["lane-0.npy", "lane-1.npy"]
+    assert len(np.load(os.path.join(out, "lane-1.npy"))) == 5
+
+    # Files the manifest doesn't know about are left alone
+    np.save(os.path.join(out, "lane-0_9.npy"), np.zeros((1, 7)))
+    dm.save_temp_lanes(out)
+    assert "lane-0_9.npy" in os.listdir(out)
+
+
+def test_forget_temp_lanes_forces_rewrite(dm, tmp_path):
+    out = str(tmp_path)
+    dm.save_temp_lanes(out)
+    np.save(os.path.join(out, "lane-0.npy"), np.zeros((1, 7)))
+    dm.forget_temp_lanes(["lane-0.npy"])
+    dm.save_temp_lanes(out)
+    assert len(np.load(os.path.join(out, "lane-0.npy"))) == 5
@@ -0,0 +1,149 @@
+import numpy as np
+
+from utils.data_manager import DataManager
+from utils.tile_store import TileStore
+
+
+def grid_graph():
+    # Three horizontal lanes crossing a 4 x 2 grid of 10-unit tiles
+    nodes, edges = [], []
+    pid = 0
+    for lane, y in enumerate((2.0, 8.0, 15.0)):
+        for x in np.arange(0.5, 40, 1.0):
+            nodes.append([pid, x, y, 0.0, lane, 0.0, 0.0])
+            if x > 0.5:
+                edges.append([pid - 1, pid])
+            pid += 1
+    return np.array(nodes), np.array(edges)
+
+
+def as_sets(nodes, edges):
+    return {tuple(row) for row in np.asarray(nodes).tolist()}, {tuple(e) for e in np.asarray(edges).tolist()}
+
+
+def test_build_and_load_roundtrip(tmp_path):
+    nodes, edges = grid_graph()
+    store = TileStore.build(str(tmp_path), nodes, edges, ["a.npy"], tile_size=10)
+    assert len(store) == 8 and store.next_id == len(nodes)
+
+    reopened = TileStore(str(tmp_path))
+    assert reopened.info() == store.info()
+    assert reopened.info()["bounds"] == [0.0, 0.0, 40.0, 20.0]
+    loaded = reopened.load(reopened.keys())
+    assert as_sets(*loaded) == as_sets(nodes, edges)
+
+    # Viewport in tile (1, 0) plus a one-tile halo
+    assert reopened.tiles_for([12, 1, 18, 9], halo=1) == [(0, 0), (0, 1), (1, 0), (1, 1), (2, 0), (2, 1)]
+    assert reopened.tiles_for([12, 1, 18, 9], halo=0) == [(1, 0)]
+
+
+def test_window_edits_are_written_back(tmp_path):
+    nodes, edges = grid_graph()
+    store = TileStore.build(str(tmp_path), nodes, edges, [], tile_size=10)
+    keys = store.tiles_for([0, 0, 9, 9], halo=0)
+    win_nodes, win_edges = store.load(keys)
+    # The edge leaving the window towards x = 10.5 comes along, dangling
+    assert [9, 10] in win_edges.tolist()
+
+    dm = DataManager(win_nodes, win_edges, [], id_floor=store.next_id)
+    new_id = dm.add_node(5.0, 5.0, 0)
+    assert new_id == len(nodes)
+    dm.delete_points([3])
+    rows = np.flatnonzero(dm.nodes[:, 0] == 5)
+    moved = dm.nodes.copy()
+    moved[rows, 1] = 35.0  # Into tile (3, 0), outside the window
+    dm.nodes = moved
+
+    store.store(keys, dm.nodes, dm.edges)
+    store.store(keys, dm.nodes, dm.edges)  # e.g. save, then pan away
+    assert store.next_id == len(nodes) + 1
+
+    expected = np.vstack([np.delete(nodes, 3, axis=0), [[new_id, 5.0, 5.0, 0.0, 0, 0.0, 0.0]]])
+    expected[expected[:, 0] == 5, 1] = 35.0
+    expected_edges = [e for e in edges.tolist() if 3 not in e]
+    all_nodes, all_edges = TileStore(str(tmp_path)).load(store.keys())
+    assert as_sets(all_nodes, all_edges) == as_sets(expected, expected_edges)
+
+    # Moving it back into the window leaves no stale copy in tile (3, 0)
+    moved[rows, 1] = 5.5
+    dm.nodes = moved
+    store.store(keys, dm.nodes, dm.edges)
+    all_nodes = store.load(store.keys())[0]
+    assert np.sum(all_nodes[:, 0] == 5) == 1
+    assert len(all_nodes) == len(expected)
+
+
+def test_id_floor_keeps_window_ids_unique():
+    nodes, edges = grid_graph()
+    dm = DataManager(nodes[:5], edges[:4], [], id_floor=1000)
+    assert dm.add_node(0.0, 0.0, 0) == 1000
+    dm.sync_next_id()
+    assert dm.add_node(1.0, 0.0, 0) == 1001
+    assert dm.compact_ids() == 0
+
+
+def tiled_client(backend, monkeypatch, tmp_path, nodes, edges):
+    # Module globals are restored after the test so other app tests see their own state
+    monkeypatch.setattr(backend, "TILES_DIR", str(tmp_path))
+    monkeypatch.setattr(backend, "data_manager", DataManager(nodes, edges, ["a.npy"]))
+    monkeypatch.setattr(backend, "tile_store", None)
+    monkeypatch.setattr(backend, "tile_window", [])
+    return backend.app.test_client()
+
+
+def test_tiled_mode_api(tmp_path, monkeypatch):
+    import web.backend.app as backend
+
+    nodes, edges = grid_graph()
+    client = tiled_client(backend, monkeypatch, tmp_path, nodes, edges)
+
+    response = client.post('/api/tiles', json={'action': 'build', 'tile_size': 10})
+    assert response.get_json()['tiles']['tiles'] == 8
+    assert client.get('/api/data').get_json()['nodes'] == []
+
+    data = client.get('/api/data?bbox=12,1,18,9').get_json()
+    assert data['tiles']['loaded'] == [[0, 0], [0, 1], [1, 0], [1, 1], [2, 0], [2, 1]]
+    assert len(data['nodes']) == 90
+    client.post('/api/operation', json={'operation': 'add_node', 'params': {'x': 15.0, 'y': 5.0, 'lane_id': 0}})
+
+    # Panning writes the edited window back and loads the new one
+    data = client.get('/api/data?bbox=32,12,38,18').get_json()
+    assert data['tiles']['loaded'] == [[2, 0], [2, 1], [3, 0], [3, 1]]
+    assert data['tiles']['nodes'] == len(nodes) + 1
+
+    data = client.post('/api/tiles', json={'action': 'close'}).get_json()
+    assert data['tiles'] is None
+    assert len(backend.data_manager.nodes) == len(nodes) + 1
+    assert backend.tile_store is None
+
+
+def test_close_keeps_nodes_added_to_new_tiles(tmp_path, monkeypatch):
+    import web.backend.app as backend
+
+    nodes, edges = grid_graph()
+    client = tiled_client(backend, monkeypatch, tmp_path, nodes[nodes[:, 2] < 10], edges[:78])
+    client.post('/api/tiles', json={'action': 'build', 'tile_size': 10})
+    data = client.get('/api/data?bbox=0,0,5,5').get_json()
+    assert data['tiles']['loaded'] == [[0, 0], [1, 0]]
+
+    # (3, 15) lies in tile (0, 1), which does not exist yet
+    client.post('/api/operation', json={'operation': 'add_node', 'params': {'x': 3.0, 'y': 15.0, 'lane_id': 0}})
+    client.post('/api/tiles', json={'action': 'close'})
+    held = backend.data_manager.nodes
+    assert len(held) == 81
+    assert np.any((held[:, 1] == 3.0) & (held[:, 2] == 15.0))
+
+
+def test_load_refused_while_tiled(tmp_path, monkeypatch):
+    import web.backend.app as backend
+
+    nodes, edges = grid_graph()
+    client = tiled_client(backend, monkeypatch, tmp_path, nodes, edges)
+    client.post('/api/tiles', json={'action': 'build', 'tile_size': 10})
+    client.get('/api/data?bbox=0,0,5,5')
+    window = list(backend.tile_window)
+
+    response = client.post('/api/load', json={'raw_files': ['a.npy']})
+    assert response.status_code == 400
+    assert backend.tile_store is not None and backend.tile_window == window
+    assert backend.tile_store.info()['nodes'] == len(nodes)
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+
+from web.backend.app import app
+import web.backend.app as backend
+
+
+@pytest.fixture
+def dm(make_manager):
+    nodes = np.array([
+        [0, 0.0, 0.0, 0, 0, 0, 0],
+        [1, 10.0, 0.0, 0, 0, 0, 0],
+    ])
+    return make_manager(nodes, np.array([[0, 1]]))
+
+
+def test_transaction_is_one_history_entry(dm):
+    before = dm.nodes.copy(), dm.edges.copy()
+    with dm.transaction():
+        ids = dm.add_nodes([(20.0, 0.0), (20.0, 10.0), (30.0, 10.0)], 0)
+        dm.add_edges([(1, ids[0]), (ids[0], ids[1]), (ids[1], ids[2])])
+        dm.update_node_properties(ids, indicator=2)
+    assert ids == [2, 3, 4]
+    assert len(dm.history) == 2
+    assert len(dm.nodes) == 5 and len(dm.edges) == 4
+    # Yaw of the connecting node and the new nodes follows their out-edges
+    assert np.isclose(dm.nodes[1, 3], 0.0)
+    assert np.isclose(dm.nodes[2, 3], np.pi / 2)
+
+    dm.undo()
+    assert np.array_equal(dm.nodes, before[0])
+    assert np.array_equal(dm.edges, before[1])
+
+
+def test_rollback_restores_state_without_history(dm):
+    before = dm.nodes.copy(), dm.edges.copy()
+    with pytest.raises(ValueError):
+        with dm.transaction():
+            dm.add_nodes([(5.0, 5.0)], 0)
+            dm.delete_points([0])
+            raise ValueError("abort")
+    assert np.array_equal(dm.nodes, before[0])
+    assert np.array_equal(dm.edges, before[1])
+    assert len(dm.history) == 1
+    assert dm.add_nodes([(1.0, 1.0)], 0) == [2]
+
+
+def test_add_edges_skips_duplicates(dm):
+    assert dm.add_edges([(0, 1), (1, 0), (1, 0)]) == 1
+    assert len(dm.edges) == 2
+
+
+def test_batch_add_nodes_operation(dm, monkeypatch, tmp_path):
+    monkeypatch.setattr(backend, 'data_manager', dm)
+    monkeypatch.setattr(backend, 'TEMP_LANES_DIR', str(tmp_path))
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        res = client.post('/api/operation', json={
+            'operation': 'batch_add_nodes',
+            'params': {'points': [{'x': 20, 'y': 0}, {'x': 30, 'y': 0}], 'lane_id': 0, 'connect_to_start_id': 1}
+        })
+    assert res.status_code == 200
+    data = res.get_json()
+    assert len(data['nodes']) == 4
+    assert [1, 2] in data['edges'] and [2, 3] in data['edges']
+    assert len(backend.data_manager.history) == 2
+    assert not backend.persistence.flush()
+    assert os.listdir(tmp_path) == ["lane-0.npy"]
+
+
+def test_update_path_geometry_is_one_undo_step(dm):
+    before = dm.nodes.copy()
+    assert dm.update_path_geometry([1, 0, 99], [[10.0, 5.0], [1.0, 1.0], [7.0, 7.0]], [0.5, 0.25, 9.0]) == 2
+    assert dm.nodes[:, 1:4].tolist() == [[1.0, 1.0, 0.25], [10.0, 5.0, 0.5]]
+    dm.undo()
+    assert np.array_equal(dm.nodes, before)
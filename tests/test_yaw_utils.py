@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def dm(make_manager):
+    # 0 -> 1 -> 2 going +x, with a branch 1 -> 3 going +y and an isolated node 4
+    nodes = np.array([
+        [0, 0.0, 0.0, 9.0, 0, 0, 0],
+        [1, 1.0, 0.0, 9.0, 0, 0, 0],
+        [2, 2.0, 0.0, 9.0, 0, 0, 0],
+        [3, 1.0, 1.0, 9.0, 0, 0, 0],
+        [4, 5.0, 5.0, 9.0, 0, 0, 0],
+    ])
+    edges = np.array([[0, 1], [1, 2], [1, 3]])
+    return make_manager(nodes, edges)
+
+
+def test_reverse_long_path_updates_all_yaws(make_manager, chain_graph):
+    n = 5000
+    dm = make_manager(*chain_graph(length=n))
+    dm.reverse_path(list(range(n)))
+    assert np.allclose(dm.nodes[1:, 3], np.pi)
+    dm.undo()
+    assert np.allclose(dm.nodes[:, 3], 0.0)
+
+
+def test_later_pairs_win_for_same_source(dm):
+    with dm._recording():
+        dm._update_yaws([(1, 2), (1, 3), (7, 0)])
+    assert np.isclose(dm.nodes[1, 3], np.pi / 2)
+
+
+def test_recompute_all_yaws(dm):
+    assert dm.recompute_all_yaws() == 4
+    yaws = dm.nodes[:, 3]
+    # Branching node 1 follows its first out-edge; ends follow their in-edge
+    assert np.allclose(yaws[:4], [0.0, 0.0, 0.0, np.pi / 2])
+    assert yaws[4] == 9.0
+
+    dm.undo()
+    assert np.all(dm.nodes[:, 3] == 9.0)
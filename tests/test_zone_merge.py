@@ -0,0 +1,22 @@
+import numpy as np
+
+from utils.data_manager import DataManager
+
+
+def test_merge_connected_lanes_is_transitive_and_undoable():
+    # Zones 3-2 and 2-1 are linked (1 via a chain), zone 0 stays on its own
+    nodes = np.zeros((6, 7))
+    nodes[:, 0] = np.arange(6)
+    nodes[:, 4] = [0, 1, 2, 2, 3, 3]
+    edges = np.array([[4, 3], [2, 1], [5, 4]])
+    names = ["lane-0.npy", "lane-1.npy", "lane-2.npy", "lane-3.npy"]
+    dm = DataManager(nodes.copy(), edges, list(names))
+
+    assert dm.merge_connected_lanes() == ["lane-3.npy", "lane-2.npy"]
+    assert dm.nodes[:, 4].tolist() == [0, 1, 1, 1, 1, 1]
+    assert dm.file_names == ["lane-0.npy", "lane-1.npy", None, None]
+    assert dm.merge_connected_lanes() == []
+
+    dm.undo()
+    assert np.array_equal(dm.nodes, nodes)
+    assert dm.file_names == names
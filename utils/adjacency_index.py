@@ -0,0 +1,84 @@
+import numpy as np
+
+
+class AdjacencyIndex:
+    """Forward and reverse adjacency lists over an edges array.
+
+    Owned by DataManager next to NodeIndex. Edge appends and deletes are
+    applied incrementally; undo/redo and wholesale replacement of the edges
+    array invalidate it and the next query rebuilds it in O(E). Neighbor
+    lists keep the order of the edge rows, so BFS over the index visits
+    nodes in the same order as the per-call dicts it replaces.
+    """
+
+    def __init__(self):
+        self._out = {}
+        self._in = {}
+        self._both = {}
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def rebuild(self, edges):
+        self._out, self._in, self._both = {}, {}, {}
+        self.valid = True
+        self.add(edges)
+
+    def add(self, edges):
+        """Add (from_id, to_id) rows. No-op while invalid."""
+        if not self.valid:
+            return
+        for u, v in _pairs(edges):
+            self._out.setdefault(u, []).append(v)
+            self._in.setdefault(v, []).append(u)
+            self._both.setdefault(u, []).append(v)
+            self._both.setdefault(v, []).append(u)
+
+    def remove(self, edges):
+        """Remove one occurrence of each (from_id, to_id) row. No-op while invalid."""
+        if not self.valid:
+            return
+        for u, v in _pairs(edges):
+            _discard(self._out, u, v)
+            _discard(self._in, v, u)
+            _discard(self._both, u, v)
+            _discard(self._both, v, u)
+
+    def successors(self, point_id):
+        return self._out.get(int(point_id), [])
+
+    def predecessors(self, point_id):
+        return self._in.get(int(point_id), [])
+
+    def neighbors(self, point_id):
+        """Nodes connected to point_id in either direction."""
+        return self._both.get(int(point_id), [])
+
+    def has_edge(self, from_id, to_id):
+        return int(to_id) in self._out.get(int(from_id), [])
+
+    def __contains__(self, point_id):
+        try:
+            return int(point_id) in self._both
+        except (TypeError, ValueError):
+            return False
+
+
+def _pairs(edges):
+    edges = np.asarray(edges)
+    if edges.size == 0:
+        return []
+    return map(tuple, edges.reshape(-1, 2).astype(np.int64).tolist())
+
+
+def _discard(adj, key, value):
+    targets = adj.get(key)
+    if targets is None:
+        return
+    try:
+        targets.remove(value)
+    except ValueError:
+        return
+    if not targets:
+        del adj[key]
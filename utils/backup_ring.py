@@ -0,0 +1,220 @@
+"""Ring of incremental restore points behind DataManager's autosave backup.
+
+Every ``snapshot_every``-th restore point is a full ``graph.npz`` container
+(see graph_container); the points in between are small compressed delta
+files describing the new state as runs of rows copied from the previous
+point plus the rows that are new or changed. Disk usage and write time of
+a delta therefore follow the size of the edit, and restoring any point
+replays at most ``snapshot_every - 1`` deltas. Only whole chains (a base
+and its deltas) are deleted, so at least ``keep`` restore points are kept.
+
+Usage:
+    python -m utils.backup_ring <backup dir>                        # list restore points
+    python -m utils.backup_ring <backup dir> <seq> <out graph.npz>  # restore one
+"""
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from utils.graph_container import load_graph, save_graph
+
+DELTA_FORMAT = "lane-graph-delta"
+DELTA_VERSION = 1
+
+_POINT_RE = re.compile(r"^point_(\d{6})_(base|delta)\.npz$")
+
+
+class BackupRing:
+    """Writes and restores numbered restore points in ``directory``."""
+
+    def __init__(self, directory="workspace-Backup", keep=20, snapshot_every=10):
+        self.directory = directory
+        self.keep = max(1, int(keep))
+        self.snapshot_every = max(1, int(snapshot_every))
+        # State of the newest point this process wrote; deltas are taken against it
+        self._prev = None
+        self._prev_seq = None
+        self._chain_length = 0
+
+    def points(self):
+        """Restore points on disk, oldest first.
+
+        Returns:
+            list of (seq, kind, mtime) with kind "base" or "delta".
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        points = []
+        for name in os.listdir(self.directory):
+            match = _POINT_RE.match(name)
+            if match:
+                mtime = os.path.getmtime(os.path.join(self.directory, name))
+                points.append((int(match.group(1)), match.group(2), mtime))
+        return sorted(points)
+
+    def write(self, nodes, edges, file_names):
+        """Add a restore point for the given state. Returns its path."""
+        nodes, edges = _rows(nodes, 7), _rows(edges, 2)
+        os.makedirs(self.directory, exist_ok=True)
+        existing = self.points()
+        seq = existing[-1][0] + 1 if existing else 0
+
+        # Start a new chain when there is nothing on disk to take a delta against
+        if self._chain_length >= self.snapshot_every or not existing or existing[-1][0] != self._prev_seq:
+            path = save_graph(self._path(seq, "base"), nodes, edges, file_names)
+            self._chain_length = 1
+        else:
+            prev_nodes, prev_edges = self._prev
+            header = {
+                "format": DELTA_FORMAT,
+                "version": DELTA_VERSION,
+                "parent": seq - 1,
+                "n_nodes": int(nodes.shape[0]),
+                "n_edges": int(edges.shape[0]),
+                "file_names": list(file_names) if file_names is not None else None,
+                "time": time.time(),
+            }
+            arrays = {"header": np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)}
+            arrays.update(_diff(prev_nodes, nodes, "nodes_"))
+            arrays.update(_diff(prev_edges, edges, "edges_"))
+            path = self._path(seq, "delta")
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp_path, path)
+            self._chain_length += 1
+
+        self._prev = (nodes.copy(), edges.copy())
+        self._prev_seq = seq
+        self._prune()
+        return path
+
+    def restore(self, seq):
+        """Rebuild the state of restore point ``seq``.
+
+        Returns:
+            tuple: (nodes, edges, file_names)
+        """
+        points = {s: kind for s, kind, _ in self.points()}
+        bases = [s for s, kind in points.items() if kind == "base" and s <= seq]
+        if seq not in points or not bases:
+            raise ValueError(f"Restore point {seq} not found in {self.directory}")
+        base = max(bases)
+
+        nodes, edges, file_names = load_graph(self._path(base, "base"))
+        nodes, edges = _rows(nodes, 7), _rows(edges, 2)
+        for s in range(base + 1, seq + 1):
+            if points.get(s) != "delta":
+                raise ValueError(f"Restore point {s} is missing; cannot rebuild {seq}")
+            with np.load(self._path(s, "delta")) as data:
+                header = json.loads(bytes(data["header"]).decode())
+                if header.get("format") != DELTA_FORMAT or header.get("parent") != s - 1:
+                    raise ValueError(f"Restore point {s} is not a delta of {s - 1}")
+                nodes = _apply(nodes, data, "nodes_", header["n_nodes"])
+                edges = _apply(edges, data, "edges_", header["n_edges"])
+                file_names = header["file_names"]
+
+        nodes = nodes if nodes.size else np.array([])
+        edges = edges if edges.size else np.array([])
+        return nodes, edges, file_names
+
+    def _path(self, seq, kind):
+        return os.path.join(self.directory, f"point_{seq:06d}_{kind}.npz")
+
+    def _prune(self):
+        points = self.points()
+        if len(points) <= self.keep:
+            return
+        oldest_kept = points[-self.keep][0]
+        # The chain holding the oldest kept point has to stay whole
+        first_needed = max(s for s, kind, _ in points if kind == "base" and s <= oldest_kept)
+        for s, kind, _ in points:
+            if s < first_needed:
+                try:
+                    os.remove(self._path(s, kind))
+                except OSError as e:
+                    print(f"Could not remove old backup {s}: {e}")
+
+
+def _rows(arr, width):
+    arr = np.asarray(arr)
+    return arr.reshape(-1, arr.shape[-1]) if arr.size else np.zeros((0, width))
+
+
+def _row_hash(rows):
+    """64-bit hash of each row's values, used to find rows that survived an edit."""
+    bits = np.ascontiguousarray(rows, dtype=np.float64).view(np.uint64)
+    h = np.zeros(rows.shape[0], dtype=np.uint64)
+    for col in bits.T:
+        h = (h ^ col) * np.uint64(0x100000001B3)
+    return h
+
+
+def _diff(prev, cur, prefix):
+    """Describe cur as runs of rows copied from prev plus literal rows.
+
+    runs is (K, 3) of [cur_start, prev_start, length]; literal_pos are the
+    rows of cur not covered by a run and literal their values.
+    """
+    n, n_prev = cur.shape[0], prev.shape[0]
+    src = np.full(n, -1, dtype=np.int64)
+    if n_prev and n and prev.shape[1] == cur.shape[1]:
+        # Unchanged head and tail line up directly; only the middle is hashed
+        m = min(n, n_prev)
+        same = (prev[:m] == cur[:m]).all(axis=1)
+        head = m if same.all() else int(np.argmin(same))
+        same = (prev[n_prev - m:] == cur[n - m:]).all(axis=1)[::-1]
+        tail = min(m - head, m if same.all() else int(np.argmin(same)))
+        src[:head] = np.arange(head)
+        src[n - tail:] = np.arange(n_prev - tail, n_prev)
+
+        mid_prev, mid_cur = prev[head:n_prev - tail], cur[head:n - tail]
+        if len(mid_prev) and len(mid_cur):
+            prev_hash, cur_hash = _row_hash(mid_prev), _row_hash(mid_cur)
+            order = np.argsort(prev_hash, kind="stable")
+            sorted_hash = prev_hash[order]
+            pos = np.minimum(np.searchsorted(sorted_hash, cur_hash), len(order) - 1)
+            candidate = order[pos]
+            hit = np.flatnonzero(sorted_hash[pos] == cur_hash)
+            # Hash matches are confirmed against the actual values
+            hit = hit[(mid_prev[candidate[hit]] == mid_cur[hit]).all(axis=1)]
+            src[head + hit] = head + candidate[hit]
+
+    copied = src >= 0
+    cont = np.zeros(n, dtype=bool)
+    cont[1:] = copied[1:] & copied[:-1] & (src[1:] == src[:-1] + 1)
+    starts = np.flatnonzero(copied & ~cont)
+    run_id = np.cumsum(copied & ~cont)[copied] - 1
+    runs = np.column_stack([starts, src[starts], np.bincount(run_id, minlength=len(starts))])
+    literal_pos = np.flatnonzero(~copied)
+    return {prefix + "runs": runs.astype(np.int64).reshape(-1, 3),
+            prefix + "literal_pos": literal_pos,
+            prefix + "literal": cur[literal_pos]}
+
+
+def _apply(prev, data, prefix, n):
+    literal = data[prefix + "literal"]
+    width = literal.shape[1] if literal.ndim == 2 and literal.shape[1] else prev.shape[1]
+    out = np.empty((n, width), dtype=np.result_type(prev, literal))
+    for cur_start, prev_start, length in data[prefix + "runs"].tolist():
+        out[cur_start:cur_start + length] = prev[prev_start:prev_start + length]
+    out[data[prefix + "literal_pos"]] = literal
+    return out
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 4):
+        print(__doc__)
+        sys.exit(1)
+    ring = BackupRing(sys.argv[1])
+    if len(sys.argv) == 2:
+        for seq, kind, mtime in ring.points():
+            print(f"{seq:6d}  {kind:5s}  {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(mtime))}")
+    else:
+        nodes, edges, file_names = ring.restore(int(sys.argv[2]))
+        save_graph(sys.argv[3], nodes, edges, file_names)
+        print(f"Restored point {sys.argv[2]} ({len(nodes)} nodes, {len(edges)} edges) to {sys.argv[3]}")
@@ -0,0 +1,141 @@
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from utils.row_buffer import RowBuffer
+
+
+class ComponentTracker:
+    """Disjoint-set forest over node rows giving the graph's connected components.
+
+    Owned by DataManager next to NodeIndex. Appended nodes and edges are
+    unioned in incrementally; deletes and undo/redo shift or drop rows, so
+    they just invalidate it and the next query rebuilds it in O(N + E).
+    Edges are undirected here and edges to unknown ids are ignored. Rows
+    sharing a point_id are one node and always end up in one component.
+    """
+
+    def __init__(self):
+        # Parent pointers live in a one-column RowBuffer so appends don't copy them
+        self._buffer = RowBuffer(width=1)
+        self._dangling = False
+        self.valid = False
+
+    @property
+    def _parent(self):
+        view = self._buffer.view
+        return view[:, 0] if view.ndim == 2 else np.array([], dtype=np.int64)
+
+    @_parent.setter
+    def _parent(self, value):
+        self._buffer.adopt(np.asarray(value, dtype=np.int64).reshape(-1, 1))
+
+    def invalidate(self):
+        self.valid = False
+
+    def rebuild(self, nodes, edges, index):
+        n = 0 if nodes.size == 0 else nodes.shape[0]
+        if n == 0:
+            self._parent = np.array([], dtype=np.int64)
+            self._dangling = edges.size > 0
+            self.valid = True
+            return
+
+        # Edges plus links from duplicate-id rows to the first row with that id
+        rows = np.arange(n, dtype=np.int64)
+        first_rows = index.rows(nodes[:, 0])
+        src, dst, self._dangling = self._edge_rows(edges, index)
+        src = np.concatenate([src, rows])
+        dst = np.concatenate([dst, first_rows])
+
+        graph = coo_matrix((np.ones(src.size, dtype=np.int8), (src, dst)), shape=(n, n))
+        _, labels = connected_components(graph, directed=False)
+
+        # Point every row straight at the first row of its component
+        _, first = np.unique(labels, return_index=True)
+        self._parent = first[labels].astype(np.int64)
+        self.valid = True
+
+    def add_nodes(self, nodes, first_row, index):
+        """Register rows appended at first_row. No-op while invalid."""
+        if not self.valid:
+            return
+        if self._dangling:
+            # An earlier edge may reference one of these ids; let it rebuild
+            self.invalidate()
+            return
+        new_rows = np.arange(first_row, first_row + nodes.shape[0], dtype=np.int64)
+        self._buffer.extend(new_rows.reshape(-1, 1))
+        for row, first in zip(new_rows.tolist(), index.rows(nodes[:, 0]).tolist()):
+            if first >= 0 and first != row:
+                self._union(row, first)
+
+    def add_edges(self, edges, index):
+        """Union the endpoints of appended edges. No-op while invalid."""
+        if not self.valid:
+            return
+        src, dst, dangling = self._edge_rows(edges, index)
+        self._dangling = self._dangling or dangling
+        for u, v in zip(src.tolist(), dst.tolist()):
+            self._union(u, v)
+
+    def groups(self, nodes):
+        """Rows of each component, ordered by the smallest point_id in it.
+
+        Rows inside a group keep their order in ``nodes``.
+        """
+        if self._parent.size == 0:
+            return []
+        roots = self._roots()
+        # One stable argsort groups the rows by component
+        order = np.argsort(roots, kind='stable')
+        starts = np.flatnonzero(np.r_[True, np.diff(roots[order]) != 0])
+        groups = np.split(order, starts[1:])
+        min_ids = np.minimum.reduceat(nodes[order, 0], starts)
+        return [groups[i] for i in np.argsort(min_ids, kind='stable')]
+
+    def __len__(self):
+        """Number of components."""
+        if self._parent.size == 0:
+            return 0
+        return int(np.count_nonzero(self._roots() == np.arange(self._parent.size)))
+
+    def _roots(self):
+        # Pointer jumping until every row points at its root
+        parent = self._parent
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+        # Written in place so the buffer keeps its spare capacity
+        current = self._parent
+        current[:] = parent
+        return current
+
+    def _find(self, row):
+        parent = self._parent
+        while parent[row] != row:
+            parent[row] = parent[parent[row]]
+            row = parent[row]
+        return row
+
+    def _union(self, a, b):
+        ra, rb = self._find(a), self._find(b)
+        if ra != rb:
+            # The smaller row stays root so roots are stable across unions
+            if ra < rb:
+                self._parent[rb] = ra
+            else:
+                self._parent[ra] = rb
+
+    @staticmethod
+    def _edge_rows(edges, index):
+        if edges.size == 0:
+            empty = np.array([], dtype=np.int64)
+            return empty, empty, False
+        edges = edges.reshape(-1, 2)
+        src = index.rows(edges[:, 0])
+        dst = index.rows(edges[:, 1])
+        ok = (src >= 0) & (dst >= 0)
+        return src[ok], dst[ok], not ok.all()
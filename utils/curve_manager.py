@@ -42,14 +42,9 @@ class CurveManager:
             return
         points = np.array(self.draw_points)
         try:
-            previous_node_id = None
-            new_node_ids = []
-            for x, y in points:
-                new_node_id = self.data_manager.add_node(x, y, original_lane_id)
-                new_node_ids.append(new_node_id)
-                if previous_node_id is not None:
-                    self.data_manager.add_edge(previous_node_id, new_node_id)
-                previous_node_id = new_node_id
+            with self.data_manager.transaction():
+                new_node_ids = self.data_manager.add_nodes(points, original_lane_id)
+                self.data_manager.add_edges(list(zip(new_node_ids[:-1], new_node_ids[1:])))
             print(f"Finalized draw: Added {len(new_node_ids)} nodes and {len(new_node_ids) - 1} edges.")
         except Exception as e:
             print(f"Error finalizing draw: {e}")
@@ -69,30 +64,25 @@ class CurveManager:
 
     def _get_node_coords(self, point_id):
         """Helper to get (x, y) for a point_id."""
-        node_mask = (self.data_manager.nodes[:, 0] == point_id)
-        if np.any(node_mask):
-            return self.data_manager.nodes[node_mask][0, 1:3]  # [x, y]
+        row = self.data_manager.node_index.row(point_id)
+        if row is not None:
+            return self.data_manager.nodes[row, 1:3]  # [x, y]
         return None
 
     def _find_path(self, start_id, end_id):
         """Finds a path from start_id to end_id using bidirectional BFS.
         
-        This function constructs a bidirectional adjacency list from the edges in
-        self.data_manager. It performs a breadth-first search (BFS) to explore possible
+        This function walks the bidirectional adjacency that self.data_manager
+        keeps for its edges. It performs a breadth-first search (BFS) to explore possible
         paths from start_id to end_id. If a valid path is found, it returns a list of
         point_ids representing the path; otherwise, it returns None.
         """
         if self.data_manager.edges.size == 0:
             return None
 
-        # Create a bidirectional adjacency list
-        adj = {}
-        for from_id, to_id in self.data_manager.edges:
-            from_id, to_id = int(from_id), int(to_id)
-            adj.setdefault(from_id, []).append(to_id)
-            adj.setdefault(to_id, []).append(from_id) # Add the reverse edge
+        adjacency = self.data_manager.adjacency
 
-        if start_id not in adj:
+        if start_id not in adjacency:
             return None  # Start node has no connections
 
         queue = deque([(start_id, [start_id])])  # (current_node, path_to_node)
@@ -104,7 +94,7 @@ class CurveManager:
             if current_id == end_id:
                 return path  # Found the path
 
-            for neighbor_id in adj.get(current_id, []):
+            for neighbor_id in adjacency.neighbors(current_id):
                 if neighbor_id not in visited:
                     visited.add(neighbor_id)
                     new_path = path + [neighbor_id]
@@ -163,28 +153,12 @@ class CurveManager:
             print(f"Error: Point count mismatch. Path: {len(path_ids)}, Smoothed: {len(new_points_xy)}")
             return
 
-        # Update nodes in data_manager
-        nodes = self.data_manager.nodes
-        for i, point_id in enumerate(path_ids):
-            node_mask = (nodes[:, 0] == point_id)
-            if np.any(node_mask):
-                # Update x, y (cols 1, 2)
-                nodes[node_mask, 1:3] = new_points_xy[i]
-
-                # Update yaw (col 3)
-                if i < len(new_points_xy) - 1:  # Not the last point
-                    dx = new_points_xy[i + 1, 0] - new_points_xy[i, 0]
-                    dy = new_points_xy[i + 1, 1] - new_points_xy[i, 1]
-                    nodes[node_mask, 3] = np.arctan2(dy, dx)
-                else:
-                    # Last point: copy yaw from previous point
-                    if i > 0:
-                        prev_mask = (nodes[:, 0] == path_ids[i - 1])
-                        nodes[node_mask, 3] = nodes[prev_mask, 3]
-
-        # Save to history
-        self.data_manager.history.append((self.data_manager.nodes.copy(), self.data_manager.edges.copy()))
-        self.data_manager.redo_stack = []
+        # Yaw points at the next point; the last point keeps the previous heading
+        yaw = None
+        if len(new_points_xy) > 1:
+            yaw = np.arctan2(np.diff(new_points_xy[:, 1]), np.diff(new_points_xy[:, 0]))
+            yaw = np.append(yaw, yaw[-1])
+        self.data_manager.update_path_geometry(path_ids, new_points_xy, yaw)
 
         # Redraw the main plot
         self.plot_manager.selected_indices = []
@@ -270,23 +244,18 @@ class CurveManager:
         start_id = path_ids[0]
         end_id = path_ids[-1]
 
-        # Build bidirectional adjacency list
-        adj = {}
-        for from_id, to_id in self.data_manager.edges:
-            from_id, to_id = int(from_id), int(to_id)
-            adj.setdefault(from_id, []).append(to_id)
-            adj.setdefault(to_id, []).append(from_id)
+        adjacency = self.data_manager.adjacency
 
         # Find 'prev_point'
-        if start_id in adj:
-            for neighbor_id in adj[start_id]:
+        if start_id in adjacency:
+            for neighbor_id in adjacency.neighbors(start_id):
                 if neighbor_id != path_ids[1]:  # Not the next point in the path
                     prev_point = self._get_node_coords(neighbor_id)
                     break
 
         # Find 'next_point'
-        if end_id in adj:
-            for neighbor_id in adj[end_id]:
+        if end_id in adjacency:
+            for neighbor_id in adjacency.neighbors(end_id):
                 if neighbor_id != path_ids[-2]:  # Not the previous point in the path
                     next_point = self._get_node_coords(neighbor_id)
                     break
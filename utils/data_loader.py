@@ -1,55 +1,386 @@
+import itertools
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 
+from utils.extent import ExtentTracker, diameter
+from utils.graph_container import load_graph
+from utils.row_buffer import RowBuffer
+
+# Lane files are read concurrently; on network storage this hides per-file latency
+LOAD_WORKERS = 8
+
+# Rows per block when a trajectory file is ingested in chunks
+CHUNK_ROWS = 100_000
+
+LANE_EXTENSIONS = (".npy", ".csv")
+
+
+def load_array(path, mmap_mode=None):
+    """np.load, memory mapping the file when mmap_mode is given.
+
+    Arrays that cannot be mapped (e.g. pickled object arrays) are read
+    normally.
+    """
+    if mmap_mode:
+        try:
+            return np.load(path, mmap_mode=mmap_mode)
+        except ValueError:
+            pass
+    return np.load(path)
+
+
+def run_parallel(fn, items, max_workers=LOAD_WORKERS):
+    """Call fn(index, item) for every item in a bounded thread pool.
+
+    Results come back in input order, so callers see the same sequence a
+    plain loop would produce.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [fn(i, item) for i, item in enumerate(items)]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items)), thread_name_prefix="lane-loader") as pool:
+        return list(pool.map(fn, range(len(items)), items))
+
+
+def infer_zone(filename, default):
+    """Zone from the first number in a lane file name ('lane-99.npy' -> 99), else default."""
+    match = re.search(r'(\d+)', filename)
+    return int(match.group(1)) if match else default
+
+
+def migrate_node_columns(nodes):
+    """Pad nodes saved in the old 5-column layout to 7 columns (width and indicator = 0)."""
+    if nodes.size > 0 and nodes.shape[1] == 5:
+        print("Migrating nodes from 5 columns to 7 columns...")
+        # Existing col 4 is original_lane_id which maps to zone
+        nodes = np.hstack([nodes, np.zeros((nodes.shape[0], 2))])
+    return nodes
+
+
+def lane_nodes(points, zone, keep_saved_zone=False, raw_yaw=True):
+    """Node rows for one lane file, with local point_ids 0..N-1.
+
+    Files with 7+ columns are edited temp lanes and keep their attributes;
+    their zone is replaced by ``zone`` unless keep_saved_zone. Raw files map
+    x, y and, if present and raw_yaw, yaw. Returns None if the file has no
+    usable points. chain_lanes turns a list of these into the graph.
+    """
+    if points.size == 0:
+        return None
+    if len(points.shape) == 1:
+        points = points.reshape(-1, points.shape[0])
+    if points.shape[1] < 2:
+        return None
+
+    # Nodes: [point_id, x, y, yaw, zone, width, indicator]
+    nodes = np.zeros((points.shape[0], 7))
+    if points.shape[1] >= 7:
+        # Loaded from a temp file (edited data): copy all attributes
+        nodes[:, :] = points[:, 0:7]
+        if not keep_saved_zone:
+            nodes[:, 4] = zone
+    else:
+        nodes[:, 1:3] = points[:, 0:2]
+        if raw_yaw and points.shape[1] >= 3:
+            nodes[:, 3] = points[:, 2]  # Yaw
+        # width (col 5) and indicator (col 6) stay 0
+        nodes[:, 4] = zone
+    nodes[:, 0] = np.arange(points.shape[0])
+    return nodes
+
+
+def arc_length(xy):
+    """Cumulative distance along a polyline of (N, 2) points, starting at 0."""
+    steps = np.hypot(*np.diff(xy, axis=0).T) if len(xy) > 1 else np.zeros(0)
+    return np.concatenate([[0.0], np.cumsum(steps)])
+
+
+def decimate_lane(nodes, min_spacing):
+    """Drop points of a lane that add less than min_spacing of travel.
+
+    Keeps the first point in every min_spacing-long stretch of arc length,
+    so a stationary stretch of a recording collapses to one point. The
+    first and last points are always kept.
+    """
+    if min_spacing is None or min_spacing <= 0 or len(nodes) < 3:
+        return nodes
+    bins = np.floor(arc_length(nodes[:, 1:3]) / min_spacing)
+    keep = np.ones(len(nodes), dtype=bool)
+    keep[1:] = bins[1:] != bins[:-1]
+    keep[-1] = True
+    return nodes[keep]
+
+
+def resample_lane(nodes, spacing):
+    """Resample a lane to points every ``spacing`` of arc length.
+
+    x, y are interpolated along the polyline and yaw on the unwrapped
+    angle, so headings near +/-pi do not swing through 0. Zone, width and
+    indicator come from the original point just before each sample. The
+    last point is kept so the lane keeps its length.
+    """
+    if spacing is None or spacing <= 0 or len(nodes) < 2:
+        return nodes
+    s = arc_length(nodes[:, 1:3])
+    # np.interp needs increasing samples: zero-length steps add nothing
+    moving = np.ones(len(nodes), dtype=bool)
+    moving[1:] = np.diff(s) > 0
+    nodes, s = nodes[moving], s[moving]
+    if len(nodes) < 2:
+        return nodes
+
+    targets = np.arange(0.0, s[-1], spacing)
+    if s[-1] - targets[-1] > 1e-9:
+        targets = np.append(targets, s[-1])
+    out = nodes[np.searchsorted(s, targets, side="right") - 1]
+    out[:, 1] = np.interp(targets, s, nodes[:, 1])
+    out[:, 2] = np.interp(targets, s, nodes[:, 2])
+    yaw = np.interp(targets, s, np.unwrap(nodes[:, 3]))
+    out[:, 3] = (yaw + np.pi) % (2 * np.pi) - np.pi
+    out[:, 0] = np.arange(len(out))
+    return out
+
+
+def read_chunks(path, chunk_rows=CHUNK_ROWS):
+    """Yield the rows of a trajectory file in (k, C) blocks of at most chunk_rows.
+
+    .npy files are memory mapped and sliced, so one block at a time is in
+    RAM. CSV files (e.g. vehicle_data.csv from analysis/recording/record_ros.py)
+    are parsed block by block; with a header row the x, y and yaw columns
+    are picked by name, otherwise the columns are used as they are.
+    """
+    if path.endswith(".csv"):
+        yield from _read_csv_chunks(path, chunk_rows)
+        return
+    arr = load_array(path, "r")
+    if arr.ndim == 1:
+        arr = arr.reshape(1, -1) if arr.size else arr.reshape(0, 0)
+    for start in range(0, arr.shape[0], chunk_rows):
+        yield np.array(arr[start:start + chunk_rows], dtype=float)
+
+
+def _read_csv_chunks(path, chunk_rows):
+    with open(path, newline="") as f:
+        first = f.readline()
+        fields = [name.strip().lower() for name in first.split(",")]
+        try:
+            float(fields[0])
+            columns, pending = None, [first]
+        except ValueError:
+            if "x" not in fields or "y" not in fields:
+                raise ValueError(f"{path}: header has no x/y columns")
+            columns, pending = [fields.index(name) for name in ("x", "y", "yaw") if name in fields], []
+        while True:
+            lines = pending + list(itertools.islice(f, chunk_rows - len(pending)))
+            pending = []
+            if not lines:
+                return
+            lines = [line for line in lines if line.strip()]
+            if lines:
+                block = np.loadtxt(lines, delimiter=",", ndmin=2)
+                yield block[:, columns] if columns else block
+
+
+def decimate_chunks(chunks, min_spacing):
+    """decimate_lane over a stream of node blocks; keeps exactly the same points.
+
+    The arc length and bin reached so far carry over from block to block,
+    and a block's last point is held back until it is known whether it is
+    the lane's last point.
+    """
+    if min_spacing is None or min_spacing <= 0:
+        yield from chunks
+        return
+    last_xy, s0, last_bin, tail = None, 0.0, None, None
+    for nodes in chunks:
+        if not len(nodes):
+            continue
+        xy = nodes[:, 1:3]
+        s = arc_length(xy) if last_xy is None else s0 + arc_length(np.vstack([last_xy, xy]))[1:]
+        bins = np.floor(s / min_spacing)
+        keep = np.empty(len(nodes), dtype=bool)
+        keep[0] = last_bin is None or bins[0] != last_bin
+        keep[1:] = bins[1:] != bins[:-1]
+        last_xy, s0, last_bin = xy[-1].copy(), s[-1], bins[-1]
+        tail = None if keep[-1] else nodes[-1:].copy()
+        yield nodes[keep]
+    if tail is not None:
+        yield tail
+
+
+def resample_chunks(chunks, spacing):
+    """resample_lane over a stream of node blocks.
+
+    Each block is interpolated together with the last point of the block
+    before it, so samples that fall between two blocks come out the same as
+    for the whole lane. Yaw is unwrapped continuously across blocks.
+    """
+    if spacing is None or spacing <= 0:
+        yield from chunks
+        return
+    prev, s0, k = None, 0.0, 0  # last point (unwrapped yaw), its arc length, next sample index
+    for nodes in chunks:
+        if not len(nodes):
+            continue
+        window = nodes if prev is None else np.vstack([prev, nodes])
+        s = s0 + arc_length(window[:, 1:3])
+        moving = np.ones(len(window), dtype=bool)
+        moving[1:] = np.diff(s) > 0
+        window, s = window[moving], s[moving]
+        yaw = np.unwrap(window[:, 3])
+
+        # Samples strictly before this block's end; one on the end belongs to the next block
+        k_end = max(k, int(np.ceil(s[-1] / spacing)))
+        targets = np.arange(k, k_end) * spacing
+        if len(targets):
+            out = window[np.searchsorted(s, targets, side="right") - 1]
+            out[:, 1] = np.interp(targets, s, window[:, 1])
+            out[:, 2] = np.interp(targets, s, window[:, 2])
+            out[:, 3] = (np.interp(targets, s, yaw) + np.pi) % (2 * np.pi) - np.pi
+            yield out
+        k = k_end
+        prev = window[-1:].copy()
+        prev[0, 3] = yaw[-1]
+        s0 = s[-1]
+
+    # The last point is kept so the lane keeps its length
+    if prev is not None and (k == 0 or s0 - (k - 1) * spacing > 1e-9):
+        prev[0, 3] = (prev[0, 3] + np.pi) % (2 * np.pi) - np.pi
+        yield prev
+
+
+def ingest_lane(path, zone, chunk_rows=CHUNK_ROWS, min_spacing=None, spacing=None):
+    """Stream one trajectory file into node rows with bounded peak memory.
+
+    Pipeline: read_chunks -> lane_nodes -> decimate_chunks -> resample_chunks
+    -> append to a RowBuffer, so only the kept rows plus a block or two are
+    ever in memory. Edited temp lanes (7+ columns) are only copied.
+
+    Returns:
+        tuple: (number of raw rows read, nodes (N, 7) with local ids or None)
+    """
+    chunks = read_chunks(path, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        return 0, None
+    raw_count = 0
+
+    def node_chunks():
+        nonlocal raw_count
+        for points in itertools.chain([first], chunks):
+            raw_count += len(points)
+            nodes = lane_nodes(points, zone)
+            if nodes is not None:
+                yield nodes
+
+    stream = node_chunks()
+    if first.shape[1] < 7:
+        stream = resample_chunks(decimate_chunks(stream, min_spacing), spacing)
+    buffer = RowBuffer(width=7, min_capacity=min(chunk_rows, 4096))
+    for nodes in stream:
+        buffer.extend(nodes)
+    if not len(buffer):
+        return raw_count, None
+    nodes = buffer.view
+    nodes[:, 0] = np.arange(len(nodes))
+    return raw_count, nodes
+
+
+def chain_lanes(lanes, start_id=0):
+    """Lay lanes out one after another with global ids and chain each lane with edges.
+
+    Ids are assigned in one prefix-sum pass in list order: lane k gets
+    start_id + sum(len(lanes[:k])) onwards, exactly as a sequential
+    per-file counter would.
+
+    Returns:
+        tuple: (nodes (N, 7), edges (E, 2) int array)
+    """
+    if not lanes:
+        return np.array([]), np.array([])
+    nodes = np.vstack(lanes)
+    ids = start_id + np.arange(nodes.shape[0])
+    nodes[:, 0] = ids
+
+    # Consecutive points are linked except across a lane boundary
+    link = np.ones(max(nodes.shape[0] - 1, 0), dtype=bool)
+    boundaries = np.cumsum([len(lane) for lane in lanes])[:-1]
+    link[boundaries - 1] = False
+    edges = np.column_stack([ids[:-1][link], ids[1:][link]]).astype(int)
+    return nodes, edges
+
 
 class DataLoader:
-    def __init__(self, directory, file_order=None):
+    def __init__(self, directory, file_order=None, mmap=True, spacing=None, min_spacing=None, chunk_rows=None):
         """
-        directory   : folder containing .npy files
+        directory   : folder containing .npy (or trajectory .csv) files
         file_order  : optional list of filenames (or partial names) to enforce order
+        mmap        : memory map .npy files instead of reading them into RAM
+        spacing     : resample raw lanes to one point per this much arc length
+        min_spacing : drop raw points closer than this (along the lane) to the last kept one
+        chunk_rows  : stream every file in blocks of this many rows (see ingest_lane);
+                      .csv files are always streamed
         """
         if not os.path.isdir(directory):
             raise ValueError(f"Directory does not exist: {directory}")
         self.directory = directory
         self.D = 1.0  # Initialize D to 1.0 default
         self.file_order = file_order
+        self.mmap = mmap
+        self.spacing = spacing
+        self.min_spacing = min_spacing
+        self.chunk_rows = chunk_rows
+        self.reduction = (0, 0)  # (raw, kept) point counts of the last load
+        # Convex hull of every loaded raw lane and saved graph, so D follows loads and unloads
+        self.extent = ExtentTracker()
 
-    def load_graph_data(self, nodes_path, edges_path):
+    def load_graph_data(self, nodes_path, edges_path=None):
         """
         Loads existing graph state (nodes and edges) from specific paths.
         Distinguishes between raw point data and processed graph data.
+
+        nodes_path may also be a graph container (.npz), in which case
+        edges_path is ignored.
         """
         nodes = np.array([])
         edges = np.array([])
         file_names = []
         D = 1.0
 
-        if os.path.exists(nodes_path) and os.path.exists(edges_path):
-            print(f"Loading saved working files from:\n  {nodes_path}\n  {edges_path}")
+        is_container = nodes_path.endswith(".npz")
+        if os.path.exists(nodes_path) and (is_container or (edges_path and os.path.exists(edges_path))):
+            print(f"Loading saved working files from:\n  {nodes_path}\n  {edges_path or ''}")
             try:
-                nodes = np.load(nodes_path)
-                edges = np.load(edges_path)
+                saved_names = None
+                if is_container:
+                    nodes, edges, saved_names = load_graph(nodes_path)
+                else:
+                    # Copy-on-write maps: pages are read on demand and only the ones
+                    # that get edited are copied into private memory
+                    mode = "c" if self.mmap else None
+                    nodes = load_array(nodes_path, mode)
+                    edges = load_array(edges_path, mode)
 
                 # Migration: If nodes has 5 columns, pad to 7 columns
-                if nodes.size > 0 and nodes.shape[1] == 5:
-                    print("Migrating nodes from 5 columns to 7 columns...")
-                    # New columns: width (col 5), indicator (col 6) initialized to 0
-                    # Existing col 4 is original_lane_id which maps to zone
-                    padding = np.zeros((nodes.shape[0], 2))
-                    nodes = np.hstack([nodes, padding])
+                nodes = migrate_node_columns(nodes)
 
                 # Calculate basic D (Max Euclidean distance) from saved data
                 if nodes.size > 0:
-                    p2d = nodes[:, 1:3]  # x, y columns
-                    # vectorized distance calculation
-                    dists = np.sqrt(((p2d[:, None] - p2d[None, :]) ** 2).sum(axis=-1))
-                    D = np.max(dists) if dists.size > 0 else 1.0
+                    D = diameter(nodes[:, 1:3])  # x, y columns
+                    # Tracked like a lane so later lane loads and unloads keep it in D
+                    self.extent.add(("saved graph", nodes_path), nodes[:, 1:3])
 
-                    # Reconstruct file names based on unique lane IDs (col 4 - zone)
-                    unique_lanes = np.unique(nodes[:, 4]).astype(int)
-                    # We assume names are generic since original filenames aren't saved in the numpy array
-                    file_names = [f"Edited Lane {i}" for i in unique_lanes]
+                    if saved_names is not None:
+                        # The container records the zone -> file name list
+                        file_names = saved_names
+                    else:
+                        # Reconstruct file names based on unique lane IDs (col 4 - zone)
+                        unique_lanes = np.unique(nodes[:, 4]).astype(int)
+                        # We assume names are generic since original filenames aren't saved in the numpy array
+                        file_names = [f"Edited Lane {i}" for i in unique_lanes]
 
                 print(f"Loaded edited data: {len(nodes)} nodes.")
             except Exception as e:
@@ -59,11 +390,14 @@ class DataLoader:
         else:
             print("No working files found (graph_nodes/edges).")
 
-        self.D = D  # Update local D
+        self.D = max(1.0, self.extent.diameter)
         return nodes, edges, file_names, D
 
     def load_data(self, specific_files=None, start_id=0):
-        """Load and process RAW .npy files from the specified directory.
+        """Load and process RAW .npy files (and trajectory .csv files) from the specified directory.
+
+        With chunk_rows set, and always for .csv, files are streamed in
+        blocks through ingest_lane instead of being read whole.
         
         This function retrieves all .npy files from the directory specified by
         `self.directory` or uses a user-provided list of specific files. It processes
@@ -89,9 +423,9 @@ class DataLoader:
             if len(files) != len(specific_files):
                 print("Warning: Some specified files were not found.")
         else:
-            all_files = [f for f in os.listdir(self.directory) if f.endswith('.npy')]
+            all_files = [f for f in os.listdir(self.directory) if f.endswith(LANE_EXTENSIONS)]
             if not all_files:
-                print(f"No .npy files found in directory: {self.directory}")
+                print(f"No lane files found in directory: {self.directory}")
                 return np.array([]), np.array([]), []
 
             if self.file_order:
@@ -100,93 +434,72 @@ class DataLoader:
             else:
                 files = sorted(all_files)
 
-        nodes_list = []
-        edges_list = []
-        file_names = []
-
-        # Initialize counter with the provided start_id
-        point_id_counter = start_id
-
-        for lane_idx, file in enumerate(files):
-            file_path = os.path.join(self.directory, file)
+        # Read and preprocess files in parallel; zone is the file's position in the list
+        def read(lane_idx, file):
+            path = os.path.join(self.directory, file)
             try:
-                points = np.load(file_path)
-                if points.size == 0:
-                    continue
-
-                if len(points.shape) == 1:
-                    points = points.reshape(-1, points.shape[0])
-
-                if points.shape[1] < 2:
-                    continue
-
-                N = points.shape[0]
-
-                # Nodes: [point_id, x, y, yaw, zone, width, indicator]
-                nodes = np.zeros((N, 7))
-                edges = np.zeros((N - 1, 2), dtype=int)
-
-                current_lane_point_ids = []
-
-                if points.shape[1] >= 7:
-                    # Loaded from a temp file (edited data)
-                    # Copy all attributes
-                    nodes[:, :] = points[:, 0:7]
-                    # We still need to re-assign point_ids to ensure uniqueness in THIS session
-                    # But we keep other attributes (yaw, width, indicator)
-                    # NOTE: zone (col 4) might need to be updated to lane_idx if we want to enforce order?
-                    # But if we are reloading a specific file, we probably want to keep its identity.
-                    # However, the loader assigns lane_idx based on file order.
-                    # Let's overwrite zone with lane_idx to be consistent with how the app manages zones.
-                    nodes[:, 4] = lane_idx
-                else:
-                    # Raw data processing
-                    # Map X, Y
-                    nodes[:, 1:3] = points[:, 0:2]
-                    
-                    # Check if Yaw exists (3rd column)
-                    if points.shape[1] >= 3:
-                        nodes[:, 3] = points[:, 2] # Map Yaw
-                    
-                    # Map lane_idx to zone (col 4)
-                    nodes[:, 4] = lane_idx
-                    # width (col 5) and indicator (col 6) are 0 by default
-
-                # Assign globally unique point_ids starting from start_id
-                for i in range(N):
-                    new_id = point_id_counter + i
-                    nodes[i, 0] = new_id
-                    current_lane_point_ids.append(new_id)
-
-                for i in range(N - 1):
-                    edges[i, 0] = current_lane_point_ids[i]
-                    edges[i, 1] = current_lane_point_ids[i + 1]
-
-                nodes_list.append(nodes)
-                edges_list.append(edges)
-                file_names.append(file)
-
-                point_id_counter += N
-
+                if self.chunk_rows or file.endswith(".csv"):
+                    return ingest_lane(path, lane_idx, self.chunk_rows or CHUNK_ROWS, self.min_spacing, self.spacing)
+                points = load_array(path, "r" if self.mmap else None)
+                nodes = lane_nodes(points, lane_idx)
+                return (0 if nodes is None else len(nodes)), self.prepare_lane(nodes, points)
             except Exception as e:
                 print(f"Error loading file {file}: {e}")
-                continue
+                return 0, None
 
-        if not nodes_list:
+        results = run_parallel(read, files)
+        lanes = [nodes for _, nodes in results if nodes is not None]
+        file_names = [file for file, (_, nodes) in zip(files, results) if nodes is not None]
+        self.report_reduction(sum(raw for raw, nodes in results if nodes is not None),
+                              sum(len(nodes) for nodes in lanes))
+
+        if not lanes:
             print("No valid data loaded")
             return np.array([]), np.array([]), []
 
-        all_nodes = np.vstack(nodes_list)
-        all_edges = np.vstack(edges_list)
+        # Globally unique point_ids starting from start_id, in file order
+        all_nodes, all_edges = chain_lanes(lanes, start_id)
 
-        # Calculate D for raw data
-        if all_nodes.size > 0:
-            points_2d = all_nodes[:, 1:3]
-            distances = np.sqrt(((points_2d[:, None] - points_2d[None, :]) ** 2).sum(axis=-1))
-            current_D = np.max(distances) if distances.size > 0 else 1.0
-            self.D = max(self.D, current_D)
+        # D for raw data: diameter of every lane loaded so far
+        self.add_lanes(file_names, lanes)
 
         self.file_order = file_names
         print(f"Loaded {len(file_names)} raw files, total nodes: {all_nodes.shape[0]}")
 
         return all_nodes, all_edges, file_names
+
+    @property
+    def reduces(self):
+        return bool(self.spacing) or bool(self.min_spacing)
+
+    def prepare_lane(self, nodes, points):
+        """Import stage for one lane: thin out a raw recording per min_spacing / spacing.
+
+        Edited temp lanes (7+ columns in points) are returned untouched, as
+        is everything when neither option is set.
+        """
+        if nodes is None or not self.reduces or points.ndim != 2 or points.shape[1] >= 7:
+            return nodes
+        nodes = decimate_lane(nodes, self.min_spacing)
+        return resample_lane(nodes, self.spacing)
+
+    def report_reduction(self, before, after):
+        """Record and print how many of `before` raw points the import stage kept."""
+        self.reduction = (before, after)
+        if self.reduces and before:
+            print(f"Import resampling kept {after} of {before} points ({after / before:.1%})")
+        return self.reduction
+
+    def add_lanes(self, file_names, lanes):
+        """Track newly loaded lanes (node arrays) and grow D to cover them."""
+        for name, nodes in zip(file_names, lanes):
+            self.extent.add(name, nodes[:, 1:3])
+        self.D = max(1.0, self.extent.diameter)
+        return self.D
+
+    def remove_lanes(self, file_names):
+        """Forget unloaded raw lanes and shrink D to what is still loaded."""
+        for name in file_names:
+            self.extent.remove(name)
+        self.D = max(1.0, self.extent.diameter)
+        return self.D
@@ -1,36 +1,223 @@
-import math
+import hashlib
 import os
-import pickle
 import time
+from contextlib import contextmanager
 
-import networkx as nx
 import numpy as np
-import json
-from networkx.readwrite import json_graph
+
+from utils.adjacency_index import AdjacencyIndex
+from utils.backup_ring import BackupRing
+from utils.component_tracker import ComponentTracker
+from utils.graph_container import GRAPH_FILE, build_networkx_graph, save_graph, write_exports
+from utils.history_journal import HistoryDelta, HistoryJournal
+from utils.node_index import NodeIndex
+from utils.persistence_worker import WriteJob
+from utils.row_buffer import RowBuffer
+from utils.yaw_utils import all_yaws, edge_yaws, last_per_row
 
 
 class DataManager:
-    def __init__(self, nodes, edges, file_names):
-        self.nodes = nodes
-        self.edges = edges
+    def __init__(self, nodes, edges, file_names, history_memory_limit=256 * 1024 * 1024, id_floor=0):
+        self._node_index = NodeIndex()
+        self._adjacency = AdjacencyIndex()
+        self._components = ComponentTracker()
+        self._edit = None
+        self._in_transaction = False
+        # Growable backing stores; self._nodes/self._edges are views of their live rows
+        self._node_buffer = RowBuffer(width=7)
+        self._edge_buffer = RowBuffer(width=2)
+        self._set_nodes(nodes)
+        self._set_edges(edges)
         self.file_names = file_names
 
+        # New point ids start at least here, e.g. past ids held by tiles that are not loaded
+        self.id_floor = id_floor
         self.sync_next_id()
 
-        self.history = [(self.nodes.copy(), self.edges.copy(), list(self.file_names))]
-        self.redo_stack = []
+        # Undo history beyond history_memory_limit bytes is paged out to a temp dir
+        self.history = HistoryJournal(self._nodes, self._edges, self.file_names,
+                                      memory_limit=history_memory_limit)
 
         self.last_backup = time.time()
         self.backup_interval = 300  # 5 minutes
+        # Base snapshots plus deltas; only the newest restore points are kept
+        self.backups = BackupRing("workspace-Backup")
+
+        # What save_temp_lanes last wrote: {filename: content digest} for _temp_lane_dir
+        self._temp_lane_dir = None
+        self._temp_lane_manifest = {}
 
         print(f"DataManager initialized with {len(self.nodes)} nodes and {len(self.edges)} edges.")
 
+    @property
+    def nodes(self):
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, value):
+        # Wholesale replacement from outside (client updates, tests) is journaled as a full swap
+        with self._recording() as edit:
+            edit.nodes.capture_full(self._nodes)
+            self._set_nodes(value)
+
+    @property
+    def edges(self):
+        return self._edges
+
+    @edges.setter
+    def edges(self, value):
+        with self._recording() as edit:
+            edit.edges.capture_full(self._edges)
+            self._set_edges(value)
+
+    @property
+    def node_index(self):
+        """Id -> row index over self.nodes, rebuilt lazily after bulk changes."""
+        if not self._node_index.valid:
+            self._node_index.rebuild(self._nodes)
+        return self._node_index
+
+    @property
+    def adjacency(self):
+        """Forward/reverse adjacency over self.edges, rebuilt lazily after undo/redo."""
+        if not self._adjacency.valid:
+            self._adjacency.rebuild(self._edges)
+        return self._adjacency
+
+    @property
+    def components(self):
+        """Connected components over node rows, rebuilt lazily after deletions."""
+        if not self._components.valid:
+            self._components.rebuild(self._nodes, self._edges, self.node_index)
+        return self._components
+
+    def _rows_for(self, point_ids):
+        """Rows of the given point ids that exist in self.nodes."""
+        if self._nodes.size == 0:
+            return np.array([], dtype=np.int64)
+        rows = self.node_index.rows(point_ids)
+        return rows[rows >= 0]
+
+    # --- Recorded mutations -------------------------------------------------
+    # Every change to nodes/edges goes through these helpers so the active
+    # history delta sees the rows before they are overwritten or dropped.
+
+    @contextmanager
+    def _recording(self):
+        """Collect all mutations in the block into one undoable history entry."""
+        if self._edit is not None:
+            yield self._edit
+            return
+        self._edit = HistoryDelta(self._nodes, self._edges, self.file_names)
+        try:
+            yield self._edit
+        finally:
+            edit, self._edit = self._edit, None
+            if edit.finish(self._nodes, self._edges, self.file_names):
+                self.history.push(edit, self._nodes, self._edges, self.file_names)
+
+    # --- Transactions ---------------------------------------------------------
+
+    def begin_transaction(self):
+        """Group all following edits into a single history entry until commit/rollback."""
+        if self._in_transaction:
+            raise RuntimeError("A transaction is already in progress")
+        if self._edit is not None:
+            raise RuntimeError("Cannot start a transaction while an edit is being recorded")
+        self._edit = HistoryDelta(self._nodes, self._edges, self.file_names)
+        self._in_transaction = True
+
+    def commit_transaction(self):
+        """Record everything since begin_transaction() as one undoable entry."""
+        if not self._in_transaction:
+            raise RuntimeError("No transaction in progress")
+        edit, self._edit = self._edit, None
+        self._in_transaction = False
+        if edit.finish(self._nodes, self._edges, self.file_names):
+            self.history.push(edit, self._nodes, self._edges, self.file_names)
+        self._auto_save_backup()
+
+    def rollback_transaction(self):
+        """Undo everything since begin_transaction() without touching the history."""
+        if not self._in_transaction:
+            raise RuntimeError("No transaction in progress")
+        edit, self._edit = self._edit, None
+        self._in_transaction = False
+        if edit.finish(self._nodes, self._edges, self.file_names):
+            nodes, edges, file_names = edit.revert(self._nodes, self._edges, self.file_names)
+            self._set_nodes(nodes)
+            self._set_edges(edges)
+            self.file_names = file_names
+        self.sync_next_id()
+
+    @contextmanager
+    def transaction(self):
+        """Context manager around begin/commit; rolls back if the block raises.
+
+        Nested use joins the outer transaction.
+        """
+        if self._in_transaction:
+            yield self
+            return
+        self.begin_transaction()
+        try:
+            yield self
+        except BaseException:
+            self.rollback_transaction()
+            raise
+        self.commit_transaction()
+
+    def _set_nodes(self, nodes):
+        self._node_buffer.adopt(nodes)
+        self._nodes = self._node_buffer.view
+        self._node_index.invalidate()
+        self._components.invalidate()
+
+    def _set_edges(self, edges):
+        self._edge_buffer.adopt(edges)
+        self._edges = self._edge_buffer.view
+        self._adjacency.invalidate()
+        self._components.invalidate()
+
+    def _touch_nodes(self, rows):
+        if self._edit is not None:
+            self._edit.nodes.touch(self._nodes, rows)
+
+    def _append_nodes(self, new_nodes):
+        index = self.node_index
+        first_row = self._node_buffer.extend(new_nodes)
+        self._nodes = self._node_buffer.view
+        for offset, point_id in enumerate(new_nodes[:, 0]):
+            index.append(point_id, first_row + offset)
+        self._components.add_nodes(new_nodes, first_row, index)
+
+    def _remove_node_rows(self, rows):
+        if self._edit is not None:
+            self._edit.nodes.remove(self._nodes, rows)
+        self._set_nodes(np.delete(self._nodes, rows, axis=0))
+
+    def _append_edges(self, new_edges):
+        self._edge_buffer.extend(new_edges)
+        self._edges = self._edge_buffer.view
+        self._adjacency.add(new_edges)
+        self._components.add_edges(np.asarray(new_edges), self.node_index)
+
+    def _remove_edge_rows(self, rows):
+        rows = np.unique(np.asarray(rows, dtype=np.int64))
+        if self._edit is not None:
+            self._edit.edges.remove(self._edges, rows)
+        removed = self._edges[rows]
+        self._edge_buffer.adopt(np.delete(self._edges, rows, axis=0))
+        self._edges = self._edge_buffer.view
+        self._adjacency.remove(removed)
+        self._components.invalidate()
+
     def sync_next_id(self):
-        """Synchronize _next_point_id with the current maximum node ID."""
+        """Synchronize _next_point_id with the current maximum node ID (never below id_floor)."""
         if self.nodes.size > 0:
-            self._next_point_id = int(np.max(self.nodes[:, 0])) + 1
+            self._next_point_id = max(self.id_floor, int(np.max(self.nodes[:, 0])) + 1)
         else:
-            self._next_point_id = 0
+            self._next_point_id = self.id_floor
 
     def _get_new_point_id(self):
         new_id = self._next_point_id
@@ -44,13 +231,9 @@ class DataManager:
             # original_lane_id maps to zone
             new_node = np.array([[new_point_id, x, y, 0.0, original_lane_id, 0.0, 0.0]])
 
-            if self.nodes.size > 0:
-                self.nodes = np.vstack([self.nodes, new_node])
-            else:
-                self.nodes = new_node
+            with self._recording():
+                self._append_nodes(new_node)
 
-            self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-            self.redo_stack = []
             self._auto_save_backup()
             print(f"Added node {new_point_id}: ({x:.2f}, {y:.2f}, lane_id={original_lane_id})")
             return new_point_id
@@ -59,34 +242,73 @@ class DataManager:
             print(f"Error adding node: {e}")
             return None
 
-    def add_edge(self, from_point_id, to_point_id):
+    def add_nodes(self, points, original_lane_id):
+        """Append many nodes in one allocation. Returns the new point ids."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if points.shape[0] == 0:
+            return []
         try:
-            if self.edges.size > 0:
-                if self.edges.ndim == 1:
-                    self.edges = self.edges.reshape(-1, 2)
-                if np.any((self.edges[:, 0] == from_point_id) & (self.edges[:, 1] == to_point_id)):
-                    print(f"Edge from {from_point_id} to {to_point_id} already exists.")
-                    return
-
-                new_edge = np.array([[from_point_id, to_point_id]], dtype=int)
-                self.edges = np.vstack([self.edges, new_edge])
-            else:
-                self.edges = np.array([[from_point_id, to_point_id]], dtype=int)
+            first_id = self._next_point_id
+            new_ids = np.arange(first_id, first_id + points.shape[0])
+            self._next_point_id += points.shape[0]
 
-            from_node_mask = self.nodes[:, 0] == from_point_id
-            to_node_mask = self.nodes[:, 0] == to_point_id
+            # Node: [point_id, x, y, yaw, zone, width, indicator]
+            new_nodes = np.zeros((points.shape[0], 7))
+            new_nodes[:, 0] = new_ids
+            new_nodes[:, 1:3] = points
+            new_nodes[:, 4] = original_lane_id
+
+            with self._recording():
+                self._append_nodes(new_nodes)
+
+            self._auto_save_backup()
+            print(f"Added {len(new_ids)} nodes (lane_id={original_lane_id})")
+            return new_ids.tolist()
+
+        except Exception as e:
+            print(f"Error adding nodes: {e}")
+            return []
+
+    def add_edges(self, edge_pairs):
+        """Append many (from_id, to_id) edges in one allocation, skipping ones that already exist."""
+        new_edges = np.asarray(edge_pairs, dtype=int).reshape(-1, 2)
+        if new_edges.shape[0] == 0:
+            return 0
+        try:
+            adjacency = self.adjacency
+            seen = set()
+            keep = []
+            for i, pair in enumerate(map(tuple, new_edges.tolist())):
+                if pair not in seen and not adjacency.has_edge(*pair):
+                    seen.add(pair)
+                    keep.append(i)
+            new_edges = new_edges[keep]
+            if new_edges.shape[0] == 0:
+                print("All edges already exist.")
+                return 0
+
+            with self._recording():
+                self._append_edges(new_edges)
+                self._update_yaws(new_edges.tolist())
 
-            if np.any(from_node_mask) and np.any(to_node_mask):
-                from_node = self.nodes[from_node_mask][0]
-                to_node = self.nodes[to_node_mask][0]
+            self._auto_save_backup()
+            print(f"Added {len(new_edges)} edges")
+            return len(new_edges)
 
-                dx = to_node[1] - from_node[1]  # x_to - x_from
-                dy = to_node[2] - from_node[2]  # y_to - y_from
-                yaw = np.arctan2(dy, dx)
-                self.nodes[from_node_mask, 3] = yaw
+        except Exception as e:
+            print(f"Error adding edges: {e}")
+            return 0
+
+    def add_edge(self, from_point_id, to_point_id):
+        try:
+            if self.adjacency.has_edge(from_point_id, to_point_id):
+                print(f"Edge from {from_point_id} to {to_point_id} already exists.")
+                return
+
+            with self._recording():
+                self._append_edges(np.array([[from_point_id, to_point_id]], dtype=int))
+                self._update_yaws([(from_point_id, to_point_id)])
 
-            self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-            self.redo_stack = []
             self._auto_save_backup()
             print(f"Added edge from {from_point_id} to {to_point_id}")
 
@@ -94,19 +316,38 @@ class DataManager:
             print(f"Error adding edge: {e}")
 
     def _update_yaws(self, edge_pairs):
-        """Update yaws for a list of (from_id, to_id) pairs."""
-        for from_id, to_id in edge_pairs:
-            from_node_mask = self.nodes[:, 0] == from_id
-            to_node_mask = self.nodes[:, 0] == to_id
+        """Point each "from" node along its (from_id, to_id) edge; later pairs win."""
+        if self.nodes.size == 0:
+            return
+        rows, yaws = last_per_row(*edge_yaws(self.nodes, self.node_index, edge_pairs))
+        if rows.size == 0:
+            return
+        self._touch_nodes(rows)
+        self.nodes[rows, 3] = yaws
 
-            if np.any(from_node_mask) and np.any(to_node_mask):
-                from_node = self.nodes[from_node_mask][0]
-                to_node = self.nodes[to_node_mask][0]
+    def recompute_all_yaws(self):
+        """Recompute every node's yaw from the edges as one undoable edit.
 
-                dx = to_node[1] - from_node[1]  # x_to - x_from
-                dy = to_node[2] - from_node[2]  # y_to - y_from
-                yaw = np.arctan2(dy, dx)
-                self.nodes[from_node_mask, 3] = yaw
+        Nodes follow their first out-edge; lane ends keep the heading of their
+        first in-edge. Isolated nodes are left alone.
+        """
+        try:
+            rows, yaws = all_yaws(self.nodes, self.edges, self.node_index)
+            if rows.size == 0:
+                print("No edges to derive yaws from.")
+                return 0
+
+            with self._recording():
+                self._touch_nodes(rows)
+                self.nodes[rows, 3] = yaws
+
+            self._auto_save_backup()
+            print(f"Recomputed yaw for {rows.size} nodes")
+            return int(rows.size)
+
+        except Exception as e:
+            print(f"Error recomputing yaws: {e}")
+            return 0
 
     def reverse_path(self, path_ids):
         """Reverse the direction of all edges along a given path of node IDs.
@@ -126,21 +367,18 @@ class DataManager:
             edges_to_delete = []
             edges_to_add = []
 
-            # Create a fast lookup set of all existing edges
-            existing_edges = set()
-            for edge in self.edges:
-                existing_edges.add((edge[0], edge[1]))
+            adjacency = self.adjacency
 
             for i in range(len(path_ids) - 1):
-                A = path_ids[i]
-                B = path_ids[i + 1]
+                A = int(path_ids[i])
+                B = int(path_ids[i + 1])
 
                 # Check which direction the edge currently exists in
-                if (A, B) in existing_edges:
+                if adjacency.has_edge(A, B):
                     # Forward edge exists (A -> B), reverse it
                     edges_to_delete.append((A, B))
                     edges_to_add.append((B, A))
-                elif (B, A) in existing_edges:
+                elif adjacency.has_edge(B, A):
                     # Backward edge exists (B -> A), reverse it
                     edges_to_delete.append((B, A))
                     edges_to_add.append((A, B))
@@ -151,27 +389,19 @@ class DataManager:
                 print("No matching edges found to reverse.")
                 return
 
-            # Build a mask to keep all edges *except* the ones we're deleting
-            keep_mask = np.ones(len(self.edges), dtype=bool)
-
+            # Collect the rows of the edges we're deleting; only edges leaving a path node can match
             edges_to_delete_set = set(edges_to_delete)
-            for i in range(len(self.edges)):
-                if (self.edges[i, 0], self.edges[i, 1]) in edges_to_delete_set:
-                    keep_mask[i] = False
-
-            # Apply the mask
-            self.edges = self.edges[keep_mask]
-            # Add the new reversed edges
-            if edges_to_add:
-                edges_to_add_np = np.array(edges_to_add, dtype=int)
-                self.edges = np.vstack([self.edges, edges_to_add_np])
-
-            # Update the yaws for the new "from" nodes
-            self._update_yaws(edges_to_add)
-
-            # Save to history
-            self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-            self.redo_stack = []
+            candidate_rows = np.flatnonzero(np.isin(self.edges[:, 0], [u for u, _ in edges_to_delete]))
+            delete_rows = [i for i in candidate_rows.tolist()
+                           if (int(self.edges[i, 0]), int(self.edges[i, 1])) in edges_to_delete_set]
+
+            with self._recording():
+                self._remove_edge_rows(delete_rows)
+                # Add the new reversed edges
+                self._append_edges(np.array(edges_to_add, dtype=int))
+                # Update the yaws for the new "from" nodes
+                self._update_yaws(edges_to_add)
+
             self._auto_save_backup()
 
             print(f"Reversed {len(edges_to_add)} edges in path.")
@@ -186,17 +416,14 @@ class DataManager:
         try:
             point_ids = np.asarray(point_ids_to_delete, dtype=int)
 
-            node_mask = ~np.isin(self.nodes[:, 0], point_ids)
-            self.nodes = self.nodes[node_mask]
+            with self._recording():
+                self._remove_node_rows(np.flatnonzero(np.isin(self.nodes[:, 0], point_ids)))
 
-            if self.edges.size > 0:
-                edge_mask_from = ~np.isin(self.edges[:, 0], point_ids)
-                edge_mask_to = ~np.isin(self.edges[:, 1], point_ids)
-                edge_mask_combined = edge_mask_from & edge_mask_to
-                self.edges = self.edges[edge_mask_combined]
+                if self.edges.size > 0:
+                    edge_mask_from = np.isin(self.edges[:, 0], point_ids)
+                    edge_mask_to = np.isin(self.edges[:, 1], point_ids)
+                    self._remove_edge_rows(np.flatnonzero(edge_mask_from | edge_mask_to))
 
-            self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-            self.redo_stack = []
             self.sync_next_id()
             self._auto_save_backup()
             print(f"Deleted {len(point_ids)} nodes and associated edges")
@@ -204,122 +431,153 @@ class DataManager:
         except Exception as e:
             print(f"Error deleting points: {e}")
 
-    def copy_points(self, point_ids_to_copy):
-        """Copy specified points and their internal edges."""
+    def copy_points(self, point_ids_to_copy, offset=(2.0, 2.0), transform=None):
+        """Copy specified points and their internal edges.
+
+        The copies get a contiguous range of new ids. ``transform`` is an
+        optional 2x2 or 2x3 affine matrix applied to x/y (and to the yaw
+        direction) before ``offset`` is added. Returns the new point ids, or
+        None when offset or transform has the wrong shape.
+        """
+        try:
+            offset = np.asarray(offset, dtype=float)
+            matrix = None if transform is None else np.asarray(transform, dtype=float)
+        except (TypeError, ValueError):
+            offset = matrix = np.zeros(0)
+        if offset.shape != (2,) or not np.isfinite(offset).all() or (
+                matrix is not None and (matrix.shape not in ((2, 2), (2, 3)) or not np.isfinite(matrix).all())):
+            print(f"Invalid copy offset {offset!r} or transform {transform!r}")
+            return None
         if not point_ids_to_copy:
-            return
+            return []
         try:
-            point_ids = set(point_ids_to_copy)
+            point_ids = np.unique(np.asarray(point_ids_to_copy, dtype=np.int64))
 
             # Find nodes to copy
-            node_mask = np.isin(self.nodes[:, 0], list(point_ids))
-            nodes_to_copy = self.nodes[node_mask]
+            nodes_to_copy = self.nodes[np.unique(self._rows_for(point_ids))]
 
             if nodes_to_copy.size == 0:
                 print("No nodes found to copy.")
-                return
-
-            # Map old IDs to new IDs
-            id_map = {}
-            new_nodes_list = []
-
-            offset_x = 2.0
-            offset_y = 2.0
-
-            for node in nodes_to_copy:
-                old_id = int(node[0])
-                new_id = self._get_new_point_id()
-                id_map[old_id] = new_id
-
-                new_node = node.copy()
-                new_node[0] = new_id
-                new_node[1] += offset_x  # X
-                new_node[2] += offset_y  # Y
-
-                new_nodes_list.append(new_node)
-
-            if not new_nodes_list:
-                return
-
-            # Add new nodes
-            new_nodes_arr = np.array(new_nodes_list)
-            self.nodes = np.vstack([self.nodes, new_nodes_arr])
-
-            # Copy edges where both endpoints are in the selection
-            new_edges_list = []
+                return []
+
+            # Map old IDs to a contiguous block of new IDs, in row order
+            old_ids = nodes_to_copy[:, 0].astype(np.int64)
+            first_id = self._next_point_id
+            new_ids = np.arange(first_id, first_id + len(old_ids))
+            self._next_point_id += len(old_ids)
+
+            new_nodes = nodes_to_copy.copy()
+            new_nodes[:, 0] = new_ids
+            if matrix is not None:
+                linear = matrix[:, :2]
+                new_nodes[:, 1:3] = new_nodes[:, 1:3] @ linear.T
+                if matrix.shape[1] > 2:
+                    new_nodes[:, 1:3] += matrix[:, 2]
+                # Headings follow the transformed direction vectors
+                yaw = new_nodes[:, 3]
+                direction = np.column_stack([np.cos(yaw), np.sin(yaw)]) @ linear.T
+                new_nodes[:, 3] = np.arctan2(direction[:, 1], direction[:, 0])
+            new_nodes[:, 1:3] += offset
+
+            # Copy edges where both endpoints are copied nodes
+            new_edges = np.zeros((0, 2))
             if self.edges.size > 0:
-                for edge in self.edges:
-                    u, v = int(edge[0]), int(edge[1])
-                    if u in point_ids and v in point_ids:
-                        if u in id_map and v in id_map:
-                            new_u = id_map[u]
-                            new_v = id_map[v]
-                            new_edges_list.append([new_u, new_v])
-
-            if new_edges_list:
-                new_edges_arr = np.array(new_edges_list)
-                self.edges = np.vstack([self.edges, new_edges_arr])
-
-            self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-            self.redo_stack = []
+                edges = self.edges.reshape(-1, 2).astype(np.int64)
+                internal = np.isin(edges, old_ids).all(axis=1)
+                order = np.argsort(old_ids)
+                pos = np.searchsorted(old_ids, edges[internal], sorter=order)
+                new_edges = new_ids[order[pos]]
+
+            with self._recording():
+                # Add new nodes
+                self._append_nodes(new_nodes)
+                if len(new_edges):
+                    self._append_edges(new_edges)
+
             self._auto_save_backup()
-            print(f"Copied {len(nodes_to_copy)} nodes and {len(new_edges_list)} edges.")
+            print(f"Copied {len(new_nodes)} nodes and {len(new_edges)} edges.")
+            return new_ids.tolist()
 
         except Exception as e:
             print(f"Error copying points: {e}")
+            return []
 
     def change_ids(self, point_ids, new_original_lane_id):
         if not point_ids:
             return
         try:
-            point_ids = np.asarray(point_ids, dtype=int)
-            node_mask = np.isin(self.nodes[:, 0], point_ids)
+            rows = self._rows_for(np.asarray(point_ids, dtype=int))
 
-            if np.any(node_mask):
+            if rows.size > 0:
                 # Update zone (col 4)
-                self.nodes[node_mask, 4] = new_original_lane_id
-                self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-                self.redo_stack = []
+                with self._recording():
+                    self._touch_nodes(rows)
+                    self.nodes[rows, 4] = new_original_lane_id
                 self._auto_save_backup()
-                print(f"Changed zone (original lane ID) for {np.sum(node_mask)} nodes to {new_original_lane_id}")
+                print(f"Changed zone (original lane ID) for {len(np.unique(rows))} nodes to {new_original_lane_id}")
             else:
                 print("No matching nodes found to change ID.")
 
         except Exception as e:
             print(f"Error changing IDs: {e}")
 
+    def update_path_geometry(self, point_ids, xy, yaw=None):
+        """Move the given points to xy (and set their yaw) as one undoable edit.
+
+        xy is (K, 2) and yaw (K,) in the order of point_ids; yaw=None keeps
+        the current headings. Ids that are not present are skipped. Returns
+        the number of rows updated.
+        """
+        try:
+            rows = self.node_index.rows(np.asarray(point_ids, dtype=int)) if self._nodes.size else np.array([], dtype=np.int64)
+            found = rows >= 0
+            if not found.any():
+                print("No matching nodes found to update geometry.")
+                return 0
+            rows = rows[found]
+            with self._recording():
+                self._touch_nodes(rows)
+                self._nodes[rows, 1:3] = np.asarray(xy, dtype=float).reshape(-1, 2)[found]
+                if yaw is not None:
+                    self._nodes[rows, 3] = np.asarray(yaw, dtype=float).ravel()[found]
+            self._auto_save_backup()
+            return int(rows.size)
+        except Exception as e:
+            print(f"Error updating path geometry: {e}")
+            return 0
+
     def update_node_properties(self, point_ids, zone=None, indicator=None):
         """Update properties (zone, indicator) for a list of point IDs."""
         if not point_ids:
             return
         try:
-            point_ids = np.asarray(point_ids, dtype=int)
-            node_mask = np.isin(self.nodes[:, 0], point_ids)
+            rows = np.unique(self._rows_for(np.asarray(point_ids, dtype=int)))
 
-            if not np.any(node_mask):
+            if rows.size == 0:
                 print("No matching nodes found to update properties.")
                 return
 
             updated = False
-            if zone is not None:
-                self.nodes[node_mask, 4] = int(zone)
-                updated = True
-            
-            if indicator is not None:
-                # Ensure we have enough columns (handle migrations if any, though loader handles it)
-                if self.nodes.shape[1] < 7:
-                     # This shouldn't happen if loader does its job, but safe to expand
-                     padding = np.zeros((self.nodes.shape[0], 7 - self.nodes.shape[1]))
-                     self.nodes = np.hstack([self.nodes, padding])
-                
-                self.nodes[node_mask, 6] = float(indicator)
-                updated = True
+            with self._recording() as edit:
+                if indicator is not None and self.nodes.shape[1] < 7:
+                    # Ensure we have enough columns (handle migrations if any, though loader handles it)
+                    # This shouldn't happen if loader does its job, but safe to expand
+                    edit.nodes.capture_full(self._nodes)
+                    padding = np.zeros((self.nodes.shape[0], 7 - self.nodes.shape[1]))
+                    self._set_nodes(np.hstack([self.nodes, padding]))
+
+                self._touch_nodes(rows)
+                if zone is not None:
+                    self.nodes[rows, 4] = int(zone)
+                    updated = True
+
+                if indicator is not None:
+                    self.nodes[rows, 6] = float(indicator)
+                    updated = True
 
             if updated:
-                self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-                self.redo_stack = []
                 self._auto_save_backup()
-                print(f"Updated properties for {np.sum(node_mask)} nodes: Zone={zone}, Indicator={indicator}")
+                print(f"Updated properties for {len(rows)} nodes: Zone={zone}, Indicator={indicator}")
 
         except Exception as e:
             print(f"Error updating node properties: {e}")
@@ -329,10 +587,9 @@ class DataManager:
         if not point_ids:
             return
         try:
-            point_ids = np.asarray(point_ids, dtype=int)
-            node_mask = np.isin(self.nodes[:, 0], point_ids)
+            rows = np.unique(self._rows_for(np.asarray(point_ids, dtype=int)))
 
-            if not np.any(node_mask):
+            if rows.size == 0:
                 print("No matching nodes found to reverse indicators.")
                 return
 
@@ -342,21 +599,21 @@ class DataManager:
             # 3 -> 2
             
             # Nodes with indicator 2 (Right)
-            mask_2 = node_mask & (self.nodes[:, 6] == 2)
+            rows_2 = rows[self.nodes[rows, 6] == 2]
             # Nodes with indicator 3 (Left) 
-            mask_3 = node_mask & (self.nodes[:, 6] == 3)
+            rows_3 = rows[self.nodes[rows, 6] == 3]
 
-            count_2 = np.sum(mask_2)
-            count_3 = np.sum(mask_3)
+            count_2 = len(rows_2)
+            count_3 = len(rows_3)
 
-            if count_2 > 0:
-                self.nodes[mask_2, 6] = 3
-            if count_3 > 0:
-                self.nodes[mask_3, 6] = 2
+            with self._recording():
+                self._touch_nodes(rows)
+                if count_2 > 0:
+                    self.nodes[rows_2, 6] = 3
+                if count_3 > 0:
+                    self.nodes[rows_3, 6] = 2
 
             if count_2 > 0 or count_3 > 0:
-                self.history.append((self.nodes.copy(), self.edges.copy(), list(self.file_names)))
-                self.redo_stack = []
                 self._auto_save_backup()
                 print(f"Reversed indicators: {count_2} (Right->Left), {count_3} (Left->Right)")
             else:
@@ -377,61 +634,18 @@ class DataManager:
         print("Function 'merge_lanes' is obsolete. Use 'add_edge(from_id, to_id)' instead.")
         pass
 
-    def _create_networkx_graph(self):
-        """
-        Creates a NetworkX graph with:
-        Node: t (point_id), x, y, yaw, zone=0, width=0, indicator=0
-        Edge: weight=EuclideanDistance
-        """
-        G = nx.DiGraph()
-
-        node_coords = {}
-
-        if self.nodes.size > 0:
-            for node_data in self.nodes:
-                t = int(node_data[0])
-                x = float(node_data[1])
-                y = float(node_data[2])
-                yaw = float(node_data[3])
-                zone = float(node_data[4])
-                width = float(node_data[5])
-                indicator = float(node_data[6])
-
-                node_coords[t] = (x, y)
-
-                G.add_node(
-                    t,
-                    x=x,
-                    y=y,
-                    yaw=yaw,
-                    zone=zone,
-                    width=width,
-                    indicator=indicator
-                )
-
-        if self.edges.size > 0:
-            for edge_data in self.edges:
-                u = int(edge_data[0])
-                v = int(edge_data[1])
-
-                # Calculate weight (Euclidean distance)
-                weight = 1.0
-                if u in node_coords and v in node_coords:
-                    x1, y1 = node_coords[u]
-                    x2, y2 = node_coords[v]
-                    weight = float(math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2))
-
-                G.add_edge(u, v, weight=weight)
-
-        return G
+    def _create_networkx_graph(self, nodes=None, edges=None):
+        """NetworkX DiGraph of the current state (or of a nodes/edges snapshot)."""
+        nodes = self.nodes if nodes is None else nodes
+        edges = self.edges if edges is None else edges
+        return build_networkx_graph(nodes, edges)
 
     def clear_data(self):
         try:
-            self.nodes = np.array([])
-            self.edges = np.array([])
-            self.history = [(np.array([]), np.array([]))]
-            self.redo_stack = []
+            self._set_nodes(np.array([]))
+            self._set_edges(np.array([]))
             self.file_names = []
+            self.history.reset(self._nodes, self._edges, self.file_names)
             self._next_point_id = 0
             self.sync_next_id()
             self._auto_save_backup()
@@ -441,23 +655,14 @@ class DataManager:
 
     def undo(self):
         try:
-            if len(self.history) <= 1:
+            if not self.history.can_undo:
                 print("Nothing to undo")
                 return self.nodes, self.edges, False
 
-            self.redo_stack.append(self.history.pop())
-
-            # Handle both 2-item (old) and 3-item (new) history tuples
-            state = self.history[-1]
-            if len(state) == 3:
-                nodes_copy, edges_copy, file_names_copy = state
-                self.file_names = list(file_names_copy)
-            else:
-                nodes_copy, edges_copy = state
-                # Keep existing file_names if not in history (fallback)
-
-            self.nodes = nodes_copy.copy()
-            self.edges = edges_copy.copy()
+            nodes, edges, file_names = self.history.undo(self._nodes, self._edges, self.file_names)
+            self._set_nodes(nodes)
+            self._set_edges(edges)
+            self.file_names = file_names
 
             self.sync_next_id()
             self._auto_save_backup()
@@ -470,21 +675,14 @@ class DataManager:
 
     def redo(self):
         try:
-            if not self.redo_stack:
+            if not self.history.can_redo:
                 print("Nothing to redo")
                 return self.nodes, self.edges, False
 
-            state = self.redo_stack.pop()
-            self.history.append(state)
-
-            if len(state) == 3:
-                nodes_copy, edges_copy, file_names_copy = state
-                self.file_names = list(file_names_copy)
-            else:
-                nodes_copy, edges_copy = state
-
-            self.nodes = nodes_copy.copy()
-            self.edges = edges_copy.copy()
+            nodes, edges, file_names = self.history.redo(self._nodes, self._edges, self.file_names)
+            self._set_nodes(nodes)
+            self._set_edges(edges)
+            self.file_names = file_names
 
             self.sync_next_id()
             self._auto_save_backup()
@@ -495,129 +693,157 @@ class DataManager:
             print(f"Error during redo: {e}")
             return self.nodes, self.edges, False
 
-    def save_by_matplotlib(self):
-        """Save nodes and edges to files and create a backup."""
+    def save_by_matplotlib(self, exports=()):
+        """Save the graph container to ./files and create a backup.
+
+        exports may name "pickle" and/or "json" to also write output.pickle /
+        output.json; otherwise they are generated later from the container on demand.
+        """
         try:
             os.makedirs("./files", exist_ok=True)
-            nodes_filename = "./files/graph_nodes.npy"
-            edges_filename = "./files/graph_edges.npy"
-
-            np.save(nodes_filename, self.nodes)
-            np.save(edges_filename, self.edges)
+            graph_filename = os.path.join("./files", GRAPH_FILE)
 
-            print(f"Saved nodes to {nodes_filename}")
-            print(f"Saved edges to {edges_filename}")
+            save_graph(graph_filename, self.nodes, self.edges, self.file_names)
+            print(f"Saved graph to {graph_filename}")
             self._auto_save_backup()
 
-            G = self._create_networkx_graph()
-            pickle_file_path = r"./files/output.pickle"
-            with open(pickle_file_path, "wb") as f:
-                pickle.dump(G, f, protocol=2)
+            write_exports("./files", self.nodes, self.edges,
+                          pickle_out="pickle" in exports, json_out="json" in exports)
 
-            print(f"Saved NetworkX graph to {pickle_file_path}")
+            return graph_filename
 
-            # Save as JSON for compatibility transfer
-            json_file_path = r"./files/output.json"
-            data = json_graph.node_link_data(G, edges="links")
-            with open(json_file_path, "w") as f:
-                json.dump(data, f, indent=4)
-            print(f"Saved NetworkX graph as JSON to {json_file_path}")
+        except Exception as e:
+            print(f"Error saving data: {e}")
+            return None
 
-            return nodes_filename
+    def save_by_web(self, folder="workspace", writer=None, exports=()):
+        """Save the graph container to folder.
 
+        With a PersistenceWorker as ``writer`` a snapshot is queued and written
+        in the background; queued saves to the same folder coalesce.
+        exports may name "pickle" and/or "json" to also write the NetworkX exports.
+        """
+        exports = tuple(exports)
+        if writer is not None:
+            # Failures propagate to the worker, which reports them from flush()
+            job = WriteJob(("web", os.path.abspath(folder)), self._write_web_files,
+                           folder, self.nodes.copy(), self.edges.copy(), list(self.file_names), exports)
+            writer.submit(job)
+            return
+        try:
+            self._write_web_files(folder, self.nodes, self.edges, self.file_names, exports)
         except Exception as e:
             print(f"Error saving data: {e}")
-            return None
 
-    def save_by_web(self, folder="workspace"):
-        """Save nodes and edges to files and create a backup."""
+    def _write_web_files(self, folder, nodes, edges, file_names, exports=()):
         if not os.path.exists(folder):
             os.makedirs(folder)
-        try:
-            nodes_filename = os.path.join(folder, "graph_nodes.npy")
-            edges_filename = os.path.join(folder, "graph_edges.npy")
+        graph_filename = save_graph(os.path.join(folder, GRAPH_FILE), nodes, edges, file_names)
+        print(f"Saved graph to {graph_filename}")
 
-            np.save(nodes_filename, self.nodes)
-            np.save(edges_filename, self.edges)
+        written = write_exports(folder, nodes, edges,
+                                pickle_out="pickle" in exports, json_out="json" in exports)
+        return [graph_filename] + written
 
-            print(f"Saved graph nodes to {nodes_filename}")
-            print(f"Saved graph edges to {edges_filename}")
+    def compact_ids(self):
+        """Renumber point ids to 0..N-1, keeping their order, and remap the edges to match.
 
-            G = self._create_networkx_graph()
-            pickle_file_path = os.path.join(folder, "output.pickle")
-            with open(pickle_file_path, "wb") as f:
-                pickle.dump(G, f, protocol=2)
+        The undo history is rewritten into the new id space instead of being
+        cleared. Ids that only exist in older states (deleted nodes, dangling
+        edge ends) get fresh ids from N up. The renumbering itself is not an
+        undo step. Returns the number of node rows whose id changed.
+        """
+        if self._in_transaction:
+            print("Cannot compact ids during a transaction")
+            return 0
+        if self.id_floor:
+            # Ids below id_floor belong to nodes this manager does not hold (other tiles)
+            print("Cannot compact ids of a partial (tiled) workspace")
+            return 0
+        try:
+            if self.nodes.size == 0:
+                print("No nodes to renumber.")
+                return 0
+
+            def sorted_unique(ids):
+                # Sort-based; np.unique on int64 is much slower here
+                ids = np.sort(ids.ravel())
+                return ids[np.r_[True, ids[1:] != ids[:-1]]] if ids.size else ids
+
+            old_ids = self.nodes[:, 0].astype(np.int64)
+            live = sorted_unique(old_ids)
+            edge_ids = self.edges.astype(np.int64).ravel() if self.edges.size > 0 else live[:0]
+            others = sorted_unique(np.concatenate([self.history.point_ids(), edge_ids]))
+            others = others[live[np.minimum(np.searchsorted(live, others), len(live) - 1)] != others]
+            keys = np.concatenate([live, others])
+            if np.array_equal(keys, np.arange(len(keys))):
+                print("Point ids are already compact.")
+                return 0
+
+            # keys is sorted except for the block of history-only ids appended at the end
+            order = np.argsort(keys, kind='stable')
+            sorted_keys = keys[order]
+
+            def remap(ids):
+                return order[np.searchsorted(sorted_keys, np.asarray(ids).astype(np.int64))]
+
+            nodes = self.nodes.copy()
+            nodes[:, 0] = remap(old_ids)
+            edges = remap(self.edges).astype(self.edges.dtype) if self.edges.size > 0 else self.edges.copy()
+
+            self.history.remap_ids(remap)
+            self._set_nodes(nodes)
+            self._set_edges(edges)
+            self.sync_next_id()
 
-            print(f"Saved NetworkX graph to {pickle_file_path}")
+            changed = int(np.count_nonzero(nodes[:, 0] != old_ids))
+            self._auto_save_backup()
+            print(f"Renumbered {changed} nodes; ids now run 0..{len(live) - 1}")
+            return changed
 
-            # Save as JSON for compatibility transfer
-            json_file_path = os.path.join(folder, "output.json")
-            data = json_graph.node_link_data(G, edges="links")
-            with open(json_file_path, "w") as f:
-                json.dump(data, f, indent=4)
-            print(f"Saved NetworkX graph as JSON to {json_file_path}")
         except Exception as e:
-            print(f"Error saving data: {e}")
-            return None
-
-    # def renumber_all_nodes(self):
-    #     """
-    #     Renumbers all node point_ids to be sequential (0 to N-1).
-    #     This is a destructive operation that clears the undo/redo history.
-    #     """
-    #     try:
-    #         N = len(self.nodes)
-    #         if N == 0:
-    #             print("No nodes to renumber.")
-    #             return
-    #
-    #         old_ids = self.nodes[:, 0].copy()
-    #         new_ids = np.arange(N)
-    #
-    #         # Create a fast lookup map {old_id: new_id}
-    #         id_map = {old: new for old, new in zip(old_ids, new_ids)}
-    #
-    #         # Update nodes array
-    #         self.nodes[:, 0] = new_ids
-    #
-    #         # Update edges array using the map
-    #         vectorized_map = np.vectorize(id_map.get)
-    #
-    #         if self.edges.size > 0:
-    #             self.edges[:, 0] = vectorized_map(self.edges[:, 0])
-    #             self.edges[:, 1] = vectorized_map(self.edges[:, 1])
-    #
-    #         # Reset the next_point_id counter
-    #         self._next_point_id = N
-    #
-    #         # Clear history
-    #         self.history = [(self.nodes.copy(), self.edges.copy())]
-    #         self.redo_stack = []
-    #
-    #         print("Renumbered all nodes. Undo/redo history has been cleared.")
-    #
-    #     except Exception as e:
-    #         print(f"Error during renumbering: {e}")
+            print(f"Error during renumbering: {e}")
+            return 0
 
     def _auto_save_backup(self):
         try:
-            if time.time() - self.last_backup < self.backup_interval:
+            if self._in_transaction or time.time() - self.last_backup < self.backup_interval:
                 return
 
-            os.makedirs("workspace-Backup", exist_ok=True)
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            nodes_filename = os.path.join("workspace-Backup", f"backup_nodes_{timestamp}.npy")
-            edges_filename = os.path.join("workspace-Backup", f"backup_edges_{timestamp}.npy")
-
             if self.nodes.size > 0:
-                np.save(nodes_filename, self.nodes)
-                np.save(edges_filename, self.edges)
-                print(f"Auto-saved backup nodes and edges to {timestamp}")
+                path = self.backups.write(self.nodes, self.edges, self.file_names)
+                print(f"Auto-saved backup restore point {os.path.basename(path)}")
 
             self.last_backup = time.time()
         except Exception as e:
             print(f"Backup failed: {e}")
 
+    def restore_backup(self, seq):
+        """Replace the graph with backup restore point ``seq`` as one undoable edit."""
+        try:
+            nodes, edges, file_names = self.backups.restore(int(seq))
+            with self._recording() as edit:
+                edit.nodes.capture_full(self._nodes)
+                edit.edges.capture_full(self._edges)
+                self._set_nodes(nodes)
+                self._set_edges(edges)
+                if file_names is not None:
+                    self.file_names = list(file_names)
+            self.sync_next_id()
+            print(f"Restored backup point {seq}: {len(self.nodes)} nodes, {len(self.edges)} edges")
+            return True
+        except Exception as e:
+            print(f"Error restoring backup {seq}: {e}")
+            return False
+
+    def forget_temp_lanes(self, filenames=None):
+        """Drop manifest entries (all if filenames is None) for temp files changed outside save_temp_lanes."""
+        if filenames is None:
+            self._temp_lane_manifest = {}
+            return
+        for fname in filenames:
+            self._temp_lane_manifest.pop(fname, None)
+
     def delete_edges_for_node(self, point_id):
         if self.edges.size == 0:
             return
@@ -626,13 +852,10 @@ class DataManager:
             # Create a mask for edges to *delete*
             # delete_mask = (self.edges[:, 0] == point_id) | (self.edges[:, 1] == point_id)
             delete_mask = (self.edges[:, 1] == point_id)
-            # Mask for edges to *keep* is the inverse
-            keep_mask = ~delete_mask
             deleted_count = np.sum(delete_mask)
             if deleted_count > 0:
-                self.edges = self.edges[keep_mask]
-                self.history.append((self.nodes.copy(), self.edges.copy()))
-                self.redo_stack = []
+                with self._recording():
+                    self._remove_edge_rows(np.flatnonzero(delete_mask))
                 self._auto_save_backup()
                 print(f"Deleted {deleted_count} edges for node {point_id}")
             else:
@@ -668,21 +891,19 @@ class DataManager:
                 self.file_names[zone_id] = None  # Mark as removed
                 return True
 
-            # Remove nodes
-            self.nodes = self.nodes[~nodes_to_remove_mask]
+            with self._recording():
+                # Remove nodes
+                self._remove_node_rows(np.flatnonzero(nodes_to_remove_mask))
 
-            # Remove edges connected to these nodes
-            if self.edges.size > 0:
-                edge_mask_from = np.isin(self.edges[:, 0], nodes_to_remove_ids)
-                edge_mask_to = np.isin(self.edges[:, 1], nodes_to_remove_ids)
-                edge_mask_delete = edge_mask_from | edge_mask_to
-                self.edges = self.edges[~edge_mask_delete]
+                # Remove edges connected to these nodes
+                if self.edges.size > 0:
+                    edge_mask_from = np.isin(self.edges[:, 0], nodes_to_remove_ids)
+                    edge_mask_to = np.isin(self.edges[:, 1], nodes_to_remove_ids)
+                    self._remove_edge_rows(np.flatnonzero(edge_mask_from | edge_mask_to))
 
-            # Mark file as removed in the list to preserve indices for other zones
-            self.file_names[zone_id] = None
+                # Mark file as removed in the list to preserve indices for other zones
+                self.file_names[zone_id] = None
 
-            self.history.append((self.nodes.copy(), self.edges.copy()))
-            self.redo_stack = []
             self.sync_next_id()
             self._auto_save_backup()
             print(f"Successfully removed file {filename}.")
@@ -702,50 +923,62 @@ class DataManager:
 
         merged_files = []
 
-        # Iterate until no more merges occur (transitive merges)
-        while True:
-            merged_in_pass = False
-
-            # Create a map of point_id to zone_id for quick lookup
-            # nodes column 0 is point_id, column 4 is zone_id
-            point_to_zone = {int(row[0]): int(row[4]) for row in self.nodes}
-
-            # Check each edge
-            for edge in self.edges:
-                u, v = int(edge[0]), int(edge[1])
-
-                if u not in point_to_zone or v not in point_to_zone:
-                    continue
-
-                zone_u = point_to_zone[u]
-                zone_v = point_to_zone[v]
-
-                if zone_u != zone_v:
-                    # Found a connection between different zones! Merge them.
-                    # Merge the higher zone ID into the lower one (usually keeps the original file)
-                    # Exception: if one is None (shouldn't happen for active nodes)
-
-                    target_zone = min(zone_u, zone_v)
-                    source_zone = max(zone_u, zone_v)
-
-                    # Update nodes
-                    self.nodes[self.nodes[:, 4] == source_zone, 4] = target_zone
-
-                    # Record the file to be deleted
-                    if source_zone < len(self.file_names):
-                        fname = self.file_names[source_zone]
-                        if fname and fname not in merged_files:
-                            merged_files.append(fname)
-
-                        # Mark as removed in file_names
-                        self.file_names[source_zone] = None
-
-                    print(f"Merged Zone {source_zone} into Zone {target_zone}")
-                    merged_in_pass = True
-                    break  # Restart loop to refresh point_to_zone map
-
-            if not merged_in_pass:
-                break
+        # Zone of every edge endpoint; a duplicated point_id takes its last row's zone
+        ids = self.nodes[:, 0].astype(np.int64)
+        zones = self.nodes[:, 4].astype(np.int64)
+        order = np.argsort(ids, kind='stable')
+        sorted_ids = ids[order]
+        edges = self.edges.reshape(-1, 2).astype(np.int64)
+        pos = np.searchsorted(sorted_ids, edges, side='right') - 1
+        found = (pos >= 0) & (sorted_ids[np.maximum(pos, 0)] == edges)
+        edge_zones = zones[order[np.maximum(pos, 0)]]
+        cross = found.all(axis=1) & (edge_zones[:, 0] != edge_zones[:, 1])
+
+        # Union-find over zone ids, walking cross-zone edges in row order. The
+        # smaller zone id stays root, so merges happen (and are reported) in the
+        # same order as merging one edge at a time and rescanning.
+        parent = {}
+
+        def find(zone):
+            root = zone
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while zone != root:
+                parent[zone], zone = root, parent[zone]
+            return root
+
+        merged_zones = []
+        for zone_u, zone_v in edge_zones[cross].tolist():
+            zone_u, zone_v = find(zone_u), find(zone_v)
+            if zone_u == zone_v:
+                continue
+            target_zone = min(zone_u, zone_v)
+            source_zone = max(zone_u, zone_v)
+            parent[source_zone] = target_zone
+            merged_zones.append(source_zone)
+            print(f"Merged Zone {source_zone} into Zone {target_zone}")
+
+        if not merged_zones:
+            return merged_files
+
+        # Zone merges (and the file_names they retire) are one undoable edit
+        with self._recording():
+            sources = np.array(merged_zones, dtype=np.int64)
+            targets = np.array([find(zone) for zone in merged_zones], dtype=np.int64)
+            zone_order = np.argsort(sources)
+            rows = np.flatnonzero(np.isin(zones, sources))
+            self._touch_nodes(rows)
+            self.nodes[rows, 4] = targets[zone_order][np.searchsorted(sources[zone_order], zones[rows])]
+
+            for source_zone in merged_zones:
+                # Record the file to be deleted
+                if source_zone < len(self.file_names):
+                    fname = self.file_names[source_zone]
+                    if fname and fname not in merged_files:
+                        merged_files.append(fname)
+
+                    # Mark as removed in file_names
+                    self.file_names[source_zone] = None
 
         return merged_files
 
@@ -758,21 +991,13 @@ class DataManager:
         Returns:
             list of (filename, component_nodes_array)
         """
-        import networkx as nx
-        
         if self.nodes.size == 0:
             return []
 
         try:
-            # 1. Build Global Graph
-            G = nx.Graph()
-            G.add_nodes_from(self.nodes[:, 0])
-        
-            if self.edges.size > 0:
-                G.add_edges_from(self.edges)
-            
-            # 2. Find Connected Components
-            components = list(nx.connected_components(G))
+            # 1-2. Connected components (node rows) from the maintained disjoint-set tracker,
+            # already ordered by min node id
+            components = self.components.groups(self.nodes)
         
             # 3. Map Components to Filenames
             # Heuristic: Find which 'original file' these nodes likely belong to.
@@ -795,16 +1020,14 @@ class DataManager:
         # we can try to respect the 'majority zone' in the component.
         # If component has mostly Zone 0 -> use 'lane-0.npy' (or whatever file_names[0] was).
         
-            components.sort(key=lambda c: min(c))
-        
             save_groups = []
             used_filenames = set()
             
             # Snapshot of old file names map to guess context
             old_file_names = list(self.file_names) # Index = Zone ID
         
-            for comp in components:
-                comp_nodes = self.nodes[np.isin(self.nodes[:, 0], list(comp))]
+            for comp_rows in components:
+                comp_nodes = self.nodes[comp_rows]
                 
                 # Find majority zone in this component
                 zones, counts = np.unique(comp_nodes[:, 4].astype(int), return_counts=True)
@@ -846,12 +1069,23 @@ class DataManager:
 
 
 
-    def save_temp_lanes(self, output_dir):
-        """Save each lane (zone) to a separate .npy file in the output directory."""
+    def save_temp_lanes(self, output_dir, writer=None):
+        """Save each lane (connected component) to a separate .npy file in the output directory.
+
+        Only files whose content changed since the last save are rewritten;
+        an in-memory manifest of digests remembers what is on disk. With a
+        PersistenceWorker as ``writer`` the file I/O happens in the background.
+        """
         split_map = {} # Initialize early for compatibility
         try:
+            output_dir = os.path.abspath(output_dir)
             if not os.path.exists(output_dir):
                 os.makedirs(output_dir)
+                self._temp_lane_manifest = {}
+            if output_dir != self._temp_lane_dir:
+                self._temp_lane_dir = output_dir
+                self._temp_lane_manifest = {}
+            manifest = self._temp_lane_manifest
 
             # 1. Merge connected lanes first -- DISABLED to allow manual zone assignment
             # merged_files = self.merge_connected_lanes()
@@ -863,45 +1097,93 @@ class DataManager:
             if not save_groups:
                 return {}, []
 
-            # 3. Save each group
+            # 3. Save each group whose content changed
+            # The manifest describes the disk once the job below has run
+            job = _TempLaneWrite(output_dir, manifest)
             for filename, group_nodes in save_groups:
+                 digest = _lane_digest(group_nodes)
+                 if manifest.get(filename) == digest:
+                     continue
                  # Save full node data (7 columns)
                  # [point_id, x, y, yaw, zone, width, indicator]
-                 save_path = os.path.join(output_dir, filename)
-                 np.save(save_path, group_nodes)
-                 print(f"Saved temp file for {filename} to {save_path}")
-            
-            # Update file_names list for future reference (though strictly less critical now)
-            # We can try to map back to zones if needed, or just keep a list of active files.
-            # For compatibility with legacy Zone-based lookups, we might want to populate self.file_names
-            # but Zone ID is no longer unique per file.
-            # So let's just update the list of active files for 'stale file' cleanup.
-            active_files = set([name for name, _ in save_groups])
+                 job.writes[filename] = group_nodes
+                 manifest[filename] = digest
 
             # Cleanup stale split files
-            # If a file exists in output_dir that looks like a split part of an active file
-            # but is NOT in self.file_names, it is stale (e.g. from Undo).
+            # A split part we wrote earlier (e.g. lane-0_1.npy) that this save no longer
+            # produces is stale (e.g. from Undo). Only files in the manifest are considered.
             try:
-                existing_files = os.listdir(output_dir)
-                active_files = set([f for f in self.file_names if f is not None])
-
-                for fname in existing_files:
-                    if fname not in active_files and fname.endswith(".npy"):
-                        # Check if it is a split part of an active file
-                        for active_file in active_files:
-                            active_base = os.path.splitext(active_file)[0]
-                            if fname.startswith(active_base + "_"):
-                                print(f"Deleting stale split file: {fname}")
-                                try:
-                                    os.remove(os.path.join(output_dir, fname))
-                                except OSError as e:
-                                    print(f"Error deleting {fname}: {e}")
-                                break
+                current_files = set(name for name, _ in save_groups)
+                active_bases = [os.path.splitext(f)[0]
+                                for f in current_files | set(f for f in self.file_names if f is not None)]
+
+                for fname in list(manifest):
+                    if fname in current_files:
+                        continue
+                    if any(fname.startswith(base + "_") for base in active_bases):
+                        job.deletes.add(fname)
+                        del manifest[fname]
             except Exception as e:
                 print(f"Error cleaning up stale files: {e}")
 
+            if writer is not None:
+                writer.submit(job)
+            else:
+                job.run()
+
             return split_map, merged_files
 
         except Exception as e:
             print(f"Error saving temp lanes: {e}")
             return {}, []
+
+
+def _lane_digest(group_nodes):
+    """Content digest of a lane's node array, used to skip rewriting unchanged temp files."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(f"{group_nodes.dtype.str}{group_nodes.shape}".encode())
+    h.update(np.ascontiguousarray(group_nodes).tobytes())
+    return h.digest()
+
+
+class _TempLaneWrite(WriteJob):
+    """Pending temp-lane file writes/deletes. Queued saves for one directory merge."""
+
+    def __init__(self, output_dir, manifest):
+        super().__init__(("temp_lanes", output_dir), None)
+        self.output_dir = output_dir
+        self.manifest = manifest
+        self.writes = {}
+        self.deletes = set()
+
+    def merge(self, newer):
+        for fname in newer.deletes:
+            self.writes.pop(fname, None)
+        self.deletes = (self.deletes - set(newer.writes)) | newer.deletes
+        self.writes.update(newer.writes)
+        return self
+
+    def run(self):
+        written = []
+        for filename, group_nodes in self.writes.items():
+            save_path = os.path.join(self.output_dir, filename)
+            try:
+                np.save(save_path, group_nodes)
+            except OSError as e:
+                # Make the next save retry this file
+                self.manifest.pop(filename, None)
+                print(f"Error saving temp file {save_path}: {e}")
+                continue
+            written.append(save_path)
+        if self.writes:
+            print(f"Saved {len(self.writes)} temp lane files to {self.output_dir}")
+
+        for fname in self.deletes:
+            print(f"Deleting stale split file: {fname}")
+            try:
+                os.remove(os.path.join(self.output_dir, fname))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"Error deleting {fname}: {e}")
+        return written
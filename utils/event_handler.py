@@ -634,8 +634,9 @@ class EventHandler:
         if self.ctrl_pressed:
             # ADD POINT (Ctrl + Left Click)
             lane_id_to_use = int(nodes[closest_row_idx, 4])
-            new_point_id = self.data_manager.add_node(event.xdata, event.ydata, lane_id_to_use)
-            self.data_manager.add_edge(closest_point_id, new_point_id)
+            with self.data_manager.transaction():
+                new_point_id = self.data_manager.add_node(event.xdata, event.ydata, lane_id_to_use)
+                self.data_manager.add_edge(closest_point_id, new_point_id)
             self.plot_manager.update_plot(self.data_manager.nodes, self.data_manager.edges)
             print(
                 f"Added node {new_point_id} (Lane {lane_id_to_use}), connected from node #{closest_row_idx} (ID {closest_point_id})")
@@ -0,0 +1,88 @@
+import numpy as np
+from scipy.spatial import ConvexHull, QhullError
+
+
+def convex_hull(points):
+    """Vertices of the convex hull of (N, 2) points, counter-clockwise.
+
+    Degenerate inputs (fewer than three distinct points, or all collinear)
+    return just the two extreme points.
+    """
+    points = np.asarray(points, dtype=float).reshape(-1, 2)
+    if len(points) < 3:
+        return points.copy()
+    try:
+        return points[ConvexHull(points).vertices]
+    except QhullError:
+        # Collinear: the lexicographic extremes are the ends of the segment
+        order = np.lexsort((points[:, 1], points[:, 0]))
+        return points[[order[0], order[-1]]]
+
+
+def hull_diameter(hull):
+    """Largest distance between two vertices of a counter-clockwise hull (rotating calipers)."""
+    h = len(hull)
+    if h < 2:
+        return 0.0
+    if h == 2:
+        return float(np.hypot(*(hull[1] - hull[0])))
+
+    def area2(a, b, c):
+        return abs((hull[b, 0] - hull[a, 0]) * (hull[c, 1] - hull[a, 1])
+                   - (hull[b, 1] - hull[a, 1]) * (hull[c, 0] - hull[a, 0]))
+
+    best = 0.0
+    j = 1
+    for i in range(h):
+        ni = (i + 1) % h
+        # Advance the opposite caliper while it moves away from edge i -> ni
+        while area2(i, ni, (j + 1) % h) > area2(i, ni, j):
+            j = (j + 1) % h
+        best = max(best, float(np.hypot(*(hull[j] - hull[i]))), float(np.hypot(*(hull[j] - hull[ni]))))
+    return best
+
+
+def diameter(points):
+    """Exact maximum pairwise distance of (N, 2) points in O(N log N)."""
+    return hull_diameter(convex_hull(points))
+
+
+class ExtentTracker:
+    """Diameter of a point set made of named groups (lanes), updated per group.
+
+    Only each group's convex hull is kept, so adding a lane costs a hull of
+    that lane and removing one costs nothing; the diameter is recomputed
+    from the union of the (small) hulls when next asked for.
+    """
+
+    def __init__(self):
+        self._hulls = {}
+        self._diameter = 0.0
+        self._dirty = False
+
+    def add(self, key, points):
+        """Set the points of group ``key`` (replacing any earlier ones)."""
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if len(points) == 0:
+            self.remove(key)
+            return
+        self._hulls[key] = convex_hull(points)
+        self._dirty = True
+
+    def remove(self, key):
+        if self._hulls.pop(key, None) is not None:
+            self._dirty = True
+
+    @property
+    def diameter(self):
+        if self._dirty:
+            hulls = list(self._hulls.values())
+            self._diameter = diameter(np.vstack(hulls)) if hulls else 0.0
+            self._dirty = False
+        return self._diameter
+
+    def __len__(self):
+        return len(self._hulls)
+
+    def __contains__(self, key):
+        return key in self._hulls
@@ -0,0 +1,297 @@
+"""Versioned single-file graph container (``graph.npz``) and its derived exports.
+
+The container is an uncompressed .npz holding one typed array per node
+column, the edge list and a small JSON header (format, version, counts,
+file_names). Members are stored, not deflated, so ``open_graph`` can memory
+map them straight out of the zip. The NetworkX pickle and node-link JSON
+that older tools read are derived from it on demand by ``export_networkx``.
+
+Usage:
+    python utils/graph_container.py <graph.npz> [--pickle] [--json]
+"""
+import json
+import os
+import pickle
+import sys
+import zipfile
+
+import networkx as nx
+import numpy as np
+
+FORMAT = "lane-graph"
+VERSION = 1
+GRAPH_FILE = "graph.npz"
+PICKLE_FILE = "output.pickle"
+JSON_FILE = "output.json"
+
+# Node row layout: [point_id, x, y, yaw, zone, width, indicator]
+_NODE_COLUMNS = (("point_id", [0], np.int64), ("xy", [1, 2], None), ("yaw", [3], None),
+                 ("zone", [4], np.int64), ("width", [5], None), ("indicator", [6], np.int8))
+
+
+def save_graph(path, nodes, edges, file_names=None):
+    """Write nodes/edges to ``path`` atomically. Returns ``path``."""
+    nodes = np.asarray(nodes, dtype=float)
+    nodes = nodes.reshape(-1, nodes.shape[-1]) if nodes.size else np.zeros((0, 7))
+    if nodes.shape[1] < 7:
+        nodes = np.hstack([nodes, np.zeros((nodes.shape[0], 7 - nodes.shape[1]))])
+    edges = np.asarray(edges)
+    edges = edges.reshape(-1, 2) if edges.size else np.zeros((0, 2), dtype=np.int64)
+
+    arrays = {}
+    for name, cols, dtype in _NODE_COLUMNS:
+        col = nodes[:, cols] if len(cols) > 1 else nodes[:, cols[0]]
+        arrays[name] = _compact(np.ascontiguousarray(col), dtype)
+    arrays["edges"] = _compact(np.ascontiguousarray(edges), np.int64)
+
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "n_nodes": int(nodes.shape[0]),
+        "n_edges": int(edges.shape[0]),
+        "file_names": list(file_names) if file_names is not None else None,
+    }
+    arrays["header"] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, path)
+    return path
+
+
+def open_graph(path):
+    """Read the header and memory map every member (read-only).
+
+    Returns:
+        tuple: (header dict, {member name: np.memmap})
+    """
+    members = {}
+    with open(path, "rb") as raw, zipfile.ZipFile(raw) as zf:
+        for info in zf.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: member {name} is compressed and cannot be memory mapped")
+            # Local file header: 30 fixed bytes, then the name and extra field
+            raw.seek(info.header_offset)
+            local = raw.read(30)
+            name_len = int.from_bytes(local[26:28], "little")
+            extra_len = int.from_bytes(local[28:30], "little")
+            raw.seek(info.header_offset + 30 + name_len + extra_len)
+            shape, fortran, dtype = _read_npy_header(raw)
+            if 0 in shape:
+                members[name] = np.zeros(shape, dtype=dtype)
+            else:
+                members[name] = np.memmap(path, dtype=dtype, mode="r", offset=raw.tell(),
+                                          shape=shape, order="F" if fortran else "C")
+
+    header = json.loads(bytes(np.asarray(members.pop("header"))).decode())
+    if header.get("format") != FORMAT:
+        raise ValueError(f"{path} is not a {FORMAT} container")
+    if header.get("version", 0) > VERSION:
+        raise ValueError(f"{path} has container version {header['version']}; this build reads up to {VERSION}")
+    return header, members
+
+
+def load_graph(path):
+    """Load a container into the in-memory layout DataManager uses.
+
+    Returns:
+        tuple: (nodes (N, 7) float array, edges (E, 2) array, file_names or None)
+    """
+    header, members = open_graph(path)
+    n = header["n_nodes"]
+    if n == 0:
+        nodes = np.array([])
+    else:
+        nodes = np.empty((n, 7))
+        for name, cols, _ in _NODE_COLUMNS:
+            col = members[name]
+            nodes[:, cols if len(cols) > 1 else cols[0]] = col
+    edges = np.array(members["edges"]) if header["n_edges"] else np.array([])
+    return nodes, edges, header.get("file_names")
+
+
+def build_networkx_graph(nodes, edges):
+    """
+    Creates a NetworkX graph with:
+    Node: t (point_id), x, y, yaw, zone=0, width=0, indicator=0
+    Edge: weight=EuclideanDistance
+
+    Attributes and weights are computed in bulk and fed to add_*_from.
+    """
+    G = nx.DiGraph()
+
+    if nodes.size > 0:
+        ids = nodes[:, 0].astype(np.int64).tolist()
+        keys = ("x", "y", "yaw", "zone", "width", "indicator")
+        attrs = nodes[:, 1:7].astype(float).tolist()
+        G.add_nodes_from(zip(ids, (dict(zip(keys, row)) for row in attrs)))
+
+    if edges.size > 0:
+        edges = edges.reshape(-1, 2)
+        weights = edge_weights(nodes, edges).tolist()
+        us = edges[:, 0].astype(np.int64).tolist()
+        vs = edges[:, 1].astype(np.int64).tolist()
+        G.add_edges_from((u, v, {"weight": w}) for u, v, w in zip(us, vs, weights))
+
+    return G
+
+
+def edge_weights(nodes, edges):
+    """Euclidean length of every edge in one pass; 1.0 where an endpoint has no node.
+
+    When a point_id appears on several rows the last one is used, as a dict
+    built row by row would.
+    """
+    weights = np.ones(edges.shape[0])
+    if nodes.size == 0 or edges.size == 0:
+        return weights
+    ids = nodes[:, 0].astype(np.int64)
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+
+    def rows_of(point_ids):
+        pos = np.searchsorted(sorted_ids, point_ids, side="right") - 1
+        found = (pos >= 0) & (sorted_ids[np.maximum(pos, 0)] == point_ids)
+        return order[np.maximum(pos, 0)], found
+
+    u_rows, u_found = rows_of(edges[:, 0].astype(np.int64))
+    v_rows, v_found = rows_of(edges[:, 1].astype(np.int64))
+    ok = u_found & v_found
+    delta = nodes[v_rows[ok], 1:3] - nodes[u_rows[ok], 1:3]
+    weights[ok] = np.sqrt((delta ** 2).sum(axis=1))
+    return weights
+
+
+def write_node_link_json(path, nodes, edges, chunk_size=10000):
+    """Stream ``json_graph.node_link_data(G, edges="links")`` for the graph to path.
+
+    Output is what ``json.dump`` of that dict writes (no indent), produced
+    straight from the arrays a chunk at a time instead of via a NetworkX
+    graph, so memory stays bounded. Node and link order, duplicate-id and
+    duplicate-edge handling match build_networkx_graph.
+    """
+    nodes = nodes.reshape(-1, nodes.shape[-1]) if nodes.size else np.zeros((0, 7))
+    edges = edges.reshape(-1, 2).astype(np.int64) if edges.size else np.zeros((0, 2), dtype=np.int64)
+    keys = ("x", "y", "yaw", "zone", "width", "indicator")
+
+    # Nodes in first-seen order, attributes from the last row with that id
+    ids = nodes[:, 0].astype(np.int64)
+    uniq, first = np.unique(ids, return_index=True)
+    _, last_rev = np.unique(ids[::-1], return_index=True)
+    order = np.argsort(first, kind="stable")
+    node_ids = uniq[order]
+    attr_rows = (len(ids) - 1 - last_rev)[order]
+
+    # Edge endpoints without a node row become bare {"id": ...} nodes, in first-seen order
+    endpoints = edges.ravel()
+    missing = endpoints[~np.isin(endpoints, uniq)]
+    extra_uniq, extra_first = np.unique(missing, return_index=True)
+    extra_ids = extra_uniq[np.argsort(extra_first, kind="stable")]
+
+    # Links grouped by source in node order, then by first occurrence; the last duplicate's weight wins
+    all_ids = np.concatenate([node_ids, extra_ids])
+    sorter = np.argsort(all_ids, kind="stable")
+    weights = edge_weights(nodes, edges)
+    if len(edges):
+        pairs, pair_first, pair_inverse = np.unique(edges, axis=0, return_index=True, return_inverse=True)
+        pair_inverse = pair_inverse.ravel()
+        pair_weight = np.empty(len(pairs))
+        pair_weight[pair_inverse] = weights  # later rows overwrite earlier ones
+        src_rank = sorter[np.searchsorted(all_ids, pairs[:, 0], sorter=sorter)]
+        link_order = np.lexsort((pair_first, src_rank))
+        pairs, pair_weight = pairs[link_order], pair_weight[link_order]
+    else:
+        pairs, pair_weight = edges, weights
+
+    def chunks(items):
+        for start in range(0, len(items), chunk_size):
+            yield json.dumps(items[start:start + chunk_size])[1:-1]
+
+    with open(path, "w") as f:
+        f.write('{"directed": true, "multigraph": false, "graph": {}, "nodes": [')
+        sep = ""
+        for start in range(0, len(node_ids), chunk_size):
+            rows = attr_rows[start:start + chunk_size]
+            attrs = nodes[rows, 1:7].astype(float).tolist()
+            items = [dict(zip(keys, row), id=pid) for row, pid in zip(attrs, node_ids[start:start + chunk_size].tolist())]
+            for text in chunks(items):
+                f.write(sep + text)
+                sep = ", "
+        for text in chunks([{"id": pid} for pid in extra_ids.tolist()]):
+            f.write(sep + text)
+            sep = ", "
+        f.write('], "links": [')
+        sep = ""
+        for start in range(0, len(pairs), chunk_size):
+            block = pairs[start:start + chunk_size].tolist()
+            block_weights = pair_weight[start:start + chunk_size].tolist()
+            items = [{"weight": w, "source": u, "target": v} for (u, v), w in zip(block, block_weights)]
+            f.write(sep + json.dumps(items)[1:-1])
+            sep = ", "
+        f.write("]}")
+    return path
+
+
+def write_exports(folder, nodes, edges, pickle_out=True, json_out=True):
+    """Write output.pickle / output.json for ``nodes``/``edges`` into folder. Returns written paths."""
+    written = []
+    if pickle_out:
+        G = build_networkx_graph(nodes, edges)
+        pickle_file_path = os.path.join(folder, PICKLE_FILE)
+        with open(pickle_file_path, "wb") as f:
+            pickle.dump(G, f, protocol=2)
+        print(f"Saved NetworkX graph to {pickle_file_path}")
+        written.append(pickle_file_path)
+    if json_out:
+        # Save as JSON for compatibility transfer
+        json_file_path = write_node_link_json(os.path.join(folder, JSON_FILE), nodes, edges)
+        print(f"Saved NetworkX graph as JSON to {json_file_path}")
+        written.append(json_file_path)
+    return written
+
+
+def export_networkx(container_path, pickle_out=True, json_out=True, force=False):
+    """Regenerate output.pickle/output.json next to a container if missing or older than it.
+
+    Returns the paths that were (re)written.
+    """
+    folder = os.path.dirname(os.path.abspath(container_path))
+    stamp = os.path.getmtime(container_path)
+
+    def stale(name):
+        target = os.path.join(folder, name)
+        return force or not os.path.exists(target) or os.path.getmtime(target) < stamp
+
+    pickle_out = pickle_out and stale(PICKLE_FILE)
+    json_out = json_out and stale(JSON_FILE)
+    if not (pickle_out or json_out):
+        return []
+    nodes, edges, _ = load_graph(container_path)
+    return write_exports(folder, nodes, edges, pickle_out=pickle_out, json_out=json_out)
+
+
+def _read_npy_header(f):
+    version = np.lib.format.read_magic(f)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(f)
+    return np.lib.format.read_array_header_2_0(f)
+
+
+def _compact(arr, dtype):
+    """Store arr as dtype when that is lossless, otherwise keep it as is."""
+    if dtype is None or arr.dtype == dtype:
+        return arr
+    with np.errstate(invalid="ignore"):
+        cast = arr.astype(dtype)
+    return cast if np.array_equal(cast, arr) else arr
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+    flags = set(sys.argv[2:]) or {"--pickle", "--json"}
+    paths = export_networkx(sys.argv[1], pickle_out="--pickle" in flags, json_out="--json" in flags, force=True)
+    print(f"Wrote {len(paths)} export(s)")
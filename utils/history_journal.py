@@ -0,0 +1,554 @@
+import mmap
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+
+def _row_count(arr):
+    return arr.shape[0] if arr.ndim == 2 else 0
+
+
+def _as_rows(arr, width, dtype):
+    """View a possibly flat-empty array (np.array([])) as (0, width) rows."""
+    if arr.ndim == 2:
+        return arr
+    return np.empty((0, width), dtype=dtype)
+
+
+class ArrayDelta:
+    """Row-level change to one 2-D array (nodes or edges).
+
+    Forward order is: overwrite touched rows, delete removed rows, append new
+    rows. Touched and removed row numbers refer to the array *before* the
+    edit, so the inverse runs the same steps backwards.
+    """
+
+    def __init__(self, arr):
+        self.n_before = _row_count(arr)
+        self.flat_before = arr.ndim != 2
+        self.n_after = self.n_before
+        self.flat_after = self.flat_before
+        self.width = arr.shape[1] if arr.ndim == 2 else 0
+        self.dtype = arr.dtype
+
+        self.touched_rows = None
+        self.touched_before = None
+        self.touched_after = None
+        self.removed_rows = None
+        self.removed_data = None
+        self.appended = None
+        # Full before/after copies, used when the array changes shape
+        self.replaced_before = None
+        self.replaced_after = None
+
+        # Recording state, dropped in finish()
+        self._surviving = None
+        self._touch_rows = []
+        self._touch_data = []
+        self._remove_rows = []
+        self._remove_data = []
+        self._full_before = None
+
+    # --- recording -------------------------------------------------------
+
+    def _to_original(self, rows):
+        """Map current row numbers to pre-edit row numbers (appended rows are dropped)."""
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        if self._surviving is None:
+            return rows[rows < self.n_before], rows < self.n_before
+        valid = rows < len(self._surviving)
+        return self._surviving[rows[valid]], valid
+
+    def touch(self, arr, rows):
+        """Record the current values of rows that are about to be modified."""
+        if self._full_before is not None or len(rows) == 0:
+            return
+        rows = np.asarray(rows, dtype=np.int64).ravel()
+        original, valid = self._to_original(rows)
+        if original.size:
+            self._touch_rows.append(original)
+            self._touch_data.append(arr[rows[valid]].copy())
+
+    def remove(self, arr, rows):
+        """Record rows that are about to be deleted from the array."""
+        if self._full_before is not None or len(rows) == 0:
+            return
+        rows = np.unique(np.asarray(rows, dtype=np.int64).ravel())
+        if self._surviving is None:
+            self._surviving = np.arange(self.n_before, dtype=np.int64)
+        original, valid = self._to_original(rows)
+        if original.size:
+            self._remove_rows.append(original)
+            self._remove_data.append(arr[rows[valid]].copy())
+            self._surviving = np.delete(self._surviving, rows[valid])
+
+    def capture_full(self, arr):
+        """Fall back to a full before/after copy (e.g. the column count is about to change)."""
+        if self._full_before is None:
+            self._full_before = arr.copy()
+
+    def finish(self, arr):
+        """Freeze the delta against the post-edit array. Returns False if nothing changed."""
+        self.n_after = _row_count(arr)
+        self.flat_after = arr.ndim != 2
+        width_after = arr.shape[1] if arr.ndim == 2 else self.width
+        if self._full_before is None and self.n_before and width_after != self.width:
+            raise ValueError("Array width changed during an edit without capture_full()")
+
+        if self._full_before is not None:
+            if not np.array_equal(self._full_before, arr):
+                self.replaced_before = self._full_before
+                self.replaced_after = arr.copy()
+            self._reset_recording()
+            return self.replaced_before is not None
+
+        self.width = width_after
+        n_surviving = len(self._surviving) if self._surviving is not None else self.n_before
+        if self.n_after > n_surviving:
+            self.appended = arr[n_surviving:].copy()
+
+        if self._remove_rows:
+            rows = np.concatenate(self._remove_rows)
+            order = np.argsort(rows, kind="stable")
+            self.removed_rows = rows[order]
+            self.removed_data = np.concatenate(self._remove_data)[order]
+
+        if self._touch_rows:
+            rows = np.concatenate(self._touch_rows)
+            data = np.concatenate(self._touch_data)
+            # Keep the first recorded value of each row: that is the pre-edit value
+            rows, first = np.unique(rows, return_index=True)
+            self.touched_rows = rows
+            self.touched_before = data[first]
+            self.touched_after = self.touched_before.copy()
+            if self._surviving is not None:
+                pos = np.searchsorted(self._surviving, rows)
+                in_range = pos < len(self._surviving)
+                alive = np.zeros(len(rows), dtype=bool)
+                alive[in_range] = self._surviving[pos[in_range]] == rows[in_range]
+                self.touched_after[alive] = arr[pos[alive]]
+            else:
+                self.touched_after = arr[rows].copy()
+            changed = np.any(self.touched_before != self.touched_after, axis=1)
+            if not np.any(changed):
+                self.touched_rows = self.touched_before = self.touched_after = None
+
+        self._reset_recording()
+        return self.touched_rows is not None or self.removed_rows is not None or self.appended is not None
+
+    def _reset_recording(self):
+        self._surviving = None
+        self._touch_rows = []
+        self._touch_data = []
+        self._remove_rows = []
+        self._remove_data = []
+        self._full_before = None
+
+    # --- replay ----------------------------------------------------------
+
+    def apply(self, arr):
+        """Return ``arr`` (the pre-edit state) with this delta applied."""
+        if self.replaced_before is not None:
+            return self.replaced_after.copy()
+        if _row_count(arr) != self.n_before:
+            raise ValueError("State does not match history delta")
+        arr = _as_rows(arr, self.width, self.dtype).copy()
+        if self.touched_rows is not None:
+            arr[self.touched_rows] = self.touched_after
+        if self.removed_rows is not None:
+            arr = np.delete(arr, self.removed_rows, axis=0)
+        if self.appended is not None:
+            arr = np.vstack([arr, self.appended]) if arr.size else self.appended.copy()
+        return np.array([]) if self.flat_after and arr.size == 0 else arr
+
+    def revert(self, arr):
+        """Return ``arr`` (the post-edit state) with this delta undone."""
+        if self.replaced_before is not None:
+            return self.replaced_before.copy()
+        if _row_count(arr) != self.n_after:
+            raise ValueError("State does not match history delta")
+        arr = _as_rows(arr, self.width, self.dtype)
+        if self.appended is not None:
+            arr = arr[:arr.shape[0] - len(self.appended)]
+        if self.removed_rows is not None:
+            full = np.empty((self.n_before, arr.shape[1]), dtype=np.result_type(arr, self.removed_data))
+            keep = np.ones(self.n_before, dtype=bool)
+            keep[self.removed_rows] = False
+            full[keep] = arr
+            full[self.removed_rows] = self.removed_data
+            arr = full
+        else:
+            arr = arr.copy()
+        if self.touched_rows is not None:
+            arr[self.touched_rows] = self.touched_before
+        return np.array([]) if self.flat_before and arr.size == 0 else arr
+
+    _ARRAY_FIELDS = ("touched_rows", "touched_before", "touched_after", "removed_rows",
+                     "removed_data", "appended", "replaced_before", "replaced_after")
+    _DATA_FIELDS = tuple(name for name in _ARRAY_FIELDS if not name.endswith("_rows"))
+
+    def arrays(self, prefix):
+        """The delta's arrays keyed for np.savez, skipping unset fields."""
+        return {prefix + name: getattr(self, name) for name in self._ARRAY_FIELDS
+                if getattr(self, name) is not None}
+
+    def drop_arrays(self):
+        for name in self._ARRAY_FIELDS:
+            setattr(self, name, None)
+
+    def load_arrays(self, data, prefix):
+        for name in self._ARRAY_FIELDS:
+            if prefix + name in data:
+                setattr(self, name, data[prefix + name])
+
+    def data_arrays(self):
+        """The stored row data, i.e. every field except row numbers."""
+        return [getattr(self, name) for name in self._DATA_FIELDS if getattr(self, name) is not None]
+
+    def map_data(self, fn):
+        """Replace every stored row-data array with fn(array)."""
+        for name in self._DATA_FIELDS:
+            if getattr(self, name) is not None:
+                setattr(self, name, fn(getattr(self, name)))
+
+    @property
+    def nbytes(self):
+        parts = [getattr(self, name) for name in self._ARRAY_FIELDS]
+        return sum(p.nbytes for p in parts if p is not None)
+
+
+class _Spillable:
+    """Mixin for journal items whose arrays can be paged out to a compressed .npz."""
+
+    spill_path = None
+
+    def _array_parts(self):
+        raise NotImplementedError
+
+    def spill(self, path):
+        arrays = {}
+        for prefix, part in self._array_parts():
+            arrays.update(part.arrays(prefix))
+        np.savez_compressed(path, **arrays)
+        for _, part in self._array_parts():
+            part.drop_arrays()
+        self.spill_path = path
+
+    def restore(self):
+        """Page the arrays back in. Returns the number of bytes made resident."""
+        if self.spill_path is None:
+            return 0
+        with np.load(self.spill_path) as data:
+            for prefix, part in self._array_parts():
+                part.load_arrays(data, prefix)
+        self.discard()
+        return self.nbytes
+
+    def discard(self):
+        if self.spill_path is not None:
+            try:
+                os.remove(self.spill_path)
+            except OSError:
+                pass
+            self.spill_path = None
+
+    @property
+    def nbytes(self):
+        return sum(part.nbytes for _, part in self._array_parts())
+
+
+class HistoryDelta(_Spillable):
+    """One undoable edit: node/edge row deltas plus the file_names change, if any."""
+
+    def __init__(self, nodes, edges, file_names):
+        self.nodes = ArrayDelta(nodes)
+        self.edges = ArrayDelta(edges)
+        self.names_before = list(file_names)
+        self.names_after = None
+
+    def _array_parts(self):
+        return (("nodes_", self.nodes), ("edges_", self.edges))
+
+    def finish(self, nodes, edges, file_names):
+        nodes_changed = self.nodes.finish(nodes)
+        edges_changed = self.edges.finish(edges)
+        if list(file_names) != self.names_before:
+            self.names_after = list(file_names)
+        else:
+            self.names_before = None
+        return nodes_changed or edges_changed or self.names_after is not None
+
+    def apply(self, nodes, edges, file_names):
+        names = list(self.names_after) if self.names_after is not None else list(file_names)
+        return self.nodes.apply(nodes), self.edges.apply(edges), names
+
+    def revert(self, nodes, edges, file_names):
+        names = list(self.names_before) if self.names_before is not None else list(file_names)
+        return self.nodes.revert(nodes), self.edges.revert(edges), names
+
+
+class _StateArrays:
+    """Holder giving a checkpoint's arrays the same spill interface as ArrayDelta."""
+
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
+
+    def arrays(self, prefix):
+        return {prefix + "nodes": self.nodes, prefix + "edges": self.edges}
+
+    def drop_arrays(self):
+        self.nodes = self.edges = None
+
+    def load_arrays(self, data, prefix):
+        self.nodes = data[prefix + "nodes"]
+        self.edges = data[prefix + "edges"]
+
+    @property
+    def nbytes(self):
+        # File-backed maps live in the page cache, not in our budget
+        return sum(a.nbytes for a in (self.nodes, self.edges)
+                   if a is not None and not isinstance(a, np.memmap))
+
+
+def _snapshot(arr, share_pages):
+    """Private copy of arr.
+
+    With share_pages, an unmodified copy-on-write memmap is instead re-mapped
+    read-only from its file, so the snapshot costs no RAM and keeps sharing
+    the file's pages; later private writes to arr don't reach the file.
+    """
+    if share_pages and isinstance(arr, np.memmap) and arr.mode == "c" and isinstance(arr.base, mmap.mmap):
+        order = "F" if arr.flags.f_contiguous and not arr.flags.c_contiguous else "C"
+        return np.memmap(arr.filename, dtype=arr.dtype, mode="r", offset=arr.offset, shape=arr.shape, order=order)
+    return arr.copy()
+
+
+class Checkpoint(_Spillable):
+    """Full copy of the state after a given number of journal entries."""
+
+    def __init__(self, nodes, edges, file_names, share_pages=False):
+        self.state = _StateArrays(_snapshot(nodes, share_pages), _snapshot(edges, share_pages))
+        self.file_names = list(file_names)
+
+    def _array_parts(self):
+        return (("", self.state),)
+
+
+def _ids_in(item):
+    """Point ids held by a resident journal item."""
+    if isinstance(item, Checkpoint):
+        node_arrays, edge_arrays = [item.state.nodes], [item.state.edges]
+    else:
+        node_arrays, edge_arrays = item.nodes.data_arrays(), item.edges.data_arrays()
+    ids = [a[:, 0].astype(np.int64) for a in node_arrays if a.ndim == 2 and a.size]
+    ids += [a.astype(np.int64).ravel() for a in edge_arrays if a.size]
+    return ids
+
+
+class HistoryJournal:
+    """Undo/redo journal of HistoryDelta entries.
+
+    Undo and redo apply one inverse/forward delta to the live state, so memory
+    scales with the size of each edit instead of the size of the map. A full
+    checkpoint of the state is kept every ``checkpoint_interval`` entries; if
+    the live state no longer matches the journal (it was replaced from
+    outside), the target state is rebuilt from the nearest checkpoint by
+    replaying at most ``checkpoint_interval`` deltas.
+
+    Resident history is capped at ``memory_limit`` bytes. Past the cap, the
+    entries and checkpoints furthest from the current position are written
+    to compressed .npz files in a private temp directory and paged back in
+    when undo/redo reaches them.
+    """
+
+    def __init__(self, nodes, edges, file_names, checkpoint_interval=50, memory_limit=256 * 1024 * 1024):
+        self.checkpoint_interval = max(1, int(checkpoint_interval))
+        self.memory_limit = memory_limit
+        self._spill_dir = None
+        self._spill_counter = 0
+        self._entries = []
+        self._redo = []
+        self._checkpoints = {}
+        self.reset(nodes, edges, file_names)
+
+    def reset(self, nodes, edges, file_names):
+        """Start over from the given (not yet edited) state."""
+        for item in self._items():
+            item.discard()
+        self._entries = []
+        self._redo = []
+        # A freshly loaded copy-on-write memmap is checkpointed by mapping its file again
+        self._checkpoints = {0: Checkpoint(nodes, edges, file_names, share_pages=True)}
+        self._resident = self._checkpoints[0].nbytes
+        self._enforce_budget()
+
+    def close(self):
+        """Drop everything and delete the spill directory."""
+        for item in self._items():
+            item.discard()
+        if self._spill_dir is not None:
+            self._cleanup()
+            self._spill_dir = None
+
+    def __len__(self):
+        # Number of reachable states, like the old list of snapshots
+        return len(self._entries) + 1
+
+    @property
+    def position(self):
+        return len(self._entries)
+
+    @property
+    def can_undo(self):
+        return bool(self._entries)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    def push(self, delta, nodes, edges, file_names):
+        self._entries.append(delta)
+        self._resident += delta.nbytes
+        for dropped in self._redo:
+            self._forget(dropped)
+        self._redo = []
+        position = self.position
+        # Checkpoints past this point belonged to the discarded redo branch
+        for key in [k for k in self._checkpoints if k >= position]:
+            self._forget(self._checkpoints.pop(key))
+        if position % self.checkpoint_interval == 0:
+            self._checkpoints[position] = Checkpoint(nodes, edges, file_names)
+            self._resident += self._checkpoints[position].nbytes
+        self._enforce_budget()
+
+    def undo(self, nodes, edges, file_names):
+        delta = self._entries.pop()
+        self._redo.append(delta)
+        self._page_in(delta)
+        try:
+            state = delta.revert(nodes, edges, file_names)
+        except ValueError:
+            state = self.state_at(self.position)
+        self._enforce_budget()
+        return state
+
+    def redo(self, nodes, edges, file_names):
+        delta = self._redo.pop()
+        self._entries.append(delta)
+        self._page_in(delta)
+        try:
+            state = delta.apply(nodes, edges, file_names)
+        except ValueError:
+            state = self.state_at(self.position)
+        self._enforce_budget()
+        return state
+
+    def state_at(self, position):
+        """Rebuild the state after ``position`` entries from the nearest checkpoint."""
+        base = max(k for k in self._checkpoints if k <= position)
+        checkpoint = self._checkpoints[base]
+        self._page_in(checkpoint)
+        nodes, edges, names = checkpoint.state.nodes.copy(), checkpoint.state.edges.copy(), list(checkpoint.file_names)
+        for delta in self._entries[base:position]:
+            self._page_in(delta)
+            nodes, edges, names = delta.apply(nodes, edges, names)
+        return nodes, edges, names
+
+    def point_ids(self):
+        """Every point id the journal can bring back (node ids and edge endpoints), with repeats."""
+        ids = []
+        for item in list(self._items()):
+            self._page_in(item)
+            ids.extend(_ids_in(item))
+            self._enforce_budget()
+        return np.concatenate(ids) if ids else np.array([], dtype=np.int64)
+
+    def remap_ids(self, remap):
+        """Rewrite point ids in every entry and checkpoint.
+
+        ``remap`` maps an array of old ids to new ids. It is applied to
+        column 0 of node rows and to every edge value, so undo/redo keep
+        working after the live state has been renumbered the same way.
+        """
+        def nodes_fn(arr):
+            if arr.ndim != 2 or arr.size == 0:
+                return arr
+            arr = arr.copy()
+            arr[:, 0] = remap(arr[:, 0])
+            return arr
+
+        def edges_fn(arr):
+            return remap(arr).astype(arr.dtype) if arr.size else arr
+
+        for item in list(self._items()):
+            self._page_in(item)
+            if isinstance(item, Checkpoint):
+                item.state.nodes = nodes_fn(item.state.nodes)
+                item.state.edges = edges_fn(item.state.edges)
+            else:
+                item.nodes.map_data(nodes_fn)
+                item.edges.map_data(edges_fn)
+            self._enforce_budget()
+
+    @property
+    def nbytes(self):
+        """Bytes of history currently held in memory (spilled items excluded)."""
+        return self._resident
+
+    @property
+    def spilled_count(self):
+        return sum(1 for item in self._items() if item.spill_path is not None)
+
+    # --- memory budget -----------------------------------------------------
+
+    def _items(self):
+        yield from self._entries
+        yield from self._redo
+        yield from self._checkpoints.values()
+
+    def _positioned_items(self):
+        """(position, item) for everything in the journal; redo entries sit above the current position."""
+        for i, delta in enumerate(self._entries):
+            yield i + 1, delta
+        top = self.position + len(self._redo)
+        for j, delta in enumerate(self._redo):
+            yield top - j, delta
+        for key, checkpoint in self._checkpoints.items():
+            yield key, checkpoint
+
+    def _page_in(self, item):
+        self._resident += item.restore()
+
+    def _forget(self, item):
+        if item.spill_path is None:
+            self._resident -= item.nbytes
+        item.discard()
+
+    def _enforce_budget(self):
+        if self.memory_limit is None or self._resident <= self.memory_limit:
+            return
+        current = self.position
+        candidates = [(abs(pos - current), pos, item) for pos, item in self._positioned_items()
+                      if item.spill_path is None and item.nbytes > 0]
+        # Furthest from the current position first. Checkpoints are only read on
+        # recovery, so they may go at any distance; the next undo/redo step stays resident.
+        candidates.sort(key=lambda c: (isinstance(c[2], Checkpoint), c[0]), reverse=True)
+        for distance, _, item in candidates:
+            if self._resident <= self.memory_limit:
+                break
+            if distance <= 1 and not isinstance(item, Checkpoint):
+                continue
+            size = item.nbytes
+            item.spill(self._next_spill_path())
+            self._resident -= size
+
+    def _next_spill_path(self):
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="lane_history_")
+            self._cleanup = weakref.finalize(self, shutil.rmtree, self._spill_dir, ignore_errors=True)
+        self._spill_counter += 1
+        return os.path.join(self._spill_dir, f"history_{self._spill_counter:06d}.npz")
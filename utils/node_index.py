@@ -0,0 +1,52 @@
+import numpy as np
+
+
+class NodeIndex:
+    """Hash index mapping point_id -> row in a nodes array.
+
+    The index is owned by DataManager. Appends are applied incrementally;
+    anything that shifts rows (deletes, undo/redo, wholesale replacement of
+    the array) just invalidates it and the next lookup rebuilds it in O(N).
+    When ids are duplicated the first row wins, matching the old
+    ``nodes[nodes[:, 0] == pid][0]`` lookups.
+    """
+
+    def __init__(self):
+        self._rows = {}
+        self.valid = False
+
+    def invalidate(self):
+        self.valid = False
+
+    def rebuild(self, nodes):
+        if nodes.size == 0:
+            self._rows = {}
+        else:
+            ids = nodes[:, 0].astype(np.int64).tolist()
+            n = len(ids)
+            # Reversed so that the first occurrence of a duplicate id is kept
+            self._rows = dict(zip(reversed(ids), range(n - 1, -1, -1)))
+        self.valid = True
+
+    def append(self, point_id, row):
+        if self.valid:
+            self._rows.setdefault(int(point_id), int(row))
+
+    def row(self, point_id):
+        """Return the row of point_id, or None if it is not present."""
+        try:
+            return self._rows.get(int(point_id))
+        except (TypeError, ValueError):
+            return None
+
+    def rows(self, point_ids):
+        """Vectorized lookup. Missing ids map to -1."""
+        point_ids = np.asarray(point_ids).ravel()
+        get = self._rows.get
+        return np.fromiter((get(int(pid), -1) for pid in point_ids), dtype=np.int64, count=len(point_ids))
+
+    def __contains__(self, point_id):
+        return self.row(point_id) is not None
+
+    def __len__(self):
+        return len(self._rows)
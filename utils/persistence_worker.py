@@ -0,0 +1,121 @@
+import atexit
+import os
+import threading
+import time
+
+
+class WriteJob:
+    """A unit of background disk I/O built from an immutable snapshot.
+
+    Jobs with the same ``key`` coalesce while they wait: by default the newer
+    snapshot simply replaces the older one. ``run`` returns the paths it wrote
+    so the worker can fsync them on flush.
+    """
+
+    def __init__(self, key, fn, *args):
+        self.key = key
+        self.fn = fn
+        self.args = args
+
+    def merge(self, newer):
+        return newer
+
+    def run(self):
+        return self.fn(*self.args) or []
+
+
+class PersistenceWorker:
+    """Single background thread that performs queued WriteJobs.
+
+    submit() returns immediately. Bursts of edits coalesce into one write
+    per key: a job waits ``delay`` seconds before running, and anything
+    submitted for the same key in the meantime is merged into it.
+    flush() is the barrier: it blocks until everything submitted so far
+    has been written (and optionally fsync'ed).
+    """
+
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self._pending = {}
+        self._running = 0
+        self._written = set()
+        self._errors = []
+        self._flush_requested = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="persistence-worker", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, job):
+        with self._cond:
+            queued = self._pending.get(job.key)
+            self._pending[job.key] = job if queued is None else queued.merge(job)
+            self._cond.notify_all()
+
+    def flush(self, fsync=False, timeout=None):
+        """Wait for all submitted jobs to finish.
+
+        Returns a list of error messages raised by jobs since the last flush.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            # Skip the coalescing delay for whatever is queued now
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._pending or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._flush_requested = False
+                    return self._take_errors() + ["Timed out waiting for pending writes"]
+                self._cond.wait(remaining)
+            self._flush_requested = False
+            written, self._written = self._written, set()
+            errors = self._take_errors()
+
+        if fsync:
+            for path in written:
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                except OSError:
+                    continue  # Deleted by a later job
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        return errors
+
+    @property
+    def idle(self):
+        with self._cond:
+            return not self._pending and not self._running
+
+    def _take_errors(self):
+        errors, self._errors = self._errors, []
+        return errors
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+                self._running += 1
+                # Let a burst of submits coalesce before touching the disk
+                end = time.monotonic() + self.delay
+                while not self._flush_requested and time.monotonic() < end:
+                    self._cond.wait(end - time.monotonic())
+                jobs, self._pending = list(self._pending.values()), {}
+
+            for job in jobs:
+                try:
+                    written = job.run()
+                except Exception as e:
+                    print(f"Background write {job.key} failed: {e}")
+                    written = []
+                    with self._cond:
+                        self._errors.append(f"{job.key}: {e}")
+                with self._cond:
+                    self._written.update(written)
+
+            with self._cond:
+                self._running -= 1
+                self._cond.notify_all()
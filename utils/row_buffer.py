@@ -0,0 +1,70 @@
+import numpy as np
+
+
+class RowBuffer:
+    """Capacity-doubling backing store for a 2-D array that mostly grows at the end.
+
+    ``view`` is a zero-copy slice of the live rows, so appends are amortized
+    O(1) instead of the full copy np.vstack makes. Deletes and wholesale
+    replacements just adopt the new array as the buffer (capacity == length);
+    the next append grows it.
+    """
+
+    def __init__(self, arr=None, width=None, min_capacity=16):
+        self.width = width
+        self.min_capacity = min_capacity
+        self._data = None
+        self._n = 0
+        self._flat = True
+        self.adopt(np.array([]) if arr is None else arr)
+
+    def adopt(self, arr):
+        """Take ``arr`` as the new contents without copying it."""
+        arr = np.asanyarray(arr)  # Keep np.memmap as is
+        if arr.ndim != 2:
+            if arr.size == 0:
+                self._data = None
+                self._n = 0
+                self._flat = True
+                return
+            arr = arr.reshape(-1, self.width or arr.shape[0])
+        self._data = arr
+        self._n = arr.shape[0]
+        self._flat = False
+        if self.width is None:
+            self.width = arr.shape[1]
+
+    def extend(self, rows):
+        """Append rows; returns the row number of the first one."""
+        rows = np.asarray(rows)
+        rows = rows.reshape(-1, rows.shape[-1])
+        start = self._n
+        if self._data is None:
+            capacity = max(self.min_capacity, rows.shape[0])
+            self._data = np.empty((capacity, rows.shape[1]), dtype=rows.dtype)
+        elif start + rows.shape[0] > self._data.shape[0] or not np.can_cast(rows.dtype, self._data.dtype):
+            capacity = max(self.min_capacity, 2 * self._data.shape[0], start + rows.shape[0])
+            dtype = np.result_type(self._data, rows)
+            grown = np.empty((capacity, self._data.shape[1]), dtype=dtype)
+            grown[:start] = self._data[:start]
+            self._data = grown
+        self._data[start:start + rows.shape[0]] = rows
+        self._n = start + rows.shape[0]
+        self._flat = False
+        return start
+
+    @property
+    def view(self):
+        if self._flat:
+            return np.array([])
+        if self._n == self._data.shape[0]:
+            # Hand out the adopted array itself (e.g. a memmap of the loaded file)
+            return self._data
+        return self._data[:self._n]
+
+    @property
+    def capacity(self):
+        return 0 if self._data is None else self._data.shape[0]
+
+    def __len__(self):
+        return self._n
@@ -0,0 +1,243 @@
+"""Spatially tiled on-disk layout of the lane graph for viewport-sized editing.
+
+The graph is bucketed into square tiles ``tile_size`` map units wide. Each
+``tile_<i>_<j>.npz`` holds the nodes inside that tile and the edges that
+belong to it (an edge belongs to its source node's tile, or to its
+target's if the source is gone). ``tiles.json`` lists the tiles with their
+sizes. The backend keeps only the tiles around the viewport in a
+DataManager and writes them back when the viewport moves, so memory
+follows the visible area instead of the whole map.
+
+Point ids stay global: ``next_id`` is the first id not used by any tile,
+so nodes added in one window never collide with nodes in tiles that are
+not loaded.
+"""
+import json
+import os
+import re
+
+import numpy as np
+
+TILES_FORMAT = "lane-graph-tiles"
+TILES_VERSION = 1
+MANIFEST_FILE = "tiles.json"
+
+_TILE_RE = re.compile(r"^tile_(-?\d+)_(-?\d+)\.npz$")
+
+
+def tile_keys(xy, tile_size):
+    """(N, 2) integer tile coordinates of (N, 2) points."""
+    return np.floor(np.asarray(xy, dtype=float).reshape(-1, 2) / tile_size).astype(np.int64)
+
+
+class TileStore:
+    """Reads and writes the tiles of one tiled workspace directory."""
+
+    def __init__(self, directory):
+        path = os.path.join(directory, MANIFEST_FILE)
+        with open(path) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != TILES_FORMAT:
+            raise ValueError(f"{path} is not a tile manifest")
+        self.directory = directory
+        self.tile_size = float(manifest["tile_size"])
+        self.next_id = int(manifest["next_id"])
+        self.file_names = manifest["file_names"]
+        self._tiles = {_parse_key(k): tuple(v) for k, v in manifest["tiles"].items()}
+        self._spilled = {}  # Outside tile -> ids of nodes the current window moved there
+
+    @classmethod
+    def build(cls, directory, nodes, edges, file_names, tile_size):
+        """Bucket a whole graph into tiles under directory, replacing any tiles there."""
+        if not tile_size or tile_size <= 0:
+            raise ValueError(f"Tile size must be positive, got {tile_size}")
+        nodes, edges = _rows(nodes, 7), _rows(edges, 2)
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if _TILE_RE.match(name):
+                os.remove(os.path.join(directory, name))
+
+        store = cls.__new__(cls)
+        store.directory = directory
+        store.tile_size = float(tile_size)
+        store.next_id = int(nodes[:, 0].max()) + 1 if len(nodes) else 0
+        store.file_names = list(file_names or [])
+        store._tiles = {}
+        store._spilled = {}
+        for key, (tile_nodes, tile_edges) in store._bucket(nodes, edges).items():
+            store._write(key, tile_nodes, tile_edges)
+        store._save_manifest()
+        print(f"Tiled {len(nodes)} nodes into {len(store._tiles)} tiles of {store.tile_size:g} units")
+        return store
+
+    def tiles_for(self, bbox, halo=1):
+        """Keys of the existing tiles intersecting bbox (x0, y0, x1, y1) grown by ``halo`` tiles."""
+        x0, y0, x1, y1 = bbox
+        lo = tile_keys([min(x0, x1), min(y0, y1)], self.tile_size)[0] - halo
+        hi = tile_keys([max(x0, x1), max(y0, y1)], self.tile_size)[0] + halo
+        return sorted(k for k in self._tiles if lo[0] <= k[0] <= hi[0] and lo[1] <= k[1] <= hi[1])
+
+    def load(self, keys):
+        """Nodes and edges of the given tiles, in key order.
+
+        Edges leaving the loaded tiles are included; their far endpoint is
+        not, exactly as for a dangling edge.
+
+        Returns:
+            tuple: (nodes (N, 7), edges (E, 2)), or empty arrays when there is nothing
+        """
+        self._spilled = {}
+        parts = [self._read(key) for key in keys if key in self._tiles]
+        nodes = [n for n, _ in parts if len(n)]
+        edges = [e for _, e in parts if len(e)]
+        return (np.vstack(nodes) if nodes else np.array([]),
+                np.vstack(edges) if edges else np.array([]))
+
+    def store(self, keys, nodes, edges, file_names=None):
+        """Write back a window that was read with load(keys).
+
+        nodes/edges replace the contents of those tiles. Nodes that were
+        moved out of the window are added to the tile they now lie in.
+        """
+        keys = set(keys)
+        nodes, edges = _rows(nodes, 7), _rows(edges, 2)
+        groups = self._bucket(nodes, edges)
+        for key in keys - set(groups):
+            self._remove(key)
+        for key in keys & set(groups):
+            self._write(key, *groups[key])
+
+        # Outside tiles that this window moved nodes into, now or in an earlier
+        # store. What an earlier store put there is replaced, so a node moved
+        # back in or deleted since does not linger; ids are global, so any copy
+        # of a node the window holds is stale as well.
+        outside = {key for key in groups if key not in keys}
+        for key in sorted((outside | set(self._spilled)) - keys):
+            tile_nodes, tile_edges = groups.get(key, (np.zeros((0, 7)), np.zeros((0, 2), dtype=np.int64)))
+            if key in self._tiles:
+                old_nodes, old_edges = self._read(key)
+                stale = np.union1d(nodes[:, 0], list(self._spilled.get(key, ())))
+                owner = np.where(np.isin(old_edges[:, 0], old_nodes[:, 0]), old_edges[:, 0], old_edges[:, 1])
+                tile_nodes = np.vstack([old_nodes[~np.isin(old_nodes[:, 0], stale)], tile_nodes])
+                tile_edges = np.vstack([old_edges[~np.isin(owner, stale)], tile_edges])
+            if len(tile_nodes) or len(tile_edges):
+                self._write(key, tile_nodes, tile_edges)
+            else:
+                self._remove(key)
+        self._spilled = {key: set(groups[key][0][:, 0].tolist()) for key in outside}
+
+        if len(nodes):
+            self.next_id = max(self.next_id, int(nodes[:, 0].max()) + 1)
+        if file_names is not None:
+            self.file_names = list(file_names)
+        self._save_manifest()
+
+    def info(self):
+        """Summary for the frontend: tile size, counts and the tile-aligned map bounds."""
+        keys = np.array(list(self._tiles), dtype=np.int64).reshape(-1, 2)
+        bounds = None
+        if len(keys):
+            lo, hi = keys.min(axis=0) * self.tile_size, (keys.max(axis=0) + 1) * self.tile_size
+            bounds = [float(lo[0]), float(lo[1]), float(hi[0]), float(hi[1])]
+        return {
+            "tile_size": self.tile_size,
+            "tiles": len(self._tiles),
+            "nodes": int(sum(n for n, _ in self._tiles.values())),
+            "edges": int(sum(e for _, e in self._tiles.values())),
+            "bounds": bounds,
+        }
+
+    def keys(self):
+        """All tile keys, sorted."""
+        return sorted(self._tiles)
+
+    def __len__(self):
+        return len(self._tiles)
+
+    def __contains__(self, key):
+        return tuple(key) in self._tiles
+
+    def _bucket(self, nodes, edges):
+        """Split nodes by tile and hand every edge to its owner node's tile."""
+        if not len(nodes):
+            if len(edges):
+                print(f"Dropping {len(edges)} edges with no endpoint in the graph")
+            return {}
+        keys = tile_keys(nodes[:, 1:3], self.tile_size)
+        groups = {key: [nodes[rows], np.zeros((0, 2), dtype=np.int64)] for key, rows in _group(keys)}
+
+        ids = nodes[:, 0].astype(np.int64)
+        order = np.argsort(ids, kind="stable")
+        sorted_ids = ids[order]
+
+        def find(col):
+            pos = np.minimum(np.searchsorted(sorted_ids, col), len(ids) - 1)
+            return order[pos], sorted_ids[pos] == col
+
+        src_row, src_found = find(edges[:, 0].astype(np.int64))
+        dst_row, dst_found = find(edges[:, 1].astype(np.int64))
+        owned = src_found | dst_found
+        if not owned.all():
+            print(f"Dropping {int((~owned).sum())} edges with no endpoint in the graph")
+        owner = np.where(src_found, src_row, dst_row)[owned]
+        owned_edges = edges[owned].astype(np.int64)
+        for key, rows in _group(keys[owner]):
+            groups[key][1] = owned_edges[rows]
+        return {key: (n, e) for key, (n, e) in groups.items()}
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"tile_{key[0]}_{key[1]}.npz")
+
+    def _read(self, key):
+        with np.load(self._path(key)) as data:
+            return data["nodes"].reshape(-1, 7), data["edges"].reshape(-1, 2)
+
+    def _write(self, key, nodes, edges):
+        path = self._path(key)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, nodes=nodes, edges=edges)
+        os.replace(tmp_path, path)
+        self._tiles[key] = (len(nodes), len(edges))
+
+    def _remove(self, key):
+        if self._tiles.pop(key, None) is not None:
+            try:
+                os.remove(self._path(key))
+            except OSError as e:
+                print(f"Could not remove empty tile {key}: {e}")
+
+    def _save_manifest(self):
+        manifest = {
+            "format": TILES_FORMAT,
+            "version": TILES_VERSION,
+            "tile_size": self.tile_size,
+            "next_id": self.next_id,
+            "file_names": self.file_names,
+            "tiles": {f"{i},{j}": list(sizes) for (i, j), sizes in sorted(self._tiles.items())},
+        }
+        path = os.path.join(self.directory, MANIFEST_FILE)
+        with open(path + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(path + ".tmp", path)
+
+
+def _parse_key(text):
+    i, j = text.split(",")
+    return int(i), int(j)
+
+
+def _rows(arr, width):
+    arr = np.asarray(arr)
+    return arr.reshape(-1, arr.shape[-1]) if arr.size else np.zeros((0, width))
+
+
+def _group(keys):
+    """(key, row indices) for each distinct tile key, rows in their original order."""
+    if not len(keys):
+        return []
+    order = np.lexsort((keys[:, 1], keys[:, 0]))
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, (sorted_keys[1:] != sorted_keys[:-1]).any(axis=1)])
+    ends = np.r_[starts[1:], len(order)]
+    return [((int(sorted_keys[s, 0]), int(sorted_keys[s, 1])), order[s:e]) for s, e in zip(starts, ends)]
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+def edge_yaws(nodes, index, edge_pairs):
+    """Heading of each (from_id, to_id) edge, computed in one NumPy pass.
+
+    Ids are resolved through ``index`` (a NodeIndex over ``nodes``); edges
+    with an unknown endpoint are dropped.
+
+    Returns:
+        tuple: (from_rows, yaws) arrays of equal length.
+    """
+    edge_pairs = np.asarray(edge_pairs)
+    if nodes.size == 0 or edge_pairs.size == 0:
+        return np.array([], dtype=np.int64), np.array([])
+    edge_pairs = edge_pairs.reshape(-1, 2)
+
+    from_rows = index.rows(edge_pairs[:, 0])
+    to_rows = index.rows(edge_pairs[:, 1])
+    ok = (from_rows >= 0) & (to_rows >= 0)
+    from_rows, to_rows = from_rows[ok], to_rows[ok]
+
+    delta = nodes[to_rows, 1:3] - nodes[from_rows, 1:3]
+    return from_rows, np.arctan2(delta[:, 1], delta[:, 0])
+
+
+def last_per_row(rows, values):
+    """Keep the last value written for each row, like a sequential loop would."""
+    if rows.size == 0:
+        return rows, values
+    # np.unique returns first occurrences, so search the reversed arrays
+    unique_rows, first_in_reversed = np.unique(rows[::-1], return_index=True)
+    return unique_rows, values[::-1][first_in_reversed]
+
+
+def all_yaws(nodes, edges, index):
+    """Yaw of every node derived from the graph's edges.
+
+    A node points along its first out-edge (in edge-row order). A node with
+    no out-edge (end of a lane) keeps the heading of its first in-edge.
+    Isolated nodes are not returned.
+
+    Returns:
+        tuple: (rows, yaws) arrays of equal length.
+    """
+    if nodes.size == 0 or edges.size == 0:
+        return np.array([], dtype=np.int64), np.array([])
+    edges = edges.reshape(-1, 2)
+
+    from_rows = index.rows(edges[:, 0])
+    to_rows = index.rows(edges[:, 1])
+    ok = (from_rows >= 0) & (to_rows >= 0)
+    from_rows, to_rows = from_rows[ok], to_rows[ok]
+
+    delta = nodes[to_rows, 1:3] - nodes[from_rows, 1:3]
+    yaws = np.arctan2(delta[:, 1], delta[:, 0])
+
+    out_rows, first_out = np.unique(from_rows, return_index=True)
+    in_rows, first_in = np.unique(to_rows, return_index=True)
+    ends = ~np.isin(in_rows, out_rows)
+
+    rows = np.concatenate([out_rows, in_rows[ends]])
+    return rows, np.concatenate([yaws[first_out], yaws[first_in[ends]]])
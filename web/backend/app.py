@@ -10,8 +10,12 @@ from flask_cors import CORS
 # Adjust path to import from the parent project
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from utils.data_loader import DataLoader
+from utils.data_loader import DataLoader, chain_lanes, infer_zone, lane_nodes, load_array, run_parallel
 from utils.data_manager import DataManager
+from utils.graph_container import GRAPH_FILE, JSON_FILE, export_networkx
+from utils.lane_cache import LaneCache
+from utils.persistence_worker import PersistenceWorker
+from utils.tile_store import TileStore
 from web.backend.utils.curve_utils import find_path, smooth_segment
 
 # --- App Setup ---
@@ -29,6 +33,24 @@ lanes_root = os.path.join(project_root, 'lanes')
 raw_data_path = os.path.join(lanes_root, 'Gitam_lanes')
 TEMP_LANES_DIR = os.path.join(graph_dir, "temp_lanes")
 
+# Undo history kept in RAM per session; older states are spilled to a temp dir
+HISTORY_MEMORY_LIMIT = 256 * 1024 * 1024
+
+# Preprocessed lane arrays kept across /api/load calls
+LANE_CACHE_BYTES = 512 * 1024 * 1024
+
+# Import resampling of raw lanes (see DataLoader.prepare_lane); None disables.
+# IMPORT_MIN_SPACING drops near-duplicate points from stationary stretches,
+# IMPORT_SPACING resamples every lane to a fixed arc-length step.
+IMPORT_SPACING = None
+IMPORT_MIN_SPACING = None
+
+# Tiled workspace mode (see utils/tile_store.py): only the tiles around the
+# viewport are held in data_manager, plus TILE_HALO tiles on every side
+TILES_DIR = os.path.join(graph_dir, "tiles")
+TILE_SIZE = 200.0
+TILE_HALO = 1
+
 # Paths for saved working state
 nodes_path = os.path.join(graph_dir, 'graph_nodes0.npy')
 edges_path = os.path.join(graph_dir, 'graph_edges0.npy')
@@ -38,7 +60,7 @@ files_path_ = []  # No default files
 files_path = []
 
 # Initialize DataLoader with default path
-loader = DataLoader(raw_data_path)
+loader = DataLoader(raw_data_path, spacing=IMPORT_SPACING, min_spacing=IMPORT_MIN_SPACING)
 
 # Initialize empty if not loading saved data
 final_nodes = np.array([])
@@ -54,19 +76,122 @@ if final_nodes.size == 0:
     final_nodes = np.array([])
     final_edges = np.array([])
 
-data_manager = DataManager(final_nodes, final_edges, file_names)
+data_manager = DataManager(final_nodes, final_edges, file_names, history_memory_limit=HISTORY_MEMORY_LIMIT)
+
+# Autosaves run on this thread so responses don't wait for disk I/O.
+# Anything that reads the temp/workspace files back must persistence.flush() first.
+persistence = PersistenceWorker()
+
+# Unchanged temp lanes are not re-read or re-parsed on reload
+lane_cache = LaneCache(LANE_CACHE_BYTES)
+
+# Set while in tiled mode; tile_window are the tile keys data_manager holds
+tile_store = None
+tile_window = []
+
+
+def flush_tile_window(force=False):
+    """Write the tiles held by data_manager back to the tile store if they were edited."""
+    history = data_manager.history
+    if tile_store is not None and (force or history.can_undo or history.can_redo):
+        tile_store.store(tile_window, data_manager.nodes, data_manager.edges, data_manager.file_names)
+
+
+def set_tile_window(keys, reload=False):
+    """Make data_manager hold exactly the given tiles, writing back the ones it held before.
+
+    The window must already be flushed when reload is set (close reads the
+    tile keys after the flush, since it can create tiles).
+    """
+    global data_manager, tile_window
+    if keys == tile_window and not reload:
+        return
+    if not reload:
+        flush_tile_window()
+    nodes, edges = tile_store.load(keys)
+    data_manager.history.close()
+    # Ids used by tiles that are not loaded must not be handed out again
+    data_manager = DataManager(nodes, edges, tile_store.file_names,
+                               history_memory_limit=HISTORY_MEMORY_LIMIT, id_floor=tile_store.next_id)
+    tile_window = keys
+
+
+def tile_status():
+    if tile_store is None:
+        return None
+    status = tile_store.info()
+    status['loaded'] = [list(key) for key in tile_window]
+    return status
 
 
 # --- API Endpoints ---
 @app.route('/api/data', methods=['GET'])
 def get_data():
+    # In tiled mode ?bbox=x0,y0,x1,y1 moves the window to the tiles around that viewport
+    bbox = request.args.get('bbox')
+    if tile_store is not None and bbox:
+        try:
+            set_tile_window(tile_store.tiles_for([float(v) for v in bbox.split(',')], TILE_HALO))
+        except Exception as e:
+            print(f"Error loading tiles for {bbox}: {e}")
+            return jsonify({'status': 'error', 'message': str(e)}), 400
+
     nodes_list = data_manager.nodes.tolist() if data_manager.nodes.size > 0 else []
     edges_list = data_manager.edges.tolist() if data_manager.edges.size > 0 else []
-    return jsonify({
+    response = {
         'nodes': nodes_list,
         'edges': edges_list,
         'file_names': data_manager.file_names
-    })
+    }
+    if tile_store is not None:
+        response['tiles'] = tile_status()
+    return jsonify(response)
+
+
+@app.route('/api/tiles', methods=['POST'])
+def tiles_endpoint():
+    """Enter, reopen or leave the tiled workspace mode.
+
+    action "build": bucket the current graph into TILES_DIR (tile_size optional)
+    action "open":  continue with the tiles already in TILES_DIR
+    action "close": write back the window and hold the whole graph again
+    After build/open nothing is loaded until /api/data is called with a bbox.
+    """
+    global data_manager, tile_store, tile_window
+    try:
+        data = request.get_json() or {}
+        action = data.get('action')
+
+        if action in ('build', 'open'):
+            if tile_store is not None:
+                return jsonify({'status': 'error', 'message': 'Already in tiled mode; close it first'}), 400
+            if action == 'build':
+                tile_store = TileStore.build(TILES_DIR, data_manager.nodes, data_manager.edges,
+                                             data_manager.file_names, float(data.get('tile_size') or TILE_SIZE))
+            else:
+                tile_store = TileStore(TILES_DIR)
+            data_manager.history.close()
+            data_manager = DataManager(np.array([]), np.array([]), tile_store.file_names,
+                                       history_memory_limit=HISTORY_MEMORY_LIMIT, id_floor=tile_store.next_id)
+            tile_window = []
+
+        elif action == 'close':
+            if tile_store is None:
+                return jsonify({'status': 'error', 'message': 'Not in tiled mode'}), 400
+            # Flush first: an edit may have put nodes into tiles that do not exist yet
+            flush_tile_window(force=True)
+            set_tile_window(tile_store.keys(), reload=True)
+            data_manager.id_floor = 0
+            data_manager.sync_next_id()
+            tile_store, tile_window = None, []
+
+        else:
+            return jsonify({'status': 'error', 'message': f"Unknown tiles action: {action}"}), 400
+
+        return jsonify({'status': 'success', 'tiles': tile_status()})
+    except Exception as e:
+        print(f"Error in tiles endpoint: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
 @app.route('/api/save', methods=['POST'])
@@ -79,10 +204,18 @@ def save_data():
         data_manager.edges = edges_array
         data_manager.sync_next_id()
 
-        data_manager.save_by_web(os.path.join(base_dir, "workspace"))
+        if tile_store is not None:
+            # The window is written back into its tiles; graph.npz and temp lanes
+            # describe the whole map and are left alone
+            flush_tile_window(force=True)
+            return jsonify({'status': 'success', 'message': f"Saved {len(tile_window)} tiles"})
+
+        # graph.npz is always written; output.pickle/output.json only if asked for
+        exports = data.get('exports', [])
+        data_manager.save_by_web(os.path.join(base_dir, "workspace"), writer=persistence, exports=exports)
         
         # Save temp lanes
-        split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR)
+        split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR, writer=persistence)
         
         if merged_files:
             print(f"Files merged away during save: {merged_files}")
@@ -136,7 +269,7 @@ def get_files():
         # List saved graph files
         saved_files = []
         if os.path.exists(current_saved_path):
-            saved_files = [f for f in os.listdir(current_saved_path) if f.endswith('.npy')]
+            saved_files = [f for f in os.listdir(current_saved_path) if f.endswith('.npy') or f.endswith('.npz')]
 
         return jsonify({
             'raw_files': raw_files,
@@ -198,6 +331,12 @@ def load_data_endpoint():
     """Load selected raw files and/or saved graph files."""
     global data_manager, loader
     try:
+        # Only the window is in memory; merging into it would drop every other tile on the next save
+        if tile_store is not None:
+            return jsonify({'status': 'error', 'message': 'Close the tiled workspace before loading files'}), 400
+
+        # Temp lanes are read back below
+        persistence.flush()
         data = request.get_json()
         raw_files = data.get('raw_files', [])
         saved_nodes_file = data.get('saved_nodes_file')
@@ -216,13 +355,14 @@ def load_data_endpoint():
                 new_path = os.path.join(lanes_root, raw_data_dir)
 
             if os.path.exists(new_path):
-                loader = DataLoader(new_path)
+                loader = DataLoader(new_path, spacing=IMPORT_SPACING, min_spacing=IMPORT_MIN_SPACING)
                 print(f"Updated loader path to: {new_path}")
             else:
                 print(f"Warning: Requested directory {new_path} does not exist. Using default.")
 
         # Initialize with current data if NOT loading a saved graph
-        if saved_nodes_file and saved_edges_file:
+        # A graph container (.npz) holds both nodes and edges
+        if saved_nodes_file and (saved_edges_file or saved_nodes_file.endswith('.npz')):
             # ... (saved graph loading logic remains same)
             # We are loading a saved graph, so we start fresh
             final_nodes = np.array([])
@@ -240,9 +380,9 @@ def load_data_endpoint():
                 load_path = graph_dir
 
             nodes_path_full = os.path.join(load_path, saved_nodes_file)
-            edges_path_full = os.path.join(load_path, saved_edges_file)
+            edges_path_full = os.path.join(load_path, saved_edges_file) if saved_edges_file else None
 
-            if os.path.exists(nodes_path_full) and os.path.exists(edges_path_full):
+            if os.path.exists(nodes_path_full) and (edges_path_full is None or os.path.exists(edges_path_full)):
                 g_nodes, g_edges, g_names, g_D = loader.load_graph_data(nodes_path_full, edges_path_full)
 
                 if g_nodes.size > 0:
@@ -326,16 +466,11 @@ def load_data_endpoint():
                 if not os.path.exists(TEMP_LANES_DIR):
                     os.makedirs(TEMP_LANES_DIR)
 
-                loaded_nodes_list = []
-                loaded_edges_list = []
-                loaded_names_list = []
-                
-                current_pid = start_id_offset
-                
-                for i, filename in enumerate(files_to_load):
+                def read_lane(i, filename):
+                    """Copy-on-load and preprocess one lane; runs in the loader pool."""
                     temp_path = os.path.join(TEMP_LANES_DIR, filename)
                     raw_path = os.path.join(loader.directory, filename)
-                    
+
                     # COPY-ON-LOAD LOGIC:
                     # If temp file doesn't exist, copy from raw.
                     if not os.path.exists(temp_path):
@@ -344,64 +479,38 @@ def load_data_endpoint():
                             shutil.copy2(raw_path, temp_path)
                         else:
                             print(f"File not found in raw dir: {raw_path}")
-                            continue
-                    
-                    # ALWAYS load from temp
-                    load_source = temp_path
+                            return None, 0
+
+                    # Try to infer zone from filename (e.g. 'lane-99.npy' -> 99), else the file index
+                    zone = infer_zone(filename, i)
+
+                    def build(points):
+                        # Edited temp files (7 cols) keep their saved zone; raw copies get `zone`
+                        # and go through the loader's import resampling
+                        nodes = lane_nodes(points, zone, keep_saved_zone=True, raw_yaw=False)
+                        return loader.prepare_lane(nodes, points)
+
+                    # ALWAYS load from temp; unchanged files come straight from the cache
                     print(f"Loading {filename} from TEMP: {temp_path}")
-                        
                     try:
-                        points = np.load(load_source)
-                        if points.size == 0: continue
-                        
-                        if len(points.shape) == 1:
-                            points = points.reshape(-1, points.shape[0])
-                            
-                        N = points.shape[0]
-                        nodes = np.zeros((N, 7))
-                        edges = np.zeros((N - 1, 2), dtype=int)
-                        
-                        # Temp files should have 7 columns if edited, but might be raw copy (2 cols)
-                        if points.shape[1] >= 7:
-                            nodes[:, :] = points[:, 0:7]
-                            # CRITICAL CHANGE: Do NOT overwrite zone with 'i' if data exists.
-                            # We trust the saved Zone ID in the file.
-                            # nodes[:, 4] = i  <-- REMOVED override
-                        else:
-                            nodes[:, 1:3] = points[:, 0:2]
-                            
-                            # Try to infer zone from filename (e.g. 'lane-99.npy' -> 99)
-                            import re
-                            match = re.search(r'(\d+)', filename)
-                            if match:
-                                nodes[:, 4] = int(match.group(1))
-                            else:
-                                nodes[:, 4] = i # Default to file index if no number found
-                            
-                        # Assign IDs
-                        current_lane_pids = []
-                        for k in range(N):
-                            nodes[k, 0] = current_pid + k
-                            current_lane_pids.append(current_pid + k)
-                        
-                        # Edges - reconstruct sequentially
-                        for k in range(N - 1):
-                            edges[k, 0] = current_lane_pids[k]
-                            edges[k, 1] = current_lane_pids[k + 1]
-                            
-                        loaded_nodes_list.append(nodes)
-                        loaded_edges_list.append(edges)
-                        loaded_names_list.append(filename)
-                        
-                        current_pid += N
-                        
+                        nodes = lane_cache.load(temp_path, build, variant=(zone, loader.spacing, loader.min_spacing))
+                        # Header-only read for the reduction report
+                        raw_count = len(load_array(temp_path, "r")) if nodes is not None and loader.reduces else 0
+                        return nodes, raw_count
                     except Exception as e:
                         print(f"Error loading {filename}: {e}")
-                
+                        return None, 0
+
+                # Files are read concurrently; ids are then handed out in request order
+                results = run_parallel(read_lane, files_to_load)
+                loaded_nodes_list = [nodes for nodes, _ in results if nodes is not None]
+                loaded_names_list = [f for f, (nodes, _) in zip(files_to_load, results) if nodes is not None]
+                loader.report_reduction(sum(raw for _, raw in results), sum(len(nodes) for nodes in loaded_nodes_list))
+
                 if loaded_nodes_list:
-                    new_nodes = np.vstack(loaded_nodes_list)
-                    new_edges = np.vstack(loaded_edges_list)
+                    new_nodes, new_edges = chain_lanes(loaded_nodes_list, start_id_offset)
                     new_names = loaded_names_list
+                    loader.add_lanes(new_names, loaded_nodes_list)
                     
                     # Adjust Lane IDs (offset by existing max lane id)
                     new_nodes[:, 4] += lane_id_offset
@@ -431,7 +540,8 @@ def load_data_endpoint():
             final_nodes = np.array([])
             final_edges = np.array([])
 
-        data_manager = DataManager(final_nodes, final_edges, file_names)
+        data_manager.history.close()
+        data_manager = DataManager(final_nodes, final_edges, file_names, history_memory_limit=HISTORY_MEMORY_LIMIT)
 
         return jsonify({
             'status': 'success',
@@ -455,9 +565,11 @@ def unload_data_endpoint():
 
         if not filename:
             return jsonify({'status': 'error', 'message': 'No filename provided'}), 400
+        if tile_store is not None:
+            return jsonify({'status': 'error', 'message': 'Close the tiled workspace before unloading files'}), 400
 
         # Save temp lanes (this might trigger splits or merges)
-        split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR)
+        split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR, writer=persistence)
         
         # Identify files to remove: the file itself AND any split parts
         files_to_remove = [filename]
@@ -503,6 +615,8 @@ def unload_data_endpoint():
         if len(files_to_remove) > 1:
             print(f"Unloading {filename} and its derived parts: {files_to_remove}")
 
+        loader.remove_lanes(files_to_remove)
+
         success = True
         for f in files_to_remove:
             if not data_manager.remove_file(f):
@@ -532,6 +646,8 @@ def unload_data_endpoint():
 def reset_temp_file_endpoint():
     """Overwrite the temp file with the original raw file."""
     try:
+        # A queued autosave must not land on top of the reset file
+        persistence.flush()
         data = request.json
         filename = data.get('filename')
         raw_dir = data.get('raw_dir') # We need to know where the original is
@@ -557,6 +673,8 @@ def reset_temp_file_endpoint():
                 os.makedirs(TEMP_LANES_DIR)
                 
             shutil.copy2(raw_path, temp_path)
+            # copy2 keeps the raw file's mtime, so don't trust the cached stat
+            lane_cache.invalidate(temp_path)
             print(f"Reset temp file: {raw_path} -> {temp_path}")
             
             # Also delete any split parts (sub-lanes)
@@ -579,6 +697,9 @@ def reset_temp_file_endpoint():
             
             if deleted_parts:
                 print(f"Deleted split parts for {filename}: {deleted_parts}")
+
+            # These files changed behind save_temp_lanes' back; make sure the next save rewrites them
+            data_manager.forget_temp_lanes([filename] + deleted_parts)
             
             return jsonify({'status': 'success', 'message': f'Reset temp file for {filename} and deleted {len(deleted_parts)} sub-lanes.'})
         else:
@@ -635,7 +756,8 @@ def perform_operation():
             end_id = params.get('end_id')
             strict_direction = params.get('strict_direction', True)
             
-            path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction)
+            path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction,
+                             adjacency=data_manager.adjacency)
             if path:
                 data_manager.reverse_path(path)
             else:
@@ -647,7 +769,8 @@ def perform_operation():
             end_id = params.get('end_id')
             strict_direction = params.get('strict_direction', True)
             
-            path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction)
+            path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction,
+                             adjacency=data_manager.adjacency)
             if path:
                 # Delete nodes strictly between start and end
                 if len(path) > 2:
@@ -658,28 +781,33 @@ def perform_operation():
                  return jsonify({'status': 'error', 'message': msg, 'error_type': 'no_path'}), 404
 
         elif operation == 'copy_points':
-            data_manager.copy_points(params.get('point_ids'))
+            new_ids = data_manager.copy_points(params.get('point_ids'),
+                                               offset=params.get('offset') or (2.0, 2.0),
+                                               transform=params.get('transform'))
+            if new_ids is None:
+                return jsonify({'status': 'error',
+                                'message': 'offset must be [dx, dy] and transform a 2x2 or 2x3 matrix'}), 400
             
         elif operation == 'batch_add_nodes':
             points = params.get('points')
             lane_id = params.get('lane_id')
             connect_id = params.get('connect_to_start_id')
             
-            for pt in points:
-                new_id = data_manager.add_node(pt['x'], pt['y'], lane_id)
-                if connect_id is not None:
-                    data_manager.add_edge(connect_id, new_id)
-                connect_id = new_id # Chain them
+            # One transaction: a single vectorized append and a single undo entry
+            with data_manager.transaction():
+                new_ids = data_manager.add_nodes([(pt['x'], pt['y']) for pt in points], lane_id)
+                chain = ([connect_id] if connect_id is not None else []) + new_ids
+                data_manager.add_edges(list(zip(chain[:-1], chain[1:]))) # Chain them
                 
         elif operation == 'apply_updates':
             nodes_data = params.get('nodes')
             edges_data = params.get('edges')
+            # Assigning nodes/edges records the replacement in the undo history
             if nodes_data:
                 data_manager.nodes = np.array(nodes_data)
             if edges_data:
                 data_manager.edges = np.array(edges_data)
             data_manager.sync_next_id()
-            data_manager.history.append((data_manager.nodes.copy(), data_manager.edges.copy()))
             data_manager._auto_save_backup()
 
         elif operation == 'undo':
@@ -699,6 +827,18 @@ def perform_operation():
                 indicator=p_ind
             )
 
+        elif operation == 'recompute_yaws':
+            data_manager.recompute_all_yaws()
+
+        elif operation == 'compact_ids':
+            data_manager.compact_ids()
+
+        elif operation == 'restore_backup':
+            if tile_store is not None:
+                return jsonify({'status': 'error', 'message': 'Close the tiled workspace before restoring a backup'}), 400
+            if not data_manager.restore_backup(params.get('seq')):
+                return jsonify({'status': 'error', 'message': f"Could not restore backup {params.get('seq')}"}), 404
+
         elif operation == 'reverse_indicators':
             p_ids = params.get('point_ids')
             data_manager.reverse_indicators(p_ids)
@@ -714,7 +854,8 @@ def perform_operation():
             print(f"DEBUG: get_path requested {start_id} -> {end_id} (Strict: {strict_direction})")
             
             try:
-                path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction)
+                path = find_path(data_manager.edges, start_id, end_id, directed=strict_direction,
+                                 adjacency=data_manager.adjacency)
                 if path:
                      return jsonify({
                         'status': 'success',
@@ -733,8 +874,11 @@ def perform_operation():
         else:
             return jsonify({'status': 'error', 'message': f'Unknown operation: {operation}'}), 400
         
-        # Auto-save temp lanes after operation
-        split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR)
+        # Auto-save temp lanes after operation (a tile window holds only parts of them;
+        # it is written back to its tiles instead)
+        merged_files = []
+        if tile_store is None:
+            split_map, merged_files = data_manager.save_temp_lanes(TEMP_LANES_DIR, writer=persistence)
         
         # Handle merged files (delete them)
         if merged_files:
@@ -773,7 +917,8 @@ def smooth_path_endpoint():
             return jsonify({'status': 'error', 'message': 'Start and end IDs required'}), 400
 
         # Find path
-        path_indices = find_path(data_manager.edges, start_id, end_id, directed=strict_direction)
+        path_indices = find_path(data_manager.edges, start_id, end_id, directed=strict_direction,
+                                 adjacency=data_manager.adjacency)
         if not path_indices:
              msg = f'No directed path found between selected nodes.' if strict_direction else 'No path found between selected nodes.'
              return jsonify({'status': 'error', 'message': msg, 'error_type': 'no_path'}), 404
@@ -784,19 +929,21 @@ def smooth_path_endpoint():
         # But find_path returns IDs.
         
         # smooth_segment expects nodes array and path_ids
-        smoothed_points = smooth_segment(data_manager.nodes, data_manager.edges, path_indices, smoothness, weight)
+        smoothed_points = smooth_segment(data_manager.nodes, data_manager.edges, path_indices, smoothness, weight,
+                                         index=data_manager.node_index, adjacency=data_manager.adjacency)
         
         if smoothed_points is None:
             return jsonify({'status': 'error', 'message': 'Smoothing failed'}), 400
 
         # Reconstruct full node data for preview
         preview_nodes = []
+        index = data_manager.node_index
         # We assume smoothed_points corresponds 1-to-1 with path_indices
         for i, pid in enumerate(path_indices):
              # Find original node data
-             node_mask = data_manager.nodes[:, 0] == pid
-             if np.any(node_mask):
-                 original_node = data_manager.nodes[node_mask][0].copy()
+             row = index.row(pid)
+             if row is not None:
+                 original_node = data_manager.nodes[row].copy()
                  # Update X, Y
                  original_node[1] = smoothed_points[i][0]
                  original_node[2] = smoothed_points[i][1]
@@ -837,13 +984,14 @@ def check_path_direction():
             return jsonify({'status': 'error', 'message': 'Start and end IDs required'}), 400
 
         # Find path
-        path_indices = find_path(data_manager.edges, start_id, end_id)
+        path_indices = find_path(data_manager.edges, start_id, end_id, adjacency=data_manager.adjacency)
         if not path_indices:
              return jsonify({'status': 'error', 'message': 'No path found between selected nodes'}), 400
 
         # Validate Direction
         results = []
-        node_map = {node[0]: node for node in data_manager.nodes}
+        nodes = data_manager.nodes
+        index = data_manager.node_index
         
         mismatch_count = 0
         
@@ -851,11 +999,14 @@ def check_path_direction():
             curr_id = path_indices[i]
             next_id = path_indices[i+1]
             
-            curr_node = node_map.get(curr_id)
-            next_node = node_map.get(next_id)
+            curr_row = index.row(curr_id)
+            next_row = index.row(next_id)
             
-            if curr_node is None or next_node is None:
+            if curr_row is None or next_row is None:
                 continue
+
+            curr_node = nodes[curr_row]
+            next_node = nodes[next_row]
                 
             # Vector Check
             dx = next_node[1] - curr_node[1]
@@ -914,6 +1065,11 @@ def unload_graph_endpoint():
 @app.route('/api/visualize_network', methods=['POST'])
 def visualize_network_endpoint():
     try:
+        persistence.flush()
+        container_path = os.path.join(base_dir, "workspace", GRAPH_FILE)
+        if os.path.exists(container_path):
+            # network_view3 reads output.pickle
+            export_networkx(container_path, pickle_out=True, json_out=False)
         script_path = os.path.join(base_dir, "network_view3.py")
         print(f"Launching visualization script: {script_path}")
         
@@ -937,21 +1093,22 @@ def verify_yaw_endpoint():
         if nodes.size == 0 or edges.size == 0:
              return jsonify({'status': 'success', 'results': []})
 
-        # Create a map for quick node lookup
         # Node structure: [point_id, x, y, yaw, zone, width, indicator]
-        node_map = {int(row[0]): row for row in nodes}
+        index = data_manager.node_index
         
         results = []
         threshold = 0.4
 
         for edge in edges:
             u_id, v_id = int(edge[0]), int(edge[1])
+            u_row = index.row(u_id)
+            v_row = index.row(v_id)
             
-            if u_id not in node_map or v_id not in node_map:
+            if u_row is None or v_row is None:
                 continue
                 
-            u_node = node_map[u_id]
-            v_node = node_map[v_id]
+            u_node = nodes[u_row]
+            v_node = nodes[v_row]
             
             # Calculate geometric yaw of the edge
             dx = v_node[1] - u_node[1]
@@ -983,10 +1140,41 @@ def verify_yaw_endpoint():
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@app.route('/api/flush', methods=['POST'])
+def flush_endpoint():
+    """Block until every queued autosave is on disk (fsync'ed)."""
+    try:
+        errors = persistence.flush(fsync=True)
+        if errors:
+            return jsonify({'status': 'error', 'message': '; '.join(errors)}), 500
+        return jsonify({'status': 'success', 'message': 'All pending writes flushed'})
+    except Exception as e:
+        print(f"Error flushing writes: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@app.route('/api/backups', methods=['GET'])
+def list_backups():
+    """Restore points written by the autosave backup, oldest first."""
+    try:
+        points = [{'seq': seq, 'kind': kind, 'time': mtime}
+                  for seq, kind, mtime in data_manager.backups.points()]
+        return jsonify({'status': 'success', 'backups': points})
+    except Exception as e:
+        print(f"Error listing backups: {e}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
 @app.route('/api/get_saved_graph', methods=['GET'])
 def get_saved_graph_endpoint():
     try:
-        json_path = os.path.join(base_dir, "workspace", "output.json")
+        persistence.flush()
+        workspace_dir = os.path.join(base_dir, "workspace")
+        container_path = os.path.join(workspace_dir, GRAPH_FILE)
+        if os.path.exists(container_path):
+            # output.json is generated from the container on first request
+            export_networkx(container_path, pickle_out=False, json_out=True)
+        json_path = os.path.join(workspace_dir, JSON_FILE)
         if not os.path.exists(json_path):
              return jsonify({'status': 'error', 'message': 'Saved graph file (output.json) not found.'}), 404
              
@@ -3,16 +3,32 @@ from collections import deque
 import numpy as np
 from scipy.interpolate import splprep, splev
 
+from utils.adjacency_index import AdjacencyIndex
+
+
+def _get_node_coords(nodes, point_id, index=None):
+    """Retrieve (x, y) coordinates for a given point_id from a nodes array.
+
+    If a NodeIndex for ``nodes`` is given the lookup is O(1) instead of a scan.
+    """
+    if index is not None:
+        row = index.row(point_id)
+        return nodes[row, 1:3] if row is not None else None
 
-def _get_node_coords(nodes, point_id):
-    """Retrieve (x, y) coordinates for a given point_id from a nodes array."""
     node_mask = (nodes[:, 0] == point_id)
     if np.any(node_mask):
         return nodes[node_mask][0, 1:3]  # [x, y]
     return None
 
 
-def find_path(edges, start_id, end_id, directed=True):
+def _build_adjacency(edges):
+    """One-off AdjacencyIndex for callers that don't hold a DataManager."""
+    adjacency = AdjacencyIndex()
+    adjacency.rebuild(edges)
+    return adjacency
+
+
+def find_path(edges, start_id, end_id, directed=True, adjacency=None):
     """Finds a path from start_id to end_id using bidirectional BFS.
     
     Args:
@@ -20,19 +36,16 @@ def find_path(edges, start_id, end_id, directed=True):
         start_id (int): Start node ID.
         end_id (int): End node ID.
         directed (bool): If True, search respects edge direction. If False, treats graph as undirected.
+        adjacency (AdjacencyIndex, optional): Prebuilt adjacency over ``edges``
+            (DataManager.adjacency); built from ``edges`` when omitted.
     """
     if edges.size == 0:
         return None
 
-    # Adjacency List
-    adj = {}
-    for from_id, to_id in edges:
-        from_id, to_id = int(from_id), int(to_id)
-        adj.setdefault(from_id, []).append(to_id)
-        
-        if not directed:
-            # Allow backward traversal if not directed (Force Mode)
-            adj.setdefault(to_id, []).append(from_id)
+    if adjacency is None:
+        adjacency = _build_adjacency(edges)
+    # Allow backward traversal if not directed (Force Mode)
+    next_ids = adjacency.successors if directed else adjacency.neighbors
 
     try:
         start_id = int(start_id)
@@ -42,7 +55,7 @@ def find_path(edges, start_id, end_id, directed=True):
         return None
 
     def bfs(s, e):
-        if s not in adj:
+        if s not in adjacency:
             return None
         queue = deque([(s, [s])])
         visited = {s}
@@ -50,7 +63,7 @@ def find_path(edges, start_id, end_id, directed=True):
             current_id, path = queue.popleft()
             if current_id == e:
                 return path
-            for neighbor_id in adj.get(current_id, []):
+            for neighbor_id in next_ids(current_id):
                 if neighbor_id not in visited:
                     visited.add(neighbor_id)
                     new_path = path + [neighbor_id]
@@ -74,7 +87,7 @@ def find_path(edges, start_id, end_id, directed=True):
     return None
 
 
-def smooth_segment(nodes, edges, path_ids, smoothness, weight):
+def smooth_segment(nodes, edges, path_ids, smoothness, weight, index=None, adjacency=None):
     """Calculate smoothed points for a given path of IDs.
     
     This function takes a set of nodes and edges to compute a smoothed path based
@@ -90,6 +103,8 @@ def smooth_segment(nodes, edges, path_ids, smoothness, weight):
         path_ids (list): A list of IDs representing the path to be smoothed.
         smoothness (float): The smoothness parameter for the B-spline.
         weight (float): The weight applied to the start and end points in the fitting process.
+        index (NodeIndex, optional): Id -> row index over ``nodes`` for O(1) lookups.
+        adjacency (AdjacencyIndex, optional): Prebuilt adjacency over ``edges``.
     
     Returns:
         np.ndarray: An array of smoothed points, or None if smoothing fails.
@@ -98,7 +113,7 @@ def smooth_segment(nodes, edges, path_ids, smoothness, weight):
         print("Path too short for smoothing (needs >= 3 points)")
         return None
 
-    points_xy = [_get_node_coords(nodes, pid) for pid in path_ids]
+    points_xy = [_get_node_coords(nodes, pid, index) for pid in path_ids]
     points = np.array([p for p in points_xy if p is not None])
 
     # Check for duplicates or insufficient unique points
@@ -118,22 +133,19 @@ def smooth_segment(nodes, edges, path_ids, smoothness, weight):
     prev_point, next_point = None, None
     start_id, end_id = path_ids[0], path_ids[-1]
 
-    adj = {}
-    for from_id, to_id in edges:
-        from_id, to_id = int(from_id), int(to_id)
-        adj.setdefault(from_id, []).append(to_id)
-        adj.setdefault(to_id, []).append(from_id)
+    if adjacency is None:
+        adjacency = _build_adjacency(edges)
 
-    if start_id in adj and len(path_ids) > 1:
-        for neighbor_id in adj[start_id]:
+    if len(path_ids) > 1:
+        for neighbor_id in adjacency.neighbors(start_id):
             if neighbor_id != path_ids[1]:
-                prev_point = _get_node_coords(nodes, neighbor_id)
+                prev_point = _get_node_coords(nodes, neighbor_id, index)
                 break
 
-    if end_id in adj and len(path_ids) > 1:
-        for neighbor_id in adj[end_id]:
+    if len(path_ids) > 1:
+        for neighbor_id in adjacency.neighbors(end_id):
             if neighbor_id != path_ids[-2]:
-                next_point = _get_node_coords(nodes, neighbor_id)
+                next_point = _get_node_coords(nodes, neighbor_id, index)
                 break
 
     fitting_points = points.copy()
@@ -329,7 +329,7 @@ const FileLoader = ({ onClose }) => {
                                     style={{ width: '100%', padding: '5px', background: 'var(--bg-tertiary)', color: 'var(--text-primary)', border: '1px solid var(--border-color)' }}
                                 >
                                     <option value="">Select Nodes File</option>
-                                    {availableFiles.saved_files.filter(f => f.includes('nodes')).map(file => (
+                                    {availableFiles.saved_files.filter(f => f.includes('nodes') || f.endsWith('.npz')).map(file => (
                                         <option key={file} value={file}>{file}</option>
                                     ))}
                                 </select>